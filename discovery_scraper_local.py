@@ -36,12 +36,45 @@ import asyncio
 import signal
 import sys
 import shutil
+from io import BytesIO
+from urllib.parse import urlsplit
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Prefer the C-backed lxml parser; fall back to the stdlib parser if it's missing
+try:
+    from lxml import etree as _etree, html as _lxml_html
+    _HAS_LXML = True
+    HTML_PARSER = "lxml"
+except Exception:  # pragma: no cover - only triggered if lxml missing
+    _HAS_LXML = False
+    HTML_PARSER = "html.parser"
+
+# Only community cards are read from ranking pages; skip building the rest of the tree
+COMMUNITY_STRAINER = SoupStrainer("div", attrs={"data-community-id": True})
+MEMBER_COUNT_CLASS = "flex flex-col font-bold justify-center items-center text-12 w-2xl m-0 truncate"
+MEMBER_COUNT_CLASSES = MEMBER_COUNT_CLASS.split()
+MEMBER_COUNT_SELECTOR = f'h6[class="{MEMBER_COUNT_CLASS}"]'
+if _HAS_LXML:
+    _CARD_XPATH = _etree.XPath("//div[@data-community-id]")
+    _MEMBER_COUNT_XPATH = _etree.XPath(f'(.//h6[@class="{MEMBER_COUNT_CLASS}"])[1]')
+    _LINK_XPATH = _etree.XPath("(.//a[@href])[1]")
+
+# Pages at least this large are stream-parsed (iterparse) instead of building the whole tree;
+# on normal-sized pages the per-element events cost more than they save
+STREAM_PARSE_MIN_CHARS = int(os.getenv("DISCOVERY_STREAM_PARSE_MIN_CHARS", str(4 * 1024 * 1024)))
+
+# selectolax (Lexbor) avoids per-node Python objects entirely; raw lxml, then BeautifulSoup, are the fallbacks
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    _HAS_SELECTOLAX = True
+except Exception:  # pragma: no cover - only triggered if selectolax missing
+    LexborHTMLParser = None
+    _HAS_SELECTOLAX = False
 
 # We import Playwright lazily to allow parser-only tests without it installed
 try:
@@ -50,6 +83,70 @@ except Exception:  # pragma: no cover - only triggered if playwright missing
     sync_playwright = None
     PlaywrightTimeoutError = Exception
 
+try:
+    from playwright.async_api import async_playwright
+except Exception:  # pragma: no cover - only triggered if playwright missing
+    async_playwright = None
+
+try:
+    import requests
+except Exception:  # pragma: no cover - only triggered if requests missing
+    requests = None
+
+# Faster compact JSON for page dumps (optional; stdlib json fallback)
+_HAS_ORJSON = False
+try:
+    import orjson as _orjson  # type: ignore
+    _HAS_ORJSON = True
+except Exception:  # pragma: no cover - only triggered if orjson missing
+    _HAS_ORJSON = False
+
+
+# Optional zstd compression for per-page dumps (page_<N>.json.zst)
+_HAS_ZSTD = False
+try:
+    import zstandard as _zstd  # type: ignore
+    _HAS_ZSTD = True
+except Exception:  # pragma: no cover - only triggered if zstandard missing
+    _HAS_ZSTD = False
+
+PAGE_SUFFIXES = (".json", ".json.zst")
+
+
+def is_page_file(filename: str) -> bool:
+    """True for page_<N>.json and page_<N>.json.zst."""
+    return filename.startswith("page_") and filename.endswith(PAGE_SUFFIXES)
+
+
+def existing_page_path(pages_dir: str, page_number: int) -> Optional[str]:
+    """Path of the saved page file (plain or zstd), or None."""
+    for suffix in PAGE_SUFFIXES:
+        path = os.path.join(pages_dir, f"page_{page_number}{suffix}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_page_file(path: str):
+    """Read a page dump, transparently decompressing .zst files."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if path.endswith(".zst"):
+        if not _HAS_ZSTD:
+            raise RuntimeError(f"{path} is zstd-compressed; pip install zstandard to read it")
+        raw = _zstd.ZstdDecompressor().decompress(raw)
+    return json.loads(raw)
+
+
+def dump_json_bytes(obj) -> bytes:
+    """Serialize obj as compact UTF-8 JSON, using orjson when available (same layout either way)."""
+    if _HAS_ORJSON:
+        try:
+            return _orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 # Browser profile configurations (borrowed from frontpage scraper)
 BROWSER_PROFILES = {
@@ -81,6 +178,15 @@ BROWSER_PROFILES = {
 
 DEFAULT_UA = BROWSER_PROFILES["chromium"]["user_agent"]
 
+# Resource types never needed to read community cards (document/script/xhr/fetch still load so cards hydrate)
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "imageset", "media", "font", "stylesheet"})
+
+# Resolves once enough cards have rendered, or once a fully loaded page has any (short last pages)
+CARDS_READY_JS = """([selector, minCount]) => {
+    const n = document.querySelectorAll(selector).length;
+    return n >= minCount || (n > 0 && document.readyState === "complete");
+}"""
+
 
 @dataclass
 class EnhancedScraperConfig:
@@ -92,13 +198,24 @@ class EnhancedScraperConfig:
     min_delay: float = 1.5
     max_delay: float = 3.5
     wait_selector: str = 'div[data-community-id]'
+    wait_min_cards: int = 20  # cards that must render before the page is read
     max_page_seconds: float = 45.0
     max_attempts: int = 3
+
+    # Plain HTTP first (cards are server-rendered); the browser is only started when that yields nothing
+    http_first: bool = True
+    http_timeout: float = 15.0
+    http_miss_threshold: int = 3  # consecutive empty HTTP pages before going browser-only for the run
+    http_pool_size: int = 10  # keep-alive connections held by the HTTP session
+
+    # Cookies/localStorage carried across contexts and runs (Playwright storage_state JSON); None disables
+    storage_state_path: Optional[str] = os.getenv("DISCOVERY_STORAGE_STATE", os.path.join("output", ".playwright_state.json")) or None
     
     # Enhanced browser features
     browser_engine: str = "chromium"  # chromium, webkit, firefox
     multi_engine: bool = False  # Rotate between browser engines
-    disable_images: bool = True  # Block images to save bandwidth
+    disable_images: bool = True  # Block images, media, fonts and stylesheets to save bandwidth
+    single_process: bool = False  # Chromium --single-process: less memory, less stable
     
     # Enhanced error handling
     retry_delay_base: float = 2.0  # Base delay for exponential backoff
@@ -112,6 +229,7 @@ class EnhancedScraperConfig:
     
     # Worker support
     worker_id: Optional[int] = None
+    max_concurrency: int = 1  # >1: fetch pages through N browser contexts concurrently
 
     # Archiving options
     archive_granularity: str = os.getenv("ARCHIVE_GRANULARITY", "week")  # day|week|month|timestamp
@@ -122,6 +240,10 @@ class EnhancedScraperConfig:
     resume: bool = False
     overwrite: bool = False
 
+    # Write page_<N>.json.zst (zstd level 3) instead of plain JSON; downstream tools outside this
+    # script expect plain page_<N>.json, so this is meant for archival/bulk runs
+    compress_pages: bool = (os.getenv("DISCOVERY_COMPRESS_PAGES", "0").lower() in ("1", "true", "yes"))
+
     # Archiving options
     archive_granularity: str = os.getenv("ARCHIVE_GRANULARITY", "week")  # day|week|month|timestamp
     archive_overwrite_same_period: bool = (os.getenv("ARCHIVE_OVERWRITE_SAME_PERIOD", "1").lower() not in ("0", "false", "no"))
@@ -146,6 +268,10 @@ class CommunityRankingScraper:
         self._engine_index = 0
         self._connection_refused_count = 0
         self._last_refused_time = 0
+        self._http = None
+        self._http_misses = 0
+        self._manifest_pages = set()
+        self._throttle_level = 0  # consecutive 429/503 responses; drives exponential politeness backoff
 
     # ------------------------- Browser lifecycle ------------------------- #
     def _start(self):
@@ -184,24 +310,35 @@ class CommunityRankingScraper:
     def _get_browser_args(self, engine: str) -> List[str]:
         """Get browser-specific launch arguments"""
         if engine == "chromium":
-            return [
+            args = [
                 "--disable-blink-features=AutomationControlled",
                 "--no-sandbox",
                 "--disable-dev-shm-usage",
                 "--disable-web-security",
-                "--disable-features=VizDisplayCompositor"
+                # Chromium honours only one --disable-features switch, so keep them in a single list
+                "--disable-features=VizDisplayCompositor,IsolateOrigins,site-per-process,TranslateUI",
+                # Lighter startup/memory: nothing here is needed to render ranking pages
+                "--disable-extensions",
+                "--disable-background-networking",
+                "--disable-default-apps",
+                "--disable-gpu",
+                "--disable-sync",
+                "--no-first-run",
+                "--mute-audio",
             ]
+            if self.config.single_process:
+                args.append("--single-process")
+            return args
         elif engine == "webkit":
             return []
         elif engine == "firefox":
             return ["--no-sandbox"]
         return []
 
-    def _new_context(self):
-        """Create new browser context with current profile"""
+    def _context_kwargs(self) -> Dict:
+        """Browser context options for the current profile"""
         profile = BROWSER_PROFILES[self._current_engine]
-        
-        context_kwargs = {
+        kwargs = {
             "user_agent": profile["user_agent"],
             "locale": "en-US",
             "timezone_id": "America/Los_Angeles",
@@ -210,12 +347,47 @@ class CommunityRankingScraper:
                 "height": random.randint(800, 900),
             },
         }
+        state_path = self.config.storage_state_path
+        if state_path and os.path.exists(state_path):
+            kwargs["storage_state"] = state_path
+        return kwargs
+
+    def _save_storage_state(self):
+        """Persist the live context's cookies so later contexts/runs skip the bot-check warmup"""
+        state_path = self.config.storage_state_path
+        if not state_path or not hasattr(self, "_context"):
+            return
+        try:
+            os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+            tmp_path = f"{state_path}.tmp{os.getpid()}"
+            self._context.storage_state(path=tmp_path)
+            os.replace(tmp_path, state_path)
+        except Exception as e:
+            print(f"[browser] Could not save storage state: {e}")
+
+    def _share_browser_cookies(self):
+        """Copy browser cookies into the HTTP session so plain requests look like the same visitor"""
+        if self._http is None or not hasattr(self, "_context"):
+            return
+        try:
+            for c in self._context.cookies():
+                self._http.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+        except Exception:
+            pass
+
+    def _new_context(self):
+        """Create new browser context with current profile"""
+        self._context = self._browser.new_context(**self._context_kwargs())
         
-        self._context = self._browser.new_context(**context_kwargs)
-        
-        # Block images to save bandwidth
+        # Block images, media, fonts and stylesheets to save bandwidth
         if self.config.disable_images:
-            self._context.route("**/*.{png,jpg,jpeg,gif,webp,svg,ico}", lambda route: route.abort())
+            def block_resources(route):
+                if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+                    route.abort()
+                else:
+                    route.continue_()
+
+            self._context.route("**/*", block_resources)
         
         self._page = self._context.new_page()
         
@@ -227,14 +399,27 @@ class CommunityRankingScraper:
             
         self._apply_stealth(self._page)
 
+    def _ensure_started(self):
+        """Start the browser on first use (pages served over plain HTTP never need it)"""
+        if not hasattr(self, "_pw"):
+            self._start()
+
     def _stop(self):
-        """Clean shutdown of browser resources"""
+        """Clean shutdown of browser and HTTP resources"""
+        self._save_storage_state()
         for attr in ["_page", "_context", "_browser", "_pw"]:
             if hasattr(self, attr):
                 try:
                     getattr(self, attr).close() if attr != "_pw" else getattr(self, attr).stop()
                 except Exception:
                     pass
+                delattr(self, attr)
+        if self._http is not None:
+            try:
+                self._http.close()
+            except Exception:
+                pass
+            self._http = None
 
     def _rotate_engine(self):
         """Rotate to next available browser engine"""
@@ -246,6 +431,10 @@ class CommunityRankingScraper:
         
         if new_engine != self._current_engine:
             print(f"[browser] Rotating from {self._current_engine} to {new_engine}")
+            if not hasattr(self, "_pw"):
+                # Browser not started yet; the next launch picks up the new engine
+                self._current_engine = new_engine
+                return
             try:
                 self._browser.close()
             except Exception:
@@ -256,6 +445,14 @@ class CommunityRankingScraper:
     # ----------------------------- Enhanced Stealth ----------------------------- #
     def _apply_stealth(self, page):
         """Enhanced stealth evasions based on current browser engine"""
+        for js in self._stealth_scripts():
+            try:
+                page.add_init_script(js)
+            except Exception:
+                pass
+
+    def _stealth_scripts(self) -> List[str]:
+        """Init scripts used by _apply_stealth for the current browser engine"""
         engine = self._current_engine
         
         # Common evasions
@@ -282,12 +479,7 @@ class CommunityRankingScraper:
                 "Object.defineProperty(navigator, 'buildID', {get: () => '20100101'});",
                 "Object.defineProperty(navigator, 'product', {get: () => 'Gecko'});",
             ])
-        
-        for js in common_evasions:
-            try:
-                page.add_init_script(js)
-            except Exception:
-                pass
+        return common_evasions
 
     # ----------------------------- Connectivity Monitoring ----------------------------- #
     def _check_internet_connectivity(self) -> bool:
@@ -326,8 +518,53 @@ class CommunityRankingScraper:
         return "ERR_CONNECTION_REFUSED" in error_str or "ECONNREFUSED" in error_str
 
     # ----------------------------- Enhanced Scraping ----------------------------- #
+    def fetch_page_html_http(self, page_number: int) -> Optional[str]:
+        """Fetch page HTML over a pooled keep-alive HTTP session; None if it has no community cards"""
+        if requests is None:
+            return None
+        if self._http is None:
+            profile = BROWSER_PROFILES[self._current_engine]
+            self._http = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=self.config.http_pool_size, pool_maxsize=self.config.http_pool_size
+            )
+            self._http.mount("https://", adapter)
+            self._http.mount("http://", adapter)
+            self._http.headers.update({
+                "User-Agent": profile["user_agent"],
+                "Accept": profile["accept"],
+                "Accept-Language": profile["accept_language"],
+            })
+            if self.config.proxy_server:
+                self._http.proxies.update({"http": self.config.proxy_server, "https": self.config.proxy_server})
+            self._load_http_cookies()
+        url = f"{self.config.base_url}/{page_number}"
+        try:
+            resp = self._http.get(url, timeout=self.config.http_timeout)
+        except Exception as e:
+            print(f"⚠️  HTTP fetch failed for {url}: {e}")
+            return None
+        self._note_status(resp.status_code)
+        if resp.status_code != 200 or "data-community-id" not in resp.text:
+            return None
+        return resp.text
+
+    def _load_http_cookies(self):
+        """Seed the HTTP session from the saved storage_state, if any"""
+        state_path = self.config.storage_state_path
+        if not state_path or not os.path.exists(state_path):
+            return
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            for c in state.get("cookies", []):
+                self._http.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+        except Exception:
+            pass
+
     def fetch_page_html(self, page_number: int) -> Optional[str]:
         """Fetch page HTML with enhanced error handling and retries"""
+        self._ensure_started()
         url = f"{self.config.base_url}/{page_number}"
         start = time.monotonic()
         
@@ -342,16 +579,20 @@ class CommunityRankingScraper:
                     else:
                         self._connection_refused_count = 0  # Reset after cooldown
 
-                self._page.goto(url, wait_until="domcontentloaded", timeout=self.config.timeout_ms)
+                response = self._page.goto(url, wait_until="domcontentloaded", timeout=self.config.timeout_ms)
+                self._note_status(response.status if response else None)
                 
                 # Wait for content to render
                 try:
-                    self._page.wait_for_selector(self.config.wait_selector, timeout=15000)
+                    self._page.wait_for_function(
+                        CARDS_READY_JS, arg=[self.config.wait_selector, self.config.wait_min_cards], timeout=15000
+                    )
                 except PlaywrightTimeoutError:
                     self._page.wait_for_timeout(3000)  # Fallback wait
                 
                 # Reset connection refused counter on success
                 self._connection_refused_count = 0
+                self._share_browser_cookies()
                 return self._page.content()
                 
             except Exception as e:
@@ -405,15 +646,44 @@ class CommunityRankingScraper:
     def scrape_page(self, page_number: int, delay: Optional[float] = None) -> List[Dict]:
         """Scrape a single page with enhanced error handling"""
         print(f"📄 [enhanced] Scraping community ranking page {page_number}...")
-        html = self.fetch_page_html(page_number)
-        subs = self.parse_subreddit_data(html or "", page_number)
+        fetch_start = time.monotonic()
+        subs: List[Dict] = []
+        if self.config.http_first and self._http_misses < self.config.http_miss_threshold:
+            subs = self.parse_subreddit_data(self.fetch_page_html_http(page_number) or "", page_number)
+            if subs:
+                self._http_misses = 0
+            else:
+                self._http_misses += 1
+                if self._http_misses >= self.config.http_miss_threshold:
+                    print(f"[http] {self._http_misses} empty HTTP pages in a row, using the browser only")
+        if not subs:
+            html = self.fetch_page_html(page_number)
+            subs = self.parse_subreddit_data(html or "", page_number)
         print(f"✅ [enhanced] Found {len(subs)} subreddits on page {page_number}")
         
         # Polite delay with jitter
-        d = delay if delay is not None else random.uniform(self.config.min_delay, self.config.max_delay)
+        d = delay if delay is not None else self._politeness_delay(time.monotonic() - fetch_start)
         time.sleep(d)
         return subs
 
+    def _note_status(self, status: Optional[int]):
+        """Track rate-limit responses (429/503) for exponential politeness backoff"""
+        if status in (429, 503):
+            self._throttle_level = min(self._throttle_level + 1, 5)
+            print(f"🐢 Rate limited (HTTP {status}), backoff level {self._throttle_level}")
+        elif status is not None and status < 400:
+            self._throttle_level = 0
+
+    def _politeness_delay(self, fetch_seconds: float) -> float:
+        """Threshold delay plus random increment: time already spent fetching counts toward min_delay.
+
+        Backs off exponentially while the server keeps answering 429/503.
+        """
+        jitter = random.uniform(0, max(self.config.max_delay - self.config.min_delay, 0.0))
+        if self._throttle_level:
+            return (self.config.min_delay + jitter) * (2 ** self._throttle_level)
+        return max(self.config.min_delay - fetch_seconds, 0.0) + jitter
+
     def scrape_all_pages(self, start_page: int = 1, end_page: int = 5, save_every: int = 2, 
                         delay: Optional[float] = None, archive_existing: bool = True) -> List[Dict]:
         """Enhanced scraping with better error handling and progress tracking"""
@@ -426,14 +696,26 @@ class CommunityRankingScraper:
             self._archive_existing_data()
             
         start_time = datetime.now()
+        self._load_manifest_pages()
+
+        if self.config.max_concurrency > 1:
+            print(f"   Concurrency: {self.config.max_concurrency} browser contexts")
+            asyncio.run(self._scrape_pages_concurrent(list(range(start_page, end_page + 1)), delay=delay))
+            self._write_manifest(last_page=end_page)
+            elapsed = datetime.now() - start_time
+            print(f"🎉 [enhanced] Community ranking complete! {self.total_count} subreddits in {elapsed}")
+            return self.all_subreddits
         
         try:
-            self._start()
+            if not self.config.http_first:
+                self._start()
             for page in range(start_page, end_page + 1):
                 self.scrape_and_persist_page(page, delay=delay)
                 
                 if page % save_every == 0:
                     print(f"💾 Progress: {page}/{end_page} pages, {self.total_count} subreddits")
+                    # Checkpoint so an aborted run can resume from the manifest
+                    self._write_manifest(last_page=page)
                     
                 # Rotate engine periodically if multi-engine enabled
                 if self.config.multi_engine and page % 10 == 0:
@@ -447,29 +729,188 @@ class CommunityRankingScraper:
         print(f"🎉 [enhanced] Community ranking complete! {self.total_count} subreddits in {elapsed}")
         return self.all_subreddits
 
-    def scrape_and_persist_page(self, page_number: int, delay: Optional[float] = None) -> List[Dict]:
-        """Scrape and save individual page with error tracking"""
+    async def _scrape_pages_concurrent(self, pages: List[int], delay: Optional[float] = None):
+        """Fetch pages through max_concurrency contexts of one browser; each page is persisted as it completes"""
+        if async_playwright is None:
+            raise RuntimeError(
+                "Playwright is not installed. Run: pip install -r requirements.txt && playwright install chromium"
+            )
+        queue: asyncio.Queue = asyncio.Queue()
+        for page_number in pages:
+            queue.put_nowait(page_number)
+        # Per-domain pacing shared by all workers (see _await_request_slot)
+        self._slot_lock = asyncio.Lock()
+        self._next_slot = {}
+
+        async with async_playwright() as pw:
+            launch_kwargs = {
+                "headless": self.config.headless,
+                "args": self._get_browser_args(self._current_engine),
+            }
+            if self.config.proxy_server:
+                launch_kwargs["proxy"] = {"server": self.config.proxy_server}
+            browser = await getattr(pw, self._current_engine).launch(**launch_kwargs)
+            print(f"[browser] Started {self._current_engine} engine (async)")
+
+            async def worker():
+                context = await browser.new_context(**self._context_kwargs())
+                try:
+                    if self.config.disable_images:
+                        async def block_resources(route):
+                            if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+                                await route.abort()
+                            else:
+                                await route.continue_()
+
+                        await context.route("**/*", block_resources)
+                    context.set_default_timeout(self.config.timeout_ms)
+                    for js in self._stealth_scripts():
+                        try:
+                            await context.add_init_script(js)
+                        except Exception:
+                            pass
+                    page = await context.new_page()
+                    while True:
+                        try:
+                            page_number = queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        if self._load_existing_page(page_number) is not None:
+                            continue
+                        error = None
+                        subs: List[Dict] = []
+                        try:
+                            print(f"📄 [enhanced] Scraping community ranking page {page_number}...")
+                            html = await self._fetch_page_html_async(page, page_number, delay=delay)
+                            subs = self.parse_subreddit_data(html or "", page_number)
+                            print(f"✅ [enhanced] Found {len(subs)} subreddits on page {page_number}")
+                        except Exception as e:
+                            error = str(e)
+                            print(f"❌ Error on page {page_number}: {error}")
+                        self._record_page(page_number, subs, error)
+                finally:
+                    state_path = self.config.storage_state_path
+                    if state_path:
+                        try:
+                            os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+                            tmp_path = f"{state_path}.tmp{os.getpid()}.{id(context)}"
+                            await context.storage_state(path=tmp_path)
+                            os.replace(tmp_path, state_path)
+                        except Exception as e:
+                            print(f"[browser] Could not save storage state: {e}")
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
 
-        # Resume support: skip if output already exists and appears valid (unless overwrite)
-        if self.config.resume and not self.config.overwrite:
-            pages_dir = os.path.join("output", "pages")
-            os.makedirs(pages_dir, exist_ok=True)
-            existing_path = os.path.join(pages_dir, f"page_{page_number}.json")
-            if os.path.exists(existing_path) and os.path.getsize(existing_path) > 0:
+            try:
+                n = max(1, min(int(self.config.max_concurrency), len(pages)))
+                await asyncio.gather(*[worker() for _ in range(n)])
+            finally:
                 try:
-                    with open(existing_path, "r", encoding="utf-8") as f:
-                        existing = json.load(f)
-                    subs_list = existing.get("subreddits", [])
-                    # Consider valid if 'subreddits' is a list and we have either content or a well-formed count
-                    if isinstance(subs_list, list) and (len(subs_list) > 0 or isinstance(existing.get("count", 0), int)):
-                        print(f"⏭️  Skipping page {page_number} (resume: output exists)")
-                        self.pages_done.add(page_number)
-                        # Do not modify total_count here (we count newly scraped only)
-                        return subs_list
+                    await browser.close()
                 except Exception:
-                    # Treat parse errors or invalid files as missing and proceed to scrape
                     pass
 
+    async def _await_request_slot(self, url: str, delay: Optional[float] = None):
+        """Token-bucket politeness across concurrent workers: requests to one host start at least
+        one politeness delay apart, while workers whose turn has not come yet simply wait."""
+        host = urlsplit(url).netloc
+        async with self._slot_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_slot.get(host, 0.0))
+            interval = delay if delay is not None else self._politeness_delay(0.0)
+            self._next_slot[host] = start_at + interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    async def _fetch_page_html_async(self, page, page_number: int, delay: Optional[float] = None) -> Optional[str]:
+        """Async counterpart of fetch_page_html for one worker page (no engine rotation)"""
+        url = f"{self.config.base_url}/{page_number}"
+        start = time.monotonic()
+
+        for attempt in range(self.config.max_attempts):
+            try:
+                await self._await_request_slot(url, delay)
+                response = await page.goto(url, wait_until="domcontentloaded", timeout=self.config.timeout_ms)
+                self._note_status(response.status if response else None)
+                try:
+                    await page.wait_for_function(
+                        CARDS_READY_JS, arg=[self.config.wait_selector, self.config.wait_min_cards], timeout=15000
+                    )
+                except Exception:
+                    await page.wait_for_timeout(3000)  # Fallback wait
+                return await page.content()
+            except Exception as e:
+                elapsed = time.monotonic() - start
+                print(f"⚠️  Attempt {attempt + 1} failed for {url}: {e} (elapsed {elapsed:.1f}s)")
+
+                if self._is_internet_connectivity_error(str(e)):
+                    print("🌐 Internet connectivity issue detected")
+                    await asyncio.to_thread(self._wait_for_internet_connection)
+                    continue
+
+                if attempt < self.config.max_attempts - 1:
+                    sleep_time = self.config.retry_delay_base * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    print(f"⏳ Waiting {sleep_time:.1f}s before retry...")
+                    await asyncio.sleep(sleep_time)
+
+                if elapsed >= self.config.max_page_seconds:
+                    break
+
+        print(f"❌ Failed to fetch {url} after {self.config.max_attempts} attempts")
+        return None
+
+    def _load_manifest_pages(self):
+        """Resume support: remember pages the manifest already records as done"""
+        if not self.config.resume or self.config.overwrite:
+            return
+        try:
+            with open(os.path.join("output", "manifest.json"), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self._manifest_pages = {int(p) for p in manifest.get("pages_done", [])}
+        except Exception:
+            self._manifest_pages = set()
+        if self._manifest_pages:
+            print(f"⏭️  Resume: manifest lists {len(self._manifest_pages)} pages as done")
+
+    def _load_existing_page(self, page_number: int) -> Optional[List[Dict]]:
+        """Resume support: return the saved subreddits if the page output exists and looks valid.
+
+        Pages recorded in the manifest are skipped without re-reading their file (returns [];
+        only newly scraped pages are counted).
+        """
+        if not self.config.resume or self.config.overwrite:
+            return None
+        pages_dir = os.path.join("output", "pages")
+        os.makedirs(pages_dir, exist_ok=True)
+        existing_path = existing_page_path(pages_dir, page_number)
+        if existing_path is None:
+            return None
+        if page_number in self._manifest_pages:
+            self.pages_done.add(page_number)
+            return []
+        if os.path.getsize(existing_path) > 0:
+            try:
+                existing = load_page_file(existing_path)
+                subs_list = existing.get("subreddits", [])
+                # Consider valid if 'subreddits' is a list and we have either content or a well-formed count
+                if isinstance(subs_list, list) and (len(subs_list) > 0 or isinstance(existing.get("count", 0), int)):
+                    print(f"⏭️  Skipping page {page_number} (resume: output exists)")
+                    self.pages_done.add(page_number)
+                    # Do not modify total_count here (we count newly scraped only)
+                    return subs_list
+            except Exception:
+                # Treat parse errors or invalid files as missing and proceed to scrape
+                pass
+        return None
+
+    def scrape_and_persist_page(self, page_number: int, delay: Optional[float] = None) -> List[Dict]:
+        """Scrape and save individual page with error tracking"""
+        existing = self._load_existing_page(page_number)
+        if existing is not None:
+            return existing
+
         error = None
         subs: List[Dict] = []
 
@@ -479,6 +920,11 @@ class CommunityRankingScraper:
             error = str(e)
             print(f"❌ Error on page {page_number}: {error}")
 
+        self._record_page(page_number, subs, error)
+        return subs
+
+    def _record_page(self, page_number: int, subs: List[Dict], error: Optional[str] = None):
+        """Persist one page and update progress counters"""
         # Save page data with error information
         self.save_page_data(page_number, subs, error=error)
         self.pages_done.add(page_number)
@@ -489,49 +935,31 @@ class CommunityRankingScraper:
         if len(self.all_subreddits) > 5000:
             self.all_subreddits = self.all_subreddits[-1000:]
 
-        return subs
-
     # ------------------------------ Parsing (unchanged) ----------------------------- #
     def parse_subreddit_data(self, html_content: str, page_number: int) -> List[Dict]:
         """Parse subreddit data from HTML (keeping original logic)"""
         if not html_content:
             return []
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        community_divs = soup.find_all("div", {"data-community-id": True})
         subreddits: List[Dict] = []
-        
-        for i, div in enumerate(community_divs):
-            try:
-                community_id = div.get("data-community-id")
-                prefixed_name = div.get("data-prefixed-name")
-                subscribers_count = div.get("data-subscribers-count")
-                description = div.get("data-public-description-text", "")
-                icon_url = div.get("data-icon-url", "")
-
-                member_count_elem = div.find(
-                    "h6",
-                    class_="flex flex-col font-bold justify-center items-center text-12 w-2xl m-0 truncate",
-                )
-                displayed_count = member_count_elem.text.strip() if member_count_elem else ""
-
-                link_elem = div.find("a", href=True)
-                subreddit_url = link_elem.get("href") if link_elem else ""
+        append = subreddits.append
+        scraped_at = datetime.now().isoformat()  # one timestamp per page
+        rank_base = (page_number - 1) * 50 + 1  # approximate rank (~50 per page)
 
-                approximate_rank = ((page_number - 1) * 50) + i + 1
-
-                subreddits.append({
-                    "rank": approximate_rank,
+        for rank, (attrs, displayed_count, subreddit_url) in enumerate(self._iter_community_cards(html_content), rank_base):
+            try:
+                subscribers_count = attrs.get("data-subscribers-count")
+                append({
+                    "rank": rank,
                     "page": page_number,
-                    "community_id": community_id,
-                    "name": prefixed_name,
+                    "community_id": attrs.get("data-community-id"),
+                    "name": attrs.get("data-prefixed-name"),
                     "url": subreddit_url,
                     "full_url": f"https://reddit.com{subreddit_url}" if subreddit_url else "",
                     "subscribers_count": int(subscribers_count) if subscribers_count else 0,
                     "displayed_count": displayed_count,
-                    "description": description,
-                    "icon_url": icon_url,
-                    "scraped_at": datetime.now().isoformat(),
+                    "description": attrs.get("data-public-description-text", ""),
+                    "icon_url": attrs.get("data-icon-url", ""),
+                    "scraped_at": scraped_at,
                 })
             except Exception as e:
                 print(f"⚠️  Parse error on page {page_number}: {e}")
@@ -539,6 +967,105 @@ class CommunityRankingScraper:
 
         return subreddits
 
+    @staticmethod
+    def _iter_community_cards(html_content: str):
+        """Yield (attributes, displayed member count, link href) for each community card in page order."""
+        if _HAS_SELECTOLAX:
+            tree = LexborHTMLParser(html_content)
+            for node in tree.css("div[data-community-id]"):
+                member_count_elem = node.css_first(MEMBER_COUNT_SELECTOR)
+                link_elem = node.css_first("a[href]")
+                yield (
+                    node.attributes,
+                    member_count_elem.text().strip() if member_count_elem else "",
+                    link_elem.attributes.get("href") if link_elem else "",
+                )
+            return
+
+        if _HAS_LXML and len(html_content) >= STREAM_PARSE_MIN_CHARS:
+            yielded = False
+            try:
+                for card in CommunityRankingScraper._iter_community_cards_streaming(html_content):
+                    yielded = True
+                    yield card
+                return
+            except Exception as e:
+                if yielded:
+                    print(f"⚠️  Stream parse stopped early: {e}")
+                    return
+                # Nothing emitted yet; retry with the tree parsers below
+
+        if _HAS_LXML:
+            try:
+                root = _lxml_html.fromstring(html_content)
+            except Exception:
+                root = None  # e.g. whitespace-only or encoding-declared input; let BeautifulSoup handle it
+            if root is not None:
+                for div in _CARD_XPATH(root):
+                    member_count_elem = _MEMBER_COUNT_XPATH(div)
+                    link_elem = _LINK_XPATH(div)
+                    yield (
+                        div.attrib,
+                        member_count_elem[0].text_content().strip() if member_count_elem else "",
+                        link_elem[0].get("href") if link_elem else "",
+                    )
+                return
+
+        soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=COMMUNITY_STRAINER)
+        for div in soup.find_all("div", {"data-community-id": True}):
+            # One walk over the card finds both the member-count h6 and the first link
+            member_count_elem = link_elem = None
+            for el in div.descendants:
+                name = el.name
+                if name == "h6":
+                    if member_count_elem is None and el.get("class") == MEMBER_COUNT_CLASSES:
+                        member_count_elem = el
+                elif name == "a":
+                    if link_elem is None and el.get("href") is not None:
+                        link_elem = el
+                else:
+                    continue
+                if member_count_elem is not None and link_elem is not None:
+                    break
+            yield (
+                div.attrs,
+                member_count_elem.text.strip() if member_count_elem else "",
+                link_elem.get("href") if link_elem else "",
+            )
+
+
+    @staticmethod
+    def _iter_community_cards_streaming(html_content: str):
+        """iterparse variant of _iter_community_cards: finished elements are freed as parsing goes,
+        so peak memory stays near one card instead of the whole page."""
+        open_cards = 0
+        events = _etree.iterparse(
+            BytesIO(html_content.encode("utf-8")), events=("start", "end"), tag="div", html=True, encoding="utf-8"
+        )
+        for event, elem in events:
+            if elem.get("data-community-id") is not None:
+                if event == "start":
+                    open_cards += 1
+                    continue
+                open_cards -= 1
+                if open_cards:
+                    continue  # nested card; emitted with its outermost card, in document order
+                for div in elem.iter("div"):
+                    if div.get("data-community-id") is None:
+                        continue
+                    member_count_elem = _MEMBER_COUNT_XPATH(div)
+                    link_elem = _LINK_XPATH(div)
+                    yield (
+                        dict(div.attrib),
+                        "".join(member_count_elem[0].itertext()).strip() if member_count_elem else "",
+                        link_elem[0].get("href") if link_elem else "",
+                    )
+            elif event == "start" or open_cards:
+                continue  # never free anything inside a card that is still open
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
     # ------------------------------ Historical Tracking ----------------------------- #
     def _get_current_week_id(self) -> str:
         """Get current ISO week identifier (YYYY-WW format)"""
@@ -568,7 +1095,7 @@ class CommunityRankingScraper:
 
         # Require at least one page_*.json to consider as valid current data
         try:
-            page_files = [fn for fn in os.listdir(pages_dir) if fn.startswith("page_") and fn.endswith(".json")]
+            page_files = [fn for fn in os.listdir(pages_dir) if is_page_file(fn)]
         except Exception:
             page_files = []
         if not page_files:
@@ -683,8 +1210,8 @@ class CommunityRankingScraper:
         if out_dir and not os.path.exists(out_dir):
             os.makedirs(out_dir, exist_ok=True)
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(self.all_subreddits, f, indent=2, ensure_ascii=False)
+        with open(filename, "wb") as f:
+            f.write(dump_json_bytes(self.all_subreddits))
 
     def save_page_data(self, page_number: int, subreddits: List[Dict], error: Optional[str] = None):
         """Save individual page data with enhanced metadata"""
@@ -704,9 +1231,21 @@ class CommunityRankingScraper:
             }
         }
         
-        path = os.path.join(pages_dir, f"page_{page_number}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2, ensure_ascii=False)
+        data = dump_json_bytes(payload)
+        plain_path = os.path.join(pages_dir, f"page_{page_number}.json")
+        if self.config.compress_pages and _HAS_ZSTD:
+            path, stale_path = plain_path + ".zst", plain_path
+            data = _zstd.ZstdCompressor(level=3).compress(data)
+        else:
+            path, stale_path = plain_path, plain_path + ".zst"
+        with open(path, "wb") as f:
+            f.write(data)
+        # Keep exactly one copy of each page
+        if os.path.exists(stale_path):
+            try:
+                os.remove(stale_path)
+            except Exception:
+                pass
 
     def _write_manifest(self, last_page: int):
         """Write enhanced manifest with scraper information"""
@@ -802,15 +1341,14 @@ class CommunityRankingScraper:
             
         subreddits = {}
         for filename in os.listdir(pages_dir):
-            if filename.startswith("page_") and filename.endswith(".json"):
+            if is_page_file(filename):
                 filepath = os.path.join(pages_dir, filename)
                 try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        page_data = json.load(f)
-                        for sub in page_data.get("subreddits", []):
-                            name = sub.get("name", "").lstrip("r/")
-                            if name:
-                                subreddits[name] = sub
+                    page_data = load_page_file(filepath)
+                    for sub in page_data.get("subreddits", []):
+                        name = sub.get("name", "").lstrip("r/")
+                        if name:
+                            subreddits[name] = sub
                 except Exception as e:
                     print(f"⚠️ Error loading {filepath}: {e}")
                     
@@ -925,6 +1463,7 @@ def scrape_pages_worker(worker_id: int, page_range: Tuple[int, int], config_dict
         
         # Create scraper
         scraper = CommunityRankingScraper(config)
+        scraper._load_manifest_pages()
         
         start_page, end_page = page_range
         pages_scraped = []
@@ -933,18 +1472,24 @@ def scrape_pages_worker(worker_id: int, page_range: Tuple[int, int], config_dict
         
         print(f"[w{worker_id}] Processing pages {start_page}-{end_page}")
         
-        try:
-            scraper._start()
-            for page in range(start_page, end_page + 1):
-                try:
-                    subs = scraper.scrape_and_persist_page(page)
-                    pages_scraped.append(page)
-                    total_subreddits += len(subs)
-                except Exception as e:
-                    print(f"[w{worker_id}] Error on page {page}: {e}")
-                    errors += 1
-        finally:
-            scraper._stop()
+        if config.max_concurrency > 1:
+            asyncio.run(scraper._scrape_pages_concurrent(list(range(start_page, end_page + 1))))
+            pages_scraped = sorted(scraper.pages_done)
+            total_subreddits = scraper.total_count
+        else:
+            try:
+                if not config.http_first:
+                    scraper._start()
+                for page in range(start_page, end_page + 1):
+                    try:
+                        subs = scraper.scrape_and_persist_page(page)
+                        pages_scraped.append(page)
+                        total_subreddits += len(subs)
+                    except Exception as e:
+                        print(f"[w{worker_id}] Error on page {page}: {e}")
+                        errors += 1
+            finally:
+                scraper._stop()
             
         return {
             "worker_id": worker_id,
@@ -984,9 +1529,18 @@ def main():
     
     # Enhanced features
     parser.add_argument("--disable-images", action="store_true", default=True,
-                       help="Block images to save bandwidth (default)")
+                       help="Block images, media, fonts and stylesheets to save bandwidth (default)")
     parser.add_argument("--enable-images", dest="disable_images", action="store_false",
                        help="Enable image downloads")
+    parser.add_argument("--single-process", action="store_true",
+                       help="Run Chromium as a single process (lower memory for constrained hosts; less stable)")
+    parser.add_argument("--browser-only", dest="http_first", action="store_false", default=True,
+                       help="Always render pages in the browser instead of trying plain HTTP first")
+    parser.add_argument("--storage-state", dest="storage_state_path", default=None,
+                       help="Playwright storage_state JSON reused/persisted between runs "
+                            "(default: output/.playwright_state.json, env DISCOVERY_STORAGE_STATE)")
+    parser.add_argument("--no-storage-state", dest="storage_state_path", action="store_const", const="",
+                       help="Start every run with a fresh browser profile")
     parser.add_argument("--no-wait-internet", dest="wait_for_internet", action="store_false",
                        default=True, help="Don't wait for internet connection recovery")
     
@@ -995,6 +1549,8 @@ def main():
                        help="Number of parallel worker processes (1=sequential)")
     parser.add_argument("--chunk-size", type=int, default=20,
                        help="Pages per worker when using parallel processing")
+    parser.add_argument("--concurrency", type=int, default=1,
+                       help="Concurrent browser contexts per process (async Playwright; 1=serial, polite: 3-5)")
     
     # Archiving options
     parser.add_argument("--archive-granularity", choices=["day", "week", "month", "timestamp"], default=None,
@@ -1008,7 +1564,10 @@ def main():
 
     # Resume / overwrite options
     parser.add_argument("--resume", action="store_true", help="Skip pages that already have output files")
-    parser.add_argument("--overwrite", action="store_true", help="Force re-scrape and overwrite existing output files")
+    parser.add_argument("--compress-pages", action="store_true", default=None,
+                       help="Write output/pages/page_<N>.json.zst (zstd) instead of plain JSON (env DISCOVERY_COMPRESS_PAGES)")
+    parser.add_argument("--overwrite", "--force", dest="overwrite", action="store_true",
+                       help="Force re-scrape and overwrite existing output files")
 
     args = parser.parse_args()
     
@@ -1019,12 +1578,18 @@ def main():
         browser_engine=args.browser_engine,
         multi_engine=args.multi_engine,
         disable_images=args.disable_images,
+        single_process=args.single_process,
         wait_for_internet=args.wait_for_internet,
+        http_first=args.http_first,
+        storage_state_path=(EnhancedScraperConfig.storage_state_path if args.storage_state_path is None
+                            else args.storage_state_path or None),
         archive_granularity=(args.archive_granularity or os.getenv("ARCHIVE_GRANULARITY", "week")),
         archive_overwrite_same_period=args.archive_overwrite_same_period,
         archive_rotate_depth=int(os.getenv("ARCHIVE_ROTATE_DEPTH", str(args.archive_rotate_depth))),
         resume=args.resume,
         overwrite=args.overwrite,
+        compress_pages=(args.compress_pages if args.compress_pages is not None else EnhancedScraperConfig.compress_pages),
+        max_concurrency=max(1, args.concurrency),
     )
     
     print(f"🚀 Enhanced Community Ranking Discovery")
@@ -1033,6 +1598,8 @@ def main():
     print(f"   Browser: {config.browser_engine} (multi-engine: {config.multi_engine})")
     print(f"   Proxy: {config.proxy_server or 'None (local IP)'}")
     print(f"   Features: images={'enabled' if not config.disable_images else 'blocked'}, connectivity_monitoring={config.wait_for_internet}")
+    if config.compress_pages and not _HAS_ZSTD:
+        print("⚠️  --compress-pages needs the zstandard package; writing plain JSON")
     
     if args.workers > 1:
         # Parallel processing with workers
@@ -1058,7 +1625,14 @@ def main():
             "browser_engine": config.browser_engine,
             "multi_engine": config.multi_engine,
             "disable_images": config.disable_images,
+            "single_process": config.single_process,
             "wait_for_internet": config.wait_for_internet,
+            "max_concurrency": config.max_concurrency,
+            "http_first": config.http_first,
+            "storage_state_path": config.storage_state_path,
+            "resume": config.resume,
+            "compress_pages": config.compress_pages,
+            "overwrite": config.overwrite,
         }
         
         try:
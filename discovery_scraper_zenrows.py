@@ -7,9 +7,15 @@ Scrapes subreddit ranking pages from 1 to 1000 using ZenRows
 import time
 import json
 import os
+import importlib.util
 from datetime import datetime
 from zenrows import ZenRowsClient
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Parser used by both scrapers below: lxml when installed, else the stdlib html.parser
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+COMMUNITY_STRAINER = SoupStrainer('div', attrs={'data-community-id': True})
 
 class RedditCommunitiesScraper:
     def __init__(self, api_key):
@@ -52,12 +58,13 @@ class RedditCommunitiesScraper:
     
     def parse_subreddit_data(self, html_content, page_number):
         """Parse subreddit data from the HTML content"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=COMMUNITY_STRAINER)
         
         # Look for community divs with data-community-id attribute
         community_divs = soup.find_all('div', {'data-community-id': True})
         
         subreddits = []
+        scraped_at = datetime.now().isoformat()
         
         for i, div in enumerate(community_divs):
             try:
@@ -90,7 +97,7 @@ class RedditCommunitiesScraper:
                     'displayed_count': displayed_count,
                     'description': description,
                     'icon_url': icon_url,
-                    'scraped_at': datetime.now().isoformat()
+                    'scraped_at': scraped_at
                 }
                 
                 subreddits.append(subreddit_data)
@@ -264,7 +271,7 @@ class RedditCommunitiesScraper:
     
     def parse_communities_data(self, html_content: str) -> List[Dict]:
         """Parse subreddit data from HTML content"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, HTML_PARSER)
         communities = []
         
         # Look for script tags containing JSON data
@@ -411,7 +418,7 @@ def test_parser():
             print("No communities found. Let's analyze the HTML structure...")
             
             # Let's look at the HTML structure to understand how to parse it
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, HTML_PARSER)
             
             # Check for script tags with data
             scripts = soup.find_all('script')
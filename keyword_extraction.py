@@ -9,6 +9,7 @@ Keyword extraction for subreddit pages.
 Usage examples:
   python3 keyword_extraction.py --input-file output/pages/page_60.json
   python3 keyword_extraction.py --input-glob "output/pages/page_*.json" --topk 25
+  python3 keyword_extraction.py --input-glob "output/pages/page_*.json" --workers 8
   python3 keyword_extraction.py --input-file output/pages/page_60.json --output-dir output/keywords
 
 Output:
@@ -38,14 +39,20 @@ Design notes:
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 import math
 import os
 import re
 import sys
+import zlib
+from array import array
 from collections import Counter, defaultdict
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from glob import glob
+from operator import itemgetter
 from typing import Dict, Iterable, List, Tuple, Optional, Set
 from datetime import datetime, timezone, timedelta
 import numpy as np
@@ -59,6 +66,14 @@ try:
 except Exception:
     _HAS_ST = False
 
+# Optional fast JSON parser/serializer (C extension); stdlib json is the fallback
+_HAS_ORJSON = False
+try:
+    import orjson as _orjson  # type: ignore
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
+
 # Lazy model cache for embeddings
 _EMBED_MODEL_CACHE: Dict[str, "SentenceTransformer"] = {}
 
@@ -165,7 +180,7 @@ DEFAULT_COMPOSE_SUBJECTS_BONUS = 1.25
 
 
 # Curated light stopword list: English + subreddit boilerplate
-STOPWORDS = {
+STOPWORDS = frozenset({
     # Articles, pronouns, prepositions, auxiliaries, etc.
     "a", "an", "the", "and", "or", "but", "if", "then", "else", "than",
     "for", "to", "from", "in", "on", "at", "of", "by", "with", "without",
@@ -215,7 +230,7 @@ STOPWORDS = {
 
     # Generic colloquialisms often present in posts
     "guys",
-}
+})
 
 # Common suffix/prefix clues to heuristically segment concatenated names (lowercase)
 HEURISTIC_SUFFIXES = [
@@ -254,19 +269,38 @@ EXPANSIONS = {
 # -----------------------
 
 _ws_re = re.compile(r"\s+")
-# Split camelCase, PascalCase, digit transitions, and acronym-to-Word (e.g., UKGardening -> UK | Gardening)
-_camel_boundary_re = re.compile(
-    r"(?<=[a-z0-9])(?=[A-Z])"          # lower/digit -> Upper
-    r"|(?<=[A-Z])(?=[A-Z][a-z])"       # ACRONYM -> ProperCase boundary
-    r"|(?<=[A-Za-z])(?=[0-9])"         # letter -> digit
-    r"|(?<=[0-9])(?=[A-Za-z])"         # digit -> letter
+# Parts of camelCase, PascalCase, digit transitions, and acronym-to-Word (e.g., UKGardening -> UK | Gardening).
+# Matched directly with findall; anything outside [0-9A-Za-z] acts as a separator.
+_camel_part_re = re.compile(
+    r"[A-Z]+(?=[A-Z][a-z])"            # ACRONYM before a ProperCase word
+    r"|[A-Z]?[a-z]+"                   # lower or Capitalized word
+    r"|[A-Z]+"                         # trailing/standalone ACRONYM
+    r"|[0-9]+"                         # digit run
 )
+_punct_re = re.compile(r"[^0-9\w\s]+", re.UNICODE)
+_vowel_consonant_re = re.compile(r"[aeiouy][^aeiouy]")
+_rslash_prefix_re = re.compile(r"^r/+", re.IGNORECASE)
+_r_name_re = re.compile(r"r/([^/\s]+)", re.IGNORECASE)
+_r_url_re = re.compile(r"/r/([^/\s]+)/?", re.IGNORECASE)
+_r_prefix_re = re.compile(r"^r/")
+_json_ext_re = re.compile(r"\.json$", re.IGNORECASE)
+_frontpage_path_re = re.compile(r"/subreddits/([^/]+)/frontpage\.json$")
+_lives_suffix_re = re.compile(r"lives$")
 
 
 def normalize_space(s: str) -> str:
     return _ws_re.sub(" ", s).strip()
 
 
+# ASCII fast path for tokenize_simple: a single translate() lowercases word characters and
+# turns everything else except whitespace (punctuation, "_", "-", control chars) into a space.
+_ASCII_TOKEN_TABLE = str.maketrans({
+    chr(c): (chr(c).lower() if chr(c).isalnum() else " ")
+    for c in range(128)
+    if not chr(c).isspace()
+})
+
+
 def tokenize_simple(text: str) -> List[str]:
     """
     Unicode-aware word tokenizer. Keeps letters and digits, drops underscores and punctuation.
@@ -274,10 +308,12 @@ def tokenize_simple(text: str) -> List[str]:
     """
     if not text:
         return []
+    if text.isascii():
+        return text.translate(_ASCII_TOKEN_TABLE).split()
     # Replace underscores/hyphens with space to avoid glue
     text = text.replace("_", " ").replace("-", " ")
     # Keep letters/digits; Python \w includes underscore, so strip it manually
-    text = re.sub(r"[^0-9\w\s]+", " ", text, flags=re.UNICODE)  # drop punctuation, keep word chars
+    text = _punct_re.sub(" ", text)  # drop punctuation, keep word chars
     text = text.replace("_", " ")
     text = normalize_space(text.lower())
     if not text:
@@ -295,46 +331,64 @@ def split_camel_and_digits(token: str) -> List[str]:
         return []
     if token.isupper() and len(token) <= 5:
         return [token]  # keep acronym
-    parts = _camel_boundary_re.split(token)
-    # Some parts may still include caps at start; lower case them for normalization
-    out = []
-    for p in parts:
-        if not p:
-            continue
-        out.extend(re.split(r"[^0-9A-Za-z]+", p))
-    out = [x for x in out if x]
-    return out
+    return _camel_part_re.findall(token)
+
+
+# Suffix lookup grouped by length: one slice + dict probe per distinct suffix length
+# instead of an endswith() per suffix. Values are list positions, so the earliest
+# listed suffix still wins if entries ever overlap.
+_HEURISTIC_SUFFIX_INDEX: Dict[str, int] = {
+    suf: i for i, suf in reversed(list(enumerate(HEURISTIC_SUFFIXES)))
+}
+_HEURISTIC_SUFFIX_LENS = sorted({len(s) for s in _HEURISTIC_SUFFIX_INDEX if s})
 
 
-def heuristic_segment_lower(token: str) -> List[str]:
+def _match_heuristic_suffix(t: str) -> Optional[str]:
+    """
+    Return the first HEURISTIC_SUFFIXES entry that t ends with, leaving a head longer than 2 chars.
+    """
+    best: Optional[str] = None
+    best_i = len(HEURISTIC_SUFFIXES)
+    n = len(t)
+    for k in _HEURISTIC_SUFFIX_LENS:
+        if n <= k + 2:
+            break
+        suf = t[n - k:]
+        i = _HEURISTIC_SUFFIX_INDEX.get(suf)
+        if i is not None and i < best_i:
+            best, best_i = suf, i
+    return best
+
+
+@lru_cache(maxsize=100_000)
+def heuristic_segment_lower(token: str) -> Tuple[str, ...]:
     """
     Very lightweight heuristic to segment a long lowercase token by common suffixes.
     Example: southernfood -> ["southern", "food"], rangersfc -> ["rangers", "fc"]
     """
     if not token or not token.isalpha():
-        return [token]
+        return (token,)
     if len(token) <= 8:
-        return [token]
+        return (token,)
     # Try repeatedly peeling known suffixes
     parts = []
     t = token
     changed = True
     while changed:
         changed = False
-        for suf in HEURISTIC_SUFFIXES:
-            if t.endswith(suf) and len(t) > len(suf) + 2:
-                head = t[: len(t) - len(suf)]
-                parts.append(head)
-                parts.append(suf)
-                t = ""  # consumed
-                changed = True
-                break
+        suf = _match_heuristic_suffix(t)
+        if suf:
+            head = t[: len(t) - len(suf)]
+            parts.append(head)
+            parts.append(suf)
+            t = ""  # consumed
+            changed = True
         # If not matched, attempt a middle split at most once: at vowels boundary
         if not changed and t:
             # find a boundary near the middle at a vowel transition: e.g., glutenfree -> gluten free
             mid = len(t) // 2
             # search rightwards for a vowel boundary
-            m = re.search(r"[aeiouy][^aeiouy]", t[mid:])
+            m = _vowel_consonant_re.search(t[mid:])
             if m:
                 pos = mid + m.end() - 1
                 if 3 <= pos <= len(t) - 3:
@@ -343,7 +397,7 @@ def heuristic_segment_lower(token: str) -> List[str]:
                     t = ""
                     changed = True
     if not parts:
-        return [token]
+        return (token,)
     # parts might include empty strings if weird split - filter
     parts = [p for p in parts if p]
     # If we produced 3+ pieces by repeated splits, flatten: re-segment each recursively if needed
@@ -353,23 +407,24 @@ def heuristic_segment_lower(token: str) -> List[str]:
             final.extend(heuristic_segment_lower(p))
         else:
             final.append(p)
-    return final
+    return tuple(final)
 
 
-def segment_token_lower(token: str) -> List[str]:
+@lru_cache(maxsize=100_000)
+def segment_token_lower(token: str) -> Tuple[str, ...]:
     """
     Try to segment a glued lowercase token into natural-language words using
     optional libraries, then fall back to heuristic segmentation.
     """
     if not token or not token.isalpha() or not token.islower() or len(token) < 9:
-        return [token]
+        return (token,)
     # Try wordsegment
     if _HAS_WORDSEGMENT:
         try:
             _ensure_wordsegment_loaded()
             segs = _ws_segment(token)
             if segs and len(segs) >= 2:
-                return [s.lower() for s in segs if s]
+                return tuple(s.lower() for s in segs if s)
         except Exception:
             pass
     # Try wordninja
@@ -377,7 +432,7 @@ def segment_token_lower(token: str) -> List[str]:
         try:
             segs = _wordninja.split(token)
             if segs and len(segs) >= 2:
-                return [s.lower() for s in segs if s]
+                return tuple(s.lower() for s in segs if s)
         except Exception:
             pass
     # Fallback heuristic
@@ -391,36 +446,45 @@ def expand_token(token: str) -> List[str]:
     return EXPANSIONS.get(token.lower(), [])
 
 
+# Short tokens kept despite DEFAULT_MIN_TOKEN_LEN
+_SHORT_TOKEN_ALLOWLIST = frozenset({"ai", "vr", "uk", "us", "eu", "3d"})
+
+
+def _filter_lower_tokens(tokens: Iterable[str], extra_stopwords: Optional[Set[str]] = None) -> List[str]:
+    """
+    filter_stop_tokens for tokens that are already lowercase (tokenize_simple output):
+    one pass, no per-token lower() copy. Numeric-only tokens (years, digit runs) are dropped.
+    """
+    extra = extra_stopwords or ()
+    min_len = DEFAULT_MIN_TOKEN_LEN
+    return [
+        t for t in tokens
+        if t not in STOPWORDS
+        and t not in extra
+        and not t.isdigit()
+        and (len(t) >= min_len or t in _SHORT_TOKEN_ALLOWLIST)
+    ]
+
+
 def filter_stop_tokens(tokens: Iterable[str], extra_stopwords: Optional[Set[str]] = None) -> List[str]:
-    out = []
-    extra = extra_stopwords or set()
-    for t in tokens:
-        lt = t.lower()
-        if lt in STOPWORDS or lt in extra:
-            continue
-        # Drop numeric-only tokens and common years
-        if lt.isdigit():
-            continue
-        if re.fullmatch(r"(19|20)\d{2}", lt):
-            continue
-        if re.fullmatch(r"\d{2,}", lt):
-            continue
-        if len(lt) < DEFAULT_MIN_TOKEN_LEN and lt not in {"ai", "vr", "uk", "us", "eu", "3d"}:
-            continue
-        out.append(lt)
-    return out
+    return _filter_lower_tokens([t.lower() for t in tokens], extra_stopwords)
 
 
 def tokens_to_ngrams(tokens: List[str], max_n: int) -> Counter:
-    grams = Counter()
+    """
+    Count contiguous 1..max_n grams. Each order is fed to Counter.update as one
+    iterator of zipped windows, so the counting loop runs in C; insertion order
+    (all unigrams, then bigrams, ...) matches a plain nested loop.
+    """
+    if max_n < 1:
+        return Counter()
+    grams = Counter(tokens)
     n = len(tokens)
-    for k in range(1, max_n + 1):
+    for k in range(2, max_n + 1):
         if n < k:
             break
-        for i in range(0, n - k + 1):
-            gram = " ".join(tokens[i : i + k])
-            if gram:
-                grams[gram] += 1
+        grams.update(map(" ".join, zip(*[tokens[j:] for j in range(k)])))
+    grams.pop("", None)
     return grams
 
 
@@ -428,7 +492,8 @@ def tokens_to_ngrams(tokens: List[str], max_n: int) -> Counter:
 # Name parsing
 # -----------------------
 
-def extract_name_terms(raw_name: str) -> List[str]:
+@lru_cache(maxsize=200_000)
+def extract_name_terms(raw_name: str) -> Tuple[str, ...]:
     """
     Extract keywords from a subreddit name string like 'r/Crossdressing_support', 'r/rangersfc', 'r/TwoandaHalfMen'.
 
@@ -438,13 +503,14 @@ def extract_name_terms(raw_name: str) -> List[str]:
     - for long lowercase runs, use heuristic segmentation
     - add acronym expansions
     - return deduplicated lowercased tokens and common bigrams for better phrasing
+      (as a tuple: results are cached and shared, so callers must not mutate them)
     """
     if not raw_name:
-        return []
+        return ()
 
     name = raw_name.strip()
     # remove r/ prefix and trailing slash
-    name = re.sub(r"^r/+", "", name, flags=re.IGNORECASE)
+    name = _rslash_prefix_re.sub("", name)
     name = name.rstrip("/")
 
     # normalize delimiters
@@ -452,7 +518,7 @@ def extract_name_terms(raw_name: str) -> List[str]:
     name = normalize_space(name)
 
     # split tokens (keep case for camel split)
-    rough_tokens = re.split(r"\s+", name)
+    rough_tokens = _ws_re.split(name)
 
     split_tokens: List[str] = []
     for tok in rough_tokens:
@@ -502,9 +568,10 @@ def extract_name_terms(raw_name: str) -> List[str]:
             seen.add(lt)
             ordered_terms.append(lt)
 
-    return ordered_terms
+    return tuple(ordered_terms)
 
 
+@lru_cache(maxsize=200_000)
 def extract_name_full_phrase(raw_name: str) -> Tuple[str, str]:
     """
     Build the WHOLE phrase from the subreddit name by robust splitting/segmentation.
@@ -517,12 +584,12 @@ def extract_name_full_phrase(raw_name: str) -> Tuple[str, str]:
         return "", ""
 
     name = raw_name.strip()
-    name = re.sub(r"^r/+", "", name, flags=re.IGNORECASE)
+    name = _rslash_prefix_re.sub("", name)
     name = name.rstrip("/")
     name = name.replace("_", " ").replace("-", " ").replace(".", " ")
     name = normalize_space(name)
 
-    rough_tokens = re.split(r"\s+", name)
+    rough_tokens = _ws_re.split(name)
 
     lower_tokens: List[str] = []
     cased_tokens: List[str] = []
@@ -572,9 +639,7 @@ def extract_desc_terms(description: str, max_ngram: int) -> List[str]:
     """
     if not description:
         return []
-    tokens = tokenize_simple(description)
-    tokens = filter_stop_tokens(tokens)
-    return tokens
+    return _filter_lower_tokens(tokenize_simple(description))
 
 
 # -----------------------
@@ -609,27 +674,29 @@ def _parse_scraped_at(d: dict) -> datetime:
     return datetime.now(timezone.utc)
 
 
+@lru_cache(maxsize=200_000)
 def canonicalize_subreddit_key(name: str, url: str) -> str:
     """
     Build a canonical lowercase key (e.g., 'valorant') from subreddit name or URL.
     """
     # Try name like "r/VALORANT"
     if name:
-        m = re.search(r"r/([^/\s]+)", name, flags=re.IGNORECASE)
+        m = _r_name_re.search(name)
         if m:
             return m.group(1).strip("/").lower()
         name2 = name.strip().strip("/").lower()
-        return re.sub(r"^r/", "", name2)
+        return _r_prefix_re.sub("", name2)
 
     # Try URL like "https://www.reddit.com/r/VALORANT"
     if url:
-        m = re.search(r"/r/([^/\s]+)/?", url, flags=re.IGNORECASE)
+        m = _r_url_re.search(url)
         if m:
             return m.group(1).lower()
 
     return ""
 
 
+@lru_cache(maxsize=200_000)
 def subreddit_folder_from_name(name: str) -> str:
     """
     Derive folder name from display name (preserve casing if present).
@@ -637,7 +704,7 @@ def subreddit_folder_from_name(name: str) -> str:
     """
     if not name:
         return ""
-    n = re.sub(r"^r/+", "", name.strip(), flags=re.IGNORECASE)
+    n = _rslash_prefix_re.sub("", name.strip())
     return n.strip("/")
 
 
@@ -649,23 +716,72 @@ def _tokenize_post_text(title: str, preview: str, posts_extra_stopwords: Optiona
         parts.append(preview)
     if not parts:
         return []
-    tokens = tokenize_simple(" ".join(parts))
-    tokens = filter_stop_tokens(tokens, extra_stopwords=posts_extra_stopwords)
-    return tokens
+    return _filter_lower_tokens(tokenize_simple(" ".join(parts)), posts_extra_stopwords)
 
 
-def build_posts_docfreq(frontpage_paths: List[str], max_ngram: int, posts_extra_stopwords: Optional[Set[str]] = None, posts_phrase_stoplist: Optional[Set[str]] = None) -> Tuple[Counter, int]:
+class HashedDocFreq:
+    """
+    Fixed-size document-frequency table for the hashing-trick mode (--df-hash-bits).
+    Grams map to 2**bits buckets via CRC32 (stable across processes, unlike hash()),
+    so memory is O(buckets) instead of O(vocabulary). Grams sharing a bucket share its
+    DF, which can only overstate rarity-based pruning/IDF for colliding grams.
+    Mirrors the Counter API the DF passes and scorers use: update() and get().
+    """
+
+    _FLUSH_AT = 1 << 20
+
+    def __init__(self, bits: int):
+        self.mask = (1 << int(bits)) - 1
+        self.counts = np.zeros(self.mask + 1, dtype=np.int32)
+        self._pending = array("q")
+
+    def _bucket(self, gram: str) -> int:
+        return zlib.crc32(gram.encode("utf-8")) & self.mask
+
+    def update(self, grams: Iterable[str]) -> None:
+        """
+        Add one document: +1 per distinct bucket touched (so bucket DF never exceeds N).
+        Buckets are batched and folded in with np.bincount.
+        """
+        self._pending.extend({self._bucket(g) for g in grams})
+        if len(self._pending) >= self._FLUSH_AT:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self.counts += np.bincount(
+                np.frombuffer(self._pending, dtype=np.int64),
+                minlength=self.mask + 1,
+            ).astype(np.int32)
+            self._pending = array("q")
+
+    def get(self, gram: str, default: int = 0) -> int:
+        self._flush()
+        df = int(self.counts[self._bucket(gram)])
+        return df if df else default
+
+    def __len__(self) -> int:
+        """Number of non-empty buckets (stands in for the vocabulary size)."""
+        self._flush()
+        return int(np.count_nonzero(self.counts))
+
+    def __getstate__(self):
+        self._flush()
+        return self.__dict__
+
+
+def build_posts_docfreq(frontpage_paths: List[str], max_ngram: int, posts_extra_stopwords: Optional[Set[str]] = None, posts_phrase_stoplist: Optional[Set[str]] = None, hash_bits: int = 0) -> Tuple[Counter, int]:
     """
     Compute DF across subreddits' frontpages for n-grams from post titles/previews.
     Returns (docfreq, total_docs) where total_docs = number of frontpage docs considered.
+    With hash_bits > 0, docfreq is a HashedDocFreq instead of a Counter.
     """
-    docfreq = Counter()
+    docfreq = HashedDocFreq(hash_bits) if hash_bits > 0 else Counter()
     total_docs = 0
 
     for p in frontpage_paths:
         try:
-            with open(p, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = load_json_file(p)
         except Exception:
             continue
         posts = data.get("posts") or []
@@ -677,18 +793,14 @@ def build_posts_docfreq(frontpage_paths: List[str], max_ngram: int, posts_extra_
             title = post.get("title", "") or ""
             preview = post.get("content_preview", "") or ""
             toks = _tokenize_post_text(title, preview, posts_extra_stopwords)
-            grams = tokens_to_ngrams(toks, max_ngram)
-            if posts_phrase_stoplist:
-                for pg in list(grams.keys()):
-                    if pg in posts_phrase_stoplist:
-                        del grams[pg]
-            for g in grams.keys():
-                grams_present.add(g)
+            grams_present.update(tokens_to_ngrams(toks, max_ngram).keys())
+        if posts_phrase_stoplist:
+            # Stoplisted phrases never count toward DF; drop them once per frontpage
+            grams_present.difference_update(posts_phrase_stoplist)
 
         if grams_present:
             total_docs += 1
-            for g in grams_present:
-                docfreq[g] += 1
+            docfreq.update(grams_present)
 
     return docfreq, total_docs
 
@@ -710,6 +822,7 @@ def compute_posts_tfidf_for_frontpage(
     generic_df_ratio: float = DEFAULT_POSTS_GENERIC_DF_RATIO,
     idf_power: float = DEFAULT_POSTS_IDF_POWER,
     engagement_alpha: float = DEFAULT_POSTS_ENGAGEMENT_ALPHA,
+    idf_table: Optional[List[float]] = None,
 ) -> Tuple[Counter, Counter]:
     """
     Compute posts TF-IDF with optional engagement blending and IDF damping.
@@ -722,6 +835,7 @@ def compute_posts_tfidf_for_frontpage(
         TF_post = count_grams_in_post * (base * recency)
 
     Returns (tfidf_scores, local_grams_tf) where local_grams_tf are raw bigram/trigram counts for composition.
+    idf_table: optional build_idf_table(N, idf_power) result, looked up by df.
     """
     posts = frontpage_data.get("posts") or []
     if not posts:
@@ -777,8 +891,11 @@ def compute_posts_tfidf_for_frontpage(
             df_ratio = (df / total_docs) if total_docs > 0 else 0.0
             if df_ratio >= generic_df_ratio:
                 continue
-        idf = math.log((1.0 + total_docs) / (1.0 + df)) + 1.0
-        idf_eff = idf ** max(0.0, float(idf_power))
+        if idf_table is not None and df < len(idf_table):
+            idf_eff = idf_table[df]
+        else:
+            idf = math.log((1.0 + total_docs) / (1.0 + df)) + 1.0
+            idf_eff = idf ** max(0.0, float(idf_power))
         boost = 1.0
         if n_words == 2:
             boost = posts_phrase_boost_bigram
@@ -793,8 +910,7 @@ def compute_posts_tfidf_for_frontpage(
             if ((g.count(" ") + 1) >= 2 and g not in tfidf)
         ]
         if candidates:
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            for g, tf in candidates[:ensure_k]:
+            for g, tf in heapq.nlargest(ensure_k, candidates, key=itemgetter(1)):
                 n_words = g.count(" ") + 1
                 boost = posts_phrase_boost_bigram if n_words == 2 else (
                     posts_phrase_boost_trigram if n_words == 3 else 1.0
@@ -842,6 +958,7 @@ def apply_anchored_variants_for_generic_posts_terms(
 # -----------------------
 # Theme-anchored composition helpers
 # -----------------------
+@lru_cache(maxsize=100_000)
 def _normalize_anchor_phrase_from_title(title: str) -> str:
     if not title:
         return ""
@@ -873,9 +990,9 @@ def _norm_nospace(s: Optional[str]) -> str:
     """
     if not s:
         return ""
-    ns = re.sub(r"\s+", "", s.strip().lower())
+    ns = _ws_re.sub("", s.strip().lower())
     # handle irregular plural: 'lives' -> 'life'
-    ns = re.sub(r"lives$", "life", ns)
+    ns = _lives_suffix_re.sub("life", ns)
     return ns
 
 def _equal_lex_loose(a: Optional[str], b: Optional[str]) -> bool:
@@ -982,8 +1099,7 @@ def compose_theme_anchored_from_posts(
     out = Counter()
     produced = 0
     # Select top-M seeds by the ordering signal
-    items = sorted(seed_scores_for_ordering.items(), key=lambda kv: kv[1], reverse=True)
-    seeds = items[: max(0, top_m)]
+    seeds = heapq.nlargest(max(0, top_m), seed_scores_for_ordering.items(), key=itemgetter(1))
 
     # Compute a single anchor factor per subreddit (depends only on anchor + corpus)
     factor = _compute_anchor_factor(
@@ -1118,14 +1234,15 @@ def _collect_present_grams(
                 present.add(g)
     return present
 
+@lru_cache(maxsize=200_000)
 def subreddit_display_key(name: str, url: str) -> str:
     # Extract displayed subreddit key (preserve casing), e.g., "CX5"
     if name:
-        m = re.search(r"r/([^/\s]+)", name, flags=re.IGNORECASE)
+        m = _r_name_re.search(name)
         if m:
             return m.group(1).strip("/")
     if url:
-        m = re.search(r"/r/([^/\s]+)/?", url, flags=re.IGNORECASE)
+        m = _r_url_re.search(url)
         if m:
             return m.group(1).strip("/")
     return ""
@@ -1198,18 +1315,21 @@ def _compose_rank_seeds_with_embed(seed_base: Counter, theme_text: str, model_na
 
 @dataclass
 class SubDoc:
+    # Explicit slots (dataclass(slots=True) needs Python 3.10): no per-instance __dict__
+    # for the many docs held by the pass-1/pass-2 cache and pickled to workers
+    __slots__ = ("community_id", "name", "url", "rank", "subscribers_count", "desc_text", "name_terms")
+
     community_id: str
     name: str
     url: str
     rank: int | None
     subscribers_count: int | None
     desc_text: str
-    name_terms: List[str]
+    name_terms: Tuple[str, ...]
 
 
 def iter_subreddits_from_file(path: str) -> Iterable[SubDoc]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_json_file(path)
     subs = data.get("subreddits", []) or []
     for s in subs:
         yield SubDoc(
@@ -1223,28 +1343,93 @@ def iter_subreddits_from_file(path: str) -> Iterable[SubDoc]:
         )
 
 
+# Parsed inputs shared by pass 1 and pass 2: path -> [(SubDoc, desc_token_ids)].
+# Descriptions are cached in packed form only: token IDs into a shared vocabulary
+# (4 bytes per token, one str per distinct token) and no raw desc_text.
+# Files are kept first-come until the doc budget is spent (never evicted), so the
+# second sequential sweep hits the cached prefix instead of thrashing an LRU.
+_INPUT_DOCS_CACHE: Dict[str, List[Tuple[SubDoc, array]]] = {}
+_INPUT_DOCS_CACHE_MAX = int(os.environ.get("INPUT_CACHE_MAX_DOCS", "200000") or 0)
+_input_docs_cached = 0
+_DESC_VOCAB: Dict[str, int] = {}
+_DESC_VOCAB_TERMS: List[str] = []
+
+
+def _encode_desc_tokens(tokens: List[str]) -> array:
+    ids = array("i")
+    for t in tokens:
+        tid = _DESC_VOCAB.get(t)
+        if tid is None:
+            tid = _DESC_VOCAB[t] = len(_DESC_VOCAB_TERMS)
+            _DESC_VOCAB_TERMS.append(t)
+        ids.append(tid)
+    return ids
+
+
+def load_and_tokenize(
+    path: str,
+    max_ngram: int,
+    keep: bool = False,
+    release: bool = False,
+) -> List[Tuple[SubDoc, List[str]]]:
+    """
+    Parse an input page once and tokenize each description, caching the result so
+    pass 2 reuses pass 1's JSON parse, name splitting and description tokens.
+
+    keep: cache this file even past the INPUT_CACHE_MAX_DOCS budget (single-input runs,
+    where pass 2 immediately re-reads the only file).
+    release: drop the cached entry once returned and never cache on a miss (pass 2 reads
+    each file exactly once).
+    """
+    global _input_docs_cached
+    hit = _INPUT_DOCS_CACHE.pop(path, None) if release else _INPUT_DOCS_CACHE.get(path)
+    if hit is not None:
+        terms = _DESC_VOCAB_TERMS
+        return [(sub, [terms[i] for i in ids]) for sub, ids in hit]
+    docs = [(sub, extract_desc_terms(sub.desc_text, max_ngram)) for sub in iter_subreddits_from_file(path)]
+    if not release and (keep or _input_docs_cached + len(docs) <= _INPUT_DOCS_CACHE_MAX):
+        _INPUT_DOCS_CACHE[path] = [
+            (replace(sub, desc_text=""), _encode_desc_tokens(tokens)) for sub, tokens in docs
+        ]
+        _input_docs_cached += len(docs)
+    return docs
+
+
 def build_docfreq(
     input_paths: List[str],
     max_ngram: int,
+    hash_bits: int = 0,
 ) -> Tuple[Counter, int]:
     """
     First pass: compute document frequency for description n-grams across all selected files.
-    Returns (docfreq Counter, total_docs N)
+    Returns (docfreq Counter, total_docs N); with hash_bits > 0, docfreq is a HashedDocFreq.
     """
-    docfreq = Counter()
+    docfreq = HashedDocFreq(hash_bits) if hash_bits > 0 else Counter()
     total_docs = 0
+    # A single input is re-read by pass 2 right away: always keep it buffered
+    keep = len(input_paths) == 1
 
     for p in input_paths:
-        for sub in iter_subreddits_from_file(p):
+        for _sub, tokens in load_and_tokenize(p, max_ngram, keep=keep):
             total_docs += 1
-            tokens = extract_desc_terms(sub.desc_text, max_ngram)
             grams = tokens_to_ngrams(tokens, max_ngram)
-            for g in grams.keys():
-                docfreq[g] += 1
+            # Each key appears once per doc, so a C-level update adds exactly +1 DF per gram
+            docfreq.update(grams.keys())
 
     return docfreq, total_docs
 
 
+def build_idf_table(total_docs: int, idf_power: float) -> List[float]:
+    """
+    Precompute damped IDF for every possible df in [0, N]:
+      table[df] = (log((1 + N) / (1 + df)) + 1) ** idf_power
+    df is bounded by N, so per-gram scoring becomes a list lookup instead of log + pow.
+    """
+    p = max(0.0, float(idf_power))
+    n = max(0, int(total_docs))
+    return [(math.log((1.0 + n) / (1.0 + df)) + 1.0) ** p for df in range(n + 1)]
+
+
 def compute_tfidf_per_doc(
     tokens: List[str],
     docfreq: Counter,
@@ -1253,6 +1438,8 @@ def compute_tfidf_per_doc(
     min_df_bigram: int,
     min_df_trigram: int,
     desc_idf_power: float = DEFAULT_DESC_IDF_POWER,
+    idf_table: Optional[List[float]] = None,
+    grams: Optional[Counter] = None,
 ) -> Counter:
     """
     Compute TF-IDF for description text of a single document.
@@ -1263,8 +1450,13 @@ def compute_tfidf_per_doc(
     Additionally prunes rare multi-grams:
       - bigrams kept only if df >= min_df_bigram
       - trigrams kept only if df >= min_df_trigram
+
+    idf_table: optional build_idf_table(N, desc_idf_power) result, looked up by df.
+    grams: optional precomputed tokens_to_ngrams(tokens, max_ngram), so callers that also need the
+    local n-gram counts build them only once.
     """
-    grams = tokens_to_ngrams(tokens, max_ngram)
+    if grams is None:
+        grams = tokens_to_ngrams(tokens, max_ngram)
     tfidf = Counter()
     for g, tf in grams.items():
         n_words = g.count(" ") + 1
@@ -1273,8 +1465,11 @@ def compute_tfidf_per_doc(
             continue
         if n_words == 3 and df < min_df_trigram:
             continue
-        idf = math.log((1.0 + total_docs) / (1.0 + df)) + 1.0
-        idf_eff = idf ** max(0.0, float(desc_idf_power))
+        if idf_table is not None and df < len(idf_table):
+            idf_eff = idf_table[df]
+        else:
+            idf = math.log((1.0 + total_docs) / (1.0 + df)) + 1.0
+            idf_eff = idf ** max(0.0, float(desc_idf_power))
         boost = 1.0
         if n_words == 2:
             boost = DEFAULT_DESC_PHRASE_BOOST_BIGRAM
@@ -1284,7 +1479,7 @@ def compute_tfidf_per_doc(
     return tfidf
 
 
-def score_name_terms(name_terms: List[str]) -> Counter:
+def score_name_terms(name_terms: Iterable[str]) -> Counter:
     """
     Assign base weights to name-derived terms.
     Heuristics:
@@ -1305,41 +1500,70 @@ def score_name_terms(name_terms: List[str]) -> Counter:
 
 
 def merge_sources(
-    items: List[Tuple[Counter, float, str]]
+    items: List[Tuple[Dict[str, float], float, str]]
 ) -> Dict[str, Tuple[float, str]]:
     """
     Merge multiple sources of scores.
-    items: list of (scores_counter, weight_multiplier, source_name)
+    items: list of (scores_mapping, weight_multiplier, source_name)
     Returns: term -> (score, source_string) where source_string is "name+description+posts" etc.
     """
-    out: Dict[str, Tuple[float, Set[str]]] = {}
+    # Scores and source memberships kept side by side: plain floats plus a small
+    # bitmask per term (bit i = i-th distinct source name), instead of a (float, set)
+    # tuple rebuilt on every merge.
+    scores_out: Dict[str, float] = {}
+    masks: Dict[str, int] = {}
+    src_names: List[str] = []
 
     for scores, w, src in items:
         if not scores or w <= 0:
             continue
+        if src in src_names:
+            bit = 1 << src_names.index(src)
+        else:
+            bit = 1 << len(src_names)
+            src_names.append(src)
+        if not scores_out:
+            # First contributing source: bulk-build both maps (no membership probes)
+            scores_out = {term: val * w for term, val in scores.items()}
+            masks = dict.fromkeys(scores_out, bit)
+            continue
         for term, val in scores.items():
             add = val * w
-            if term in out:
-                cur, srcs = out[term]
-                out[term] = (cur + add, srcs | {src})
+            if term in scores_out:
+                scores_out[term] += add
+                masks[term] |= bit
             else:
-                out[term] = (add, {src})
+                scores_out[term] = add
+                masks[term] = bit
 
-    # Convert source sets to joined string
+    # Convert source masks to joined strings (one join per distinct mask)
+    labels: Dict[int, str] = {}
     final: Dict[str, Tuple[float, str]] = {}
-    for term, (score, srcs) in out.items():
-        # normalize ordering for determinism
-        src_str = "+".join(sorted(srcs))
+    for term, score in scores_out.items():
+        mask = masks[term]
+        src_str = labels.get(mask)
+        if src_str is None:
+            # normalize ordering for determinism
+            src_str = "+".join(sorted(n for i, n in enumerate(src_names) if mask >> i & 1))
+            labels[mask] = src_str
         final[term] = (score, src_str)
     return final
 
 
-def normalize_weights(term_scores: Dict[str, Tuple[float, str]]) -> List[Tuple[str, float, float, str]]:
+def normalize_weights(
+    term_scores: Dict[str, Tuple[float, str]],
+    topk: Optional[int] = None,
+) -> List[Tuple[str, float, float, str]]:
     """
     Normalize combined scores so weights sum to 1.0 per document.
-    Returns list of tuples (term, weight, raw_score, source)
+    Returns list of tuples (term, weight, raw_score, source) sorted by raw score desc.
+    With topk, only the top-K are returned (heap selection; same order as the full sort),
+    while weights still use the total over all terms.
     """
     total = sum(v for v, _ in term_scores.values()) or 1.0
+    if topk is not None and topk >= 0:
+        best = heapq.nlargest(topk, term_scores.items(), key=lambda kv: kv[1][0])
+        return [(term, score / total, score, source) for term, (score, source) in best]
     items = []
     for term, (score, source) in term_scores.items():
         items.append((term, score / total, score, source))
@@ -1372,7 +1596,7 @@ def _build_theme_text(full_lower: str, desc_tfidf: Counter, top_desc_k: int) ->
     if full_lower:
         parts.append(full_lower)
     if desc_tfidf and top_desc_k > 0:
-        for g, _ in sorted(desc_tfidf.items(), key=lambda x: x[1], reverse=True)[:top_desc_k]:
+        for g, _ in heapq.nlargest(top_desc_k, desc_tfidf.items(), key=itemgetter(1)):
             parts.append(g)
     return " ; ".join(parts)
 
@@ -1462,9 +1686,38 @@ def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+def load_json_file(path: str):
+    """
+    Parse a JSON file, using orjson when available.
+    Falls back to stdlib json for inputs orjson rejects (e.g., NaN/Infinity literals).
+    """
+    if _HAS_ORJSON:
+        with open(path, "rb") as f:
+            raw = f.read()
+        try:
+            return _orjson.loads(raw)
+        except ValueError:
+            return json.loads(raw.decode("utf-8"))
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dump_json_line(obj) -> bytes:
+    """
+    Serialize one NDJSON record (UTF-8, compact separators, trailing newline).
+    Uses orjson when available; the stdlib fallback emits the same layout.
+    """
+    if _HAS_ORJSON:
+        try:
+            return _orjson.dumps(obj, option=_orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
 def out_path_for_input(output_dir: str, input_path: str) -> str:
     base = os.path.basename(input_path)
-    base = re.sub(r"\.json$", "", base, flags=re.IGNORECASE)
+    base = _json_ext_re.sub("", base)
     return os.path.join(output_dir, f"{base}.keywords.jsonl")
 
 
@@ -1479,7 +1732,7 @@ def _build_frontpage_index(frontpage_glob: Optional[str]) -> Tuple[Dict[str, str
     index: Dict[str, str] = {}
     for p in paths:
         # Expect .../output/subreddits/NAME/frontpage.json
-        m = re.search(r"/subreddits/([^/]+)/frontpage\.json$", p)
+        m = _frontpage_path_re.search(p)
         if not m:
             continue
         folder = m.group(1)
@@ -1488,6 +1741,132 @@ def _build_frontpage_index(frontpage_glob: Optional[str]) -> Tuple[Dict[str, str
     return index, paths
 
 
+@dataclass
+class Pass1State:
+    """
+    Corpus-wide results of passes 0/1 that every pass-2 file reads (never mutated).
+    """
+    posts_extra_stopwords: Set[str]
+    posts_phrase_stoplist: Set[str]
+    frontpage_index: Dict[str, str]
+    posts_docfreq: Counter
+    posts_total_docs: int
+    docfreq: Counter
+    total_docs: int
+    desc_idf_table: List[float]
+    posts_idf_table: Optional[List[float]]
+
+
+def _prepare_pass1(
+    input_paths: List[str],
+    max_ngram: int,
+    frontpage_glob: Optional[str],
+    posts_stopwords_extra_path: Optional[str],
+    posts_phrase_stoplist_path: Optional[str],
+    desc_idf_power: float,
+    posts_idf_power: float,
+    df_hash_bits: int = 0,
+) -> Pass1State:
+    """
+    Load optional stoplists, then build the posts DF (pass 0) and description DF (pass 1).
+    """
+    # Optional: load extra posts stopwords from file
+    posts_extra_stopwords_set: Set[str] = set()
+    if posts_stopwords_extra_path:
+        try:
+            with open(posts_stopwords_extra_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    # allow comments and comma/space separated entries
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    for tok in re.split(r"[,\s]+", line):
+                        tok = tok.strip().lower()
+                        if tok and not tok.startswith("#"):
+                            posts_extra_stopwords_set.add(tok)
+            print(f"[posts:stopwords] loaded {len(posts_extra_stopwords_set)} extra posts stopwords from {posts_stopwords_extra_path}", file=sys.stderr)
+        except Exception as e:
+            print(f"[posts:stopwords] failed to load extra stopwords from {posts_stopwords_extra_path}: {e}", file=sys.stderr)
+
+    # Optional: load posts phrase stoplist (bigrams/trigrams to exclude)
+    posts_phrase_stoplist_set: Set[str] = set()
+    if posts_phrase_stoplist_path:
+        try:
+            with open(posts_phrase_stoplist_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip().lower()
+                    if not line or line.startswith("#"):
+                        continue
+                    # normalize internal whitespace
+                    line = re.sub(r"\s+", " ", line)
+                    posts_phrase_stoplist_set.add(line)
+            print(f"[posts:phrases] loaded {len(posts_phrase_stoplist_set)} stoplist phrase(s) from {posts_phrase_stoplist_path}", file=sys.stderr)
+        except Exception as e:
+            print(f"[posts:phrases] failed to load phrase stoplist from {posts_phrase_stoplist_path}: {e}", file=sys.stderr)
+
+    # Pass 0 (optional): posts DF across frontpages
+    frontpage_index: Dict[str, str] = {}
+    frontpage_paths: List[str] = []
+    posts_docfreq: Counter = Counter()
+    posts_total_docs: int = 0
+    if frontpage_glob:
+        print(f"[posts:pass1] building posts docfreq over glob={frontpage_glob!r} ...", file=sys.stderr)
+        frontpage_index, frontpage_paths = _build_frontpage_index(frontpage_glob)
+        posts_docfreq, posts_total_docs = build_posts_docfreq(
+            frontpage_paths, max_ngram, posts_extra_stopwords_set, posts_phrase_stoplist_set, hash_bits=df_hash_bits
+        )
+        print(f"[posts:pass1] total_frontpages={posts_total_docs:,}, unique_terms={len(posts_docfreq):,}", file=sys.stderr)
+
+    # Pass 1: global docfreq across selected inputs (for description n-grams)
+    print(f"[desc:pass1] building docfreq over {len(input_paths)} file(s)...", file=sys.stderr)
+    docfreq, total_docs = build_docfreq(input_paths, max_ngram, hash_bits=df_hash_bits)
+    print(f"[desc:pass1] total_docs={total_docs:,}, unique_terms={len(docfreq):,}", file=sys.stderr)
+
+    # IDF depends only on df once N is fixed: one log/pow per possible df value
+    desc_idf_table = build_idf_table(total_docs, desc_idf_power)
+    posts_idf_table = build_idf_table(posts_total_docs, posts_idf_power) if posts_total_docs > 0 else None
+
+    return Pass1State(
+        posts_extra_stopwords=posts_extra_stopwords_set,
+        posts_phrase_stoplist=posts_phrase_stoplist_set,
+        frontpage_index=frontpage_index,
+        posts_docfreq=posts_docfreq,
+        posts_total_docs=posts_total_docs,
+        docfreq=docfreq,
+        total_docs=total_docs,
+        desc_idf_table=desc_idf_table,
+        posts_idf_table=posts_idf_table,
+    )
+
+
+# Pass-2 worker state, set once per worker process by _init_pass2_worker
+_PASS2_OPTS: Dict[str, object] = {}
+_PASS2_STATE: Optional[Pass1State] = None
+
+
+def _init_pass2_worker(opts: Dict[str, object], state: Pass1State) -> None:
+    global _PASS2_OPTS, _PASS2_STATE
+    _PASS2_OPTS = opts
+    _PASS2_STATE = state
+
+
+def _pass2_one_file(inp: str) -> str:
+    process_inputs([inp], pass1_state=_PASS2_STATE, **_PASS2_OPTS)  # type: ignore[arg-type]
+    return inp
+
+
+def _run_pass2_pool(input_paths: List[str], opts: Dict[str, object], state: Pass1State, workers: int) -> None:
+    """
+    Score and write each input file in its own worker process. Files are independent once
+    pass 1 is done, and the pass-1 state is shipped to each worker once (initializer).
+    """
+    n = max(1, min(int(workers), len(input_paths)))
+    print(f"[pass2] processing {len(input_paths)} file(s) across {n} worker process(es)", file=sys.stderr)
+    with ProcessPoolExecutor(max_workers=n, initializer=_init_pass2_worker, initargs=(opts, state)) as ex:
+        for _ in ex.map(_pass2_one_file, input_paths):
+            pass
+
+
 def process_inputs(
     input_paths: List[str],
     output_dir: str,
@@ -1543,66 +1922,53 @@ def process_inputs(
     compose_anchor_max_per_sub: int = DEFAULT_COMPOSE_ANCHOR_MAX_PER_SUB,
     compose_anchor_min_base_score: float = DEFAULT_COMPOSE_ANCHOR_MIN_BASE_SCORE,
     compose_anchor_max_ratio: float = DEFAULT_COMPOSE_ANCHOR_MAX_RATIO,
+    # Hashing-trick DF tables (optional; 0 = exact Counter vocabularies)
+    df_hash_bits: int = 0,
+    # Parallel pass 2 (optional)
+    workers: int = 1,
+    pass1_state: Optional[Pass1State] = None,
 ) -> None:
+    # Keyword options exactly as passed (captured before any other local exists),
+    # so pass-2 workers can re-enter process_inputs for a single file
+    opts = {k: v for k, v in locals().items() if k not in ("input_paths", "workers", "pass1_state")}
+
     if not input_paths:
         print("No input files matched.", file=sys.stderr)
         return
 
     ensure_dir(output_dir)
 
-    # Optional: load extra posts stopwords from file
-    posts_extra_stopwords_set: Set[str] = set()
-    if posts_stopwords_extra_path:
-        try:
-            with open(posts_stopwords_extra_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    # allow comments and comma/space separated entries
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    for tok in re.split(r"[,\s]+", line):
-                        tok = tok.strip().lower()
-                        if tok and not tok.startswith("#"):
-                            posts_extra_stopwords_set.add(tok)
-            print(f"[posts:stopwords] loaded {len(posts_extra_stopwords_set)} extra posts stopwords from {posts_stopwords_extra_path}", file=sys.stderr)
-        except Exception as e:
-            print(f"[posts:stopwords] failed to load extra stopwords from {posts_stopwords_extra_path}: {e}", file=sys.stderr)
+    if pass1_state is None:
+        pass1_state = _prepare_pass1(
+            input_paths,
+            max_ngram,
+            frontpage_glob,
+            posts_stopwords_extra_path,
+            posts_phrase_stoplist_path,
+            desc_idf_power,
+            posts_idf_power,
+            df_hash_bits,
+        )
 
-    # Optional: load posts phrase stoplist (bigrams/trigrams to exclude)
-    posts_phrase_stoplist_set: Set[str] = set()
-    if posts_phrase_stoplist_path:
-        try:
-            with open(posts_phrase_stoplist_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip().lower()
-                    if not line or line.startswith("#"):
-                        continue
-                    # normalize internal whitespace
-                    line = re.sub(r"\s+", " ", line)
-                    posts_phrase_stoplist_set.add(line)
-            print(f"[posts:phrases] loaded {len(posts_phrase_stoplist_set)} stoplist phrase(s) from {posts_phrase_stoplist_path}", file=sys.stderr)
-        except Exception as e:
-            print(f"[posts:phrases] failed to load phrase stoplist from {posts_phrase_stoplist_path}: {e}", file=sys.stderr)
+    # Pass 2 (optional): fan files out to worker processes, each re-entering
+    # process_inputs for one file with the shared pass-1 state
+    if workers > 1 and len(input_paths) > 1:
+        _run_pass2_pool(input_paths, opts, pass1_state, workers)
+        return
+
+    posts_extra_stopwords_set = pass1_state.posts_extra_stopwords
+    posts_phrase_stoplist_set = pass1_state.posts_phrase_stoplist
+    frontpage_index = pass1_state.frontpage_index
+    posts_docfreq = pass1_state.posts_docfreq
+    posts_total_docs = pass1_state.posts_total_docs
+    docfreq = pass1_state.docfreq
+    total_docs = pass1_state.total_docs
+    desc_idf_table = pass1_state.desc_idf_table
+    posts_idf_table = pass1_state.posts_idf_table
 
     # Subject whitelist removed in v2: composition now uses local post grams (no editorial list)
     compose_subjects_set: Set[str] = set()
 
-    # Pass 0 (optional): posts DF across frontpages
-    frontpage_index: Dict[str, str] = {}
-    frontpage_paths: List[str] = []
-    posts_docfreq: Counter = Counter()
-    posts_total_docs: int = 0
-    if frontpage_glob:
-        print(f"[posts:pass1] building posts docfreq over glob={frontpage_glob!r} ...", file=sys.stderr)
-        frontpage_index, frontpage_paths = _build_frontpage_index(frontpage_glob)
-        posts_docfreq, posts_total_docs = build_posts_docfreq(frontpage_paths, max_ngram, posts_extra_stopwords_set, posts_phrase_stoplist_set)
-        print(f"[posts:pass1] total_frontpages={posts_total_docs:,}, unique_terms={len(posts_docfreq):,}", file=sys.stderr)
-
-    # Pass 1: global docfreq across selected inputs (for description n-grams)
-    print(f"[desc:pass1] building docfreq over {len(input_paths)} file(s)...", file=sys.stderr)
-    docfreq, total_docs = build_docfreq(input_paths, max_ngram)
-    print(f"[desc:pass1] total_docs={total_docs:,}, unique_terms={len(docfreq):,}", file=sys.stderr)
-
     # Cache for loaded frontpage JSONs
     frontpage_cache: Dict[str, dict] = {}
 
@@ -1612,25 +1978,26 @@ def process_inputs(
         print(f"[pass2] processing {inp} -> {outp}", file=sys.stderr)
 
         count_written = 0
-        with open(outp, "w", encoding="utf-8") as fout:
-            for sub in iter_subreddits_from_file(inp):
+        with open(outp, "wb", buffering=1 << 20) as fout:
+            for sub, desc_tokens in load_and_tokenize(inp, max_ngram, release=True):
                 # Description TF-IDF
-                desc_tokens = extract_desc_terms(sub.desc_text, max_ngram)
+                # One n-gram count per doc, shared by TF-IDF and the phrase fallback below
+                local_grams = tokens_to_ngrams(desc_tokens, max_ngram)
                 desc_tfidf = compute_tfidf_per_doc(
-                    desc_tokens, docfreq, total_docs, max_ngram, min_df_bigram, min_df_trigram, desc_idf_power
+                    desc_tokens, docfreq, total_docs, max_ngram, min_df_bigram, min_df_trigram, desc_idf_power,
+                    idf_table=desc_idf_table,
+                    grams=local_grams,
                 )
 
                 # Ensure local multi-word phrases even if globally rare (keeps fuller phrases)
                 if DEFAULT_ENSURE_PHRASES and DEFAULT_ENSURE_PHRASES_K > 0 and desc_tokens:
-                    local_grams = tokens_to_ngrams(desc_tokens, max_ngram)
                     candidates = [
                         (g, tf)
                         for g, tf in local_grams.items()
                         if (g.count(" ") + 1) >= 2 and g not in desc_tfidf
                     ]
                     if candidates:
-                        candidates.sort(key=lambda x: x[1], reverse=True)
-                        for g, tf in candidates[:DEFAULT_ENSURE_PHRASES_K]:
+                        for g, tf in heapq.nlargest(DEFAULT_ENSURE_PHRASES_K, candidates, key=itemgetter(1)):
                             n_words = g.count(" ") + 1
                             boost = DEFAULT_DESC_PHRASE_BOOST_BIGRAM if n_words == 2 else (
                                 DEFAULT_DESC_PHRASE_BOOST_TRIGRAM if n_words == 3 else 1.0
@@ -1678,8 +2045,7 @@ def process_inputs(
                             fp_data = frontpage_cache[posts_path]
                         else:
                             try:
-                                with open(posts_path, "r", encoding="utf-8") as f:
-                                    fp_data = json.load(f)
+                                fp_data = load_json_file(posts_path)
                                 frontpage_cache[posts_path] = fp_data
                             except Exception:
                                 fp_data = None
@@ -1702,6 +2068,7 @@ def process_inputs(
                                 posts_generic_df_ratio,
                                 idf_power=posts_idf_power,
                                 engagement_alpha=posts_engagement_alpha,
+                                idf_table=posts_idf_table,
                             )
 
                             # Anchored variants for generics
@@ -1795,7 +2162,7 @@ def process_inputs(
                                 theme_tokens.add(tok)
                     # top-K description terms
                     if desc_tfidf:
-                        for g, _ in sorted(desc_tfidf.items(), key=lambda x: x[1], reverse=True)[:max(0, posts_theme_top_desc_k)]:
+                        for g, _ in heapq.nlargest(max(0, posts_theme_top_desc_k), desc_tfidf.items(), key=itemgetter(1)):
                             for tok in g.split():
                                 if tok:
                                     theme_tokens.add(tok)
@@ -1825,7 +2192,7 @@ def process_inputs(
                         candidate_pool=embed_candidate_pool,
                     )
 
-                ranked = normalize_weights(merged)
+                ranked = normalize_weights(merged, topk if topk >= 0 else None)
                 top = ranked[:topk]
                 # Ensure the whole subreddit name phrase is present in Top-K if available
                 if full_lower and (" " in full_lower):
@@ -1861,7 +2228,7 @@ def process_inputs(
                         for (t, w, s, src) in top
                     ],
                 }
-                fout.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                fout.write(dump_json_line(rec))
                 count_written += 1
 
         print(f"[done] wrote {count_written} records to {outp}", file=sys.stderr)
@@ -1873,12 +2240,14 @@ def main():
     g.add_argument("--input-file", type=str, help="Path to one page JSON file")
     g.add_argument("--input-glob", type=str, help="Glob for many page JSON files, e.g., 'output/pages/page_*.json'")
     ap.add_argument("--output-dir", type=str, default=DEFAULT_OUTPUT_DIR, help="Directory for output JSONL files")
+    ap.add_argument("--workers", type=int, default=1, help="Worker processes for pass 2; input files are scored in parallel (1 = serial)")
     ap.add_argument("--topk", type=int, default=DEFAULT_TOPK, help="Top-K keywords per subreddit")
     ap.add_argument("--max-ngram", type=int, default=DEFAULT_MAX_NGRAM, help="Max n-gram length for TF-IDF")
     ap.add_argument("--name-weight", type=float, default=DEFAULT_NAME_WEIGHT, help="Weight multiplier for name-derived terms")
     ap.add_argument("--desc-weight", type=float, default=DEFAULT_DESC_WEIGHT, help="Weight multiplier for description TF-IDF")
     ap.add_argument("--min-df-bigram", type=int, default=2, help="Minimum document frequency to keep bigrams")
     ap.add_argument("--min-df-trigram", type=int, default=2, help="Minimum document frequency to keep trigrams")
+    ap.add_argument("--df-hash-bits", type=int, default=0, help="Hashing-trick DF: count n-gram document frequency in 2**N CRC32 buckets instead of a full vocabulary (bounded memory, approximate on collisions; e.g. 20). 0 = exact")
 
     # Posts integration CLI
     ap.add_argument("--frontpage-glob", type=str, default=None, help="Glob for frontpage JSON files, e.g., 'output/subreddits/*/frontpage.json'")
@@ -1988,6 +2357,8 @@ def main():
         compose_anchor_max_per_sub=args.compose_anchor_max_per_sub,
         compose_anchor_min_base_score=args.compose_anchor_min_base_score,
         compose_anchor_max_ratio=args.compose_anchor_max_ratio,
+        df_hash_bits=max(0, args.df_hash_bits),
+        workers=args.workers,
     )
 
 
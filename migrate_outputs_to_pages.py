@@ -13,13 +13,22 @@ It writes:
 """
 from __future__ import annotations
 
+import argparse
 import glob
 import json
 import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+# Faster JSON decoding (optional; stdlib json fallback)
+try:
+    import orjson as _orjson  # type: ignore
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
 
 OUT_DIR = Path("output")
 PAGES_DIR = OUT_DIR / "pages"
@@ -27,10 +36,23 @@ COMPLETE = OUT_DIR / "reddit_communities_complete.json"
 
 
 def load_json(path: Path):
+    if _HAS_ORJSON:
+        try:
+            return _orjson.loads(path.read_bytes())
+        except _orjson.JSONDecodeError:
+            pass  # e.g. NaN literals; let the stdlib parser decide
     with path.open("r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def load_progress_records(path: str) -> Optional[List[Dict]]:
+    """Load one progress file in a worker; None if it cannot be read."""
+    try:
+        return load_json(Path(path))
+    except Exception:
+        return None
+
+
 def write_page(page: int, subs: List[Dict]):
     PAGES_DIR.mkdir(parents=True, exist_ok=True)
     payload = {
@@ -43,6 +65,10 @@ def write_page(page: int, subs: List[Dict]):
         json.dump(payload, f, indent=2, ensure_ascii=False)
 
 
+def write_page_item(item: Tuple[int, List[Dict]]):
+    write_page(*item)
+
+
 def record_manifest(pages_done: List[int], total: int, last_page: int):
     manifest = {
         "last_page": last_page,
@@ -57,6 +83,11 @@ def record_manifest(pages_done: List[int], total: int, last_page: int):
 
 
 def main():
+    ap = argparse.ArgumentParser(description="Split monolithic discovery outputs into output/pages/page_<N>.json")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="Processes for loading/writing files (1=serial)")
+    args = ap.parse_args()
+
     OUT_DIR.mkdir(exist_ok=True)
     PAGES_DIR.mkdir(exist_ok=True)
 
@@ -73,32 +104,38 @@ def main():
             page_to_records[p].append(item)
             total += 1
 
-    # 2) Migrate all progress files
-    for path in glob.glob(str(OUT_DIR / "reddit_communities_progress_page_*.json")):
-        try:
-            data = load_json(Path(path))
-        except Exception:
-            continue
-        for item in data:
-            p = int(item.get("page") or 0)
-            if p <= 0:
-                continue
-            page_to_records[p].append(item)
-            total += 1
-
-    # Write per-page files (dedup within page by community_id)
-    pages_done = []
-    for p, records in page_to_records.items():
-        seen = set()
-        subs = []
-        for r in records:
-            key = r.get("community_id") or (r.get("name"), r.get("url"))
-            if key in seen:
+    # 2) Migrate all progress files (decoded in parallel; merged in glob order so dedup is unchanged)
+    paths = glob.glob(str(OUT_DIR / "reddit_communities_progress_page_*.json"))
+    workers = max(1, min(args.workers, len(paths)))
+    ex = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        loaded = ex.map(load_progress_records, paths, chunksize=8) if ex else map(load_progress_records, paths)
+        for data in loaded:
+            if data is None:
                 continue
-            seen.add(key)
-            subs.append(r)
-        write_page(p, subs)
-        pages_done.append(p)
+            for item in data:
+                p = int(item.get("page") or 0)
+                if p <= 0:
+                    continue
+                page_to_records[p].append(item)
+                total += 1
+
+        # Write per-page files (dedup within page by community_id)
+        page_items = []
+        for p, records in page_to_records.items():
+            by_key: Dict = {}
+            for r in records:
+                by_key.setdefault(r.get("community_id") or (r.get("name"), r.get("url")), r)
+            page_items.append((p, list(by_key.values())))
+        if ex and len(page_items) > 1:
+            list(ex.map(write_page_item, page_items, chunksize=8))
+        else:
+            for item in page_items:
+                write_page_item(item)
+        pages_done = [p for p, _ in page_items]
+    finally:
+        if ex:
+            ex.shutdown()
 
     if pages_done:
         record_manifest(pages_done, total, last_page=max(pages_done))
@@ -3,41 +3,98 @@
 Quantitative analysis of keyword extraction results across the dataset.
 """
 
+import heapq
 import json
 import os
 from pathlib import Path
 import numpy as np
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 import re
 
-def analyze_score_distribution(keywords_dir):
-    """Analyze score distributions across all subreddits."""
-    scores = []
+try:
+    import orjson as _orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+
+def _loads(raw):
+    """Decode one JSON record (bytes or str); orjson when available, stdlib for what it rejects (NaN)."""
+    if _HAS_ORJSON:
+        try:
+            return _orjson.loads(raw)
+        except _orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+JSONL_READ_BYTES = 1 << 22  # 4 MiB per read
+
+
+def _iter_jsonl(path):
+    """Yield decoded records from a JSONL file, reading in large blocks and splitting lines ourselves."""
+    with open(path, 'rb') as f:
+        buf = b''
+        while chunk := f.read(JSONL_READ_BYTES):
+            buf += chunk
+            *lines, buf = buf.split(b'\n')
+            for ln in lines:
+                if ln:
+                    yield _loads(ln)
+        if buf:
+            yield _loads(buf)
+
+# Quality-check patterns (compiled once; ad words are matched in one pass over the lowercased term)
+URL_PATTERN = re.compile(r'https?://|\.(?:com|org|net)|steampowered|nintendo')
+FOREIGN_PATTERN = re.compile(r'[^\x00-\x7F]')  # Non-ASCII characters
+AD_PATTERNS = [
+    'tirzepatide', 'skinny', 'healthcare', 'medicare', 'insurance',
+    'loan', 'credit score', 'refinance', 'mortgage rate'
+]
+AD_PATTERN = re.compile('|'.join(map(re.escape, AD_PATTERNS)))
+COHERENCE_STOPWORDS = ('the', 'and', 'or', 'of', 'to', 'in')
+
+def _map_files(fn, paths, workers=None):
+    """Apply fn to each path, in a process pool when worthwhile; results keep the input order."""
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return [fn(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(fn, paths, chunksize=8))
+
+def _score_file_stats(file_path):
+    """Per-file part of analyze_score_distribution: (score arrays, source counts, top-10 composition rates)."""
+    score_chunks = []  # one contiguous float64 array per record, concatenated once
     sources = Counter()
     composition_rates = []
+    for data in _iter_jsonl(file_path):
+        kws = data['keywords']
+        score_chunks.append(np.fromiter((kw['score'] for kw in kws), dtype=np.float64, count=len(kws)))
+        
+        # Count sources
+        sources.update(kw['source'] for kw in kws)
+        
+        # Composition rate in top-10
+        top_10 = kws[:10]
+        composed_count = sum(1 for kw in top_10 if 'composed' in kw['source'])
+        composition_rates.append(composed_count / len(top_10))
+    return score_chunks, sources, composition_rates
+
+def analyze_score_distribution(keywords_dir, workers=None):
+    """Analyze score distributions across all subreddits (files are parsed in parallel)."""
+    files = [p for p in Path(keywords_dir).glob("*.jsonl") if p.stat().st_size > 0]
+    total_files = len(files)
     
-    total_files = 0
-    for file_path in Path(keywords_dir).glob("*.jsonl"):
-        if file_path.stat().st_size == 0:
-            continue
-            
-        total_files += 1
-        with open(file_path, 'r') as f:
-            for line in f:
-                data = json.loads(line.strip())
-                subreddit_scores = [kw['score'] for kw in data['keywords']]
-                scores.extend(subreddit_scores)
-                
-                # Count sources
-                for kw in data['keywords']:
-                    sources[kw['source']] += 1
-                
-                # Composition rate in top-10
-                top_10 = data['keywords'][:10]
-                composed_count = sum(1 for kw in top_10 if 'composed' in kw['source'])
-                composition_rates.append(composed_count / len(top_10))
-    
-    scores = np.array(scores)
+    score_chunks = []
+    sources = Counter()
+    composition_rates = []
+    # Merged in file order, so tie order in sources.most_common() matches a serial run
+    for file_scores, file_sources, file_rates in _map_files(_score_file_stats, files, workers):
+        score_chunks.extend(file_scores)
+        sources.update(file_sources)
+        composition_rates.extend(file_rates)
+    
+    scores = np.concatenate(score_chunks) if score_chunks else np.array([])
     composition_rates = np.array(composition_rates)
     
     print(f"📊 QUANTITATIVE ANALYSIS ({total_files} processed files)")
@@ -45,13 +102,15 @@ def analyze_score_distribution(keywords_dir):
     
     print(f"\n🎯 SCORE DISTRIBUTION:")
     print(f"  Total keywords: {len(scores):,}")
+    # One partition pass for the median and all percentiles
+    p50, p75, p95, p99 = np.percentile(scores, [50, 75, 95, 99])
     print(f"  Mean score: {scores.mean():.2f}")
-    print(f"  Median score: {np.median(scores):.2f}")
+    print(f"  Median score: {p50:.2f}")
     print(f"  Std deviation: {scores.std():.2f}")
     print(f"  Min/Max: {scores.min():.2f} / {scores.max():.2f}")
-    print(f"  75th percentile: {np.percentile(scores, 75):.2f}")
-    print(f"  95th percentile: {np.percentile(scores, 95):.2f}")
-    print(f"  99th percentile: {np.percentile(scores, 99):.2f}")
+    print(f"  75th percentile: {p75:.2f}")
+    print(f"  95th percentile: {p95:.2f}")
+    print(f"  99th percentile: {p99:.2f}")
     
     print(f"\n📝 SOURCE DISTRIBUTION:")
     total_keywords = sum(sources.values())
@@ -67,15 +126,63 @@ def analyze_score_distribution(keywords_dir):
     
     return scores, sources, composition_rates
 
-def detect_quality_issues(keywords_dir, sample_size=50):
+def _quality_issues_file(file_path):
+    """Per-file part of detect_quality_issues: issue type -> list of examples."""
+    issues = {
+        'url_contamination': [],
+        'foreign_language': [],
+        'potential_ads': [],
+        'fragmented_phrases': [],
+        'repetitive_composition': []
+    }
+    for data in _iter_jsonl(file_path):
+        subreddit_name = data['name']
+        
+        for kw in data['keywords'][:15]:  # Check top 15
+            term = kw['term']
+            tl = term.lower()
+            
+            # URL contamination
+            if URL_PATTERN.search(term):
+                issues['url_contamination'].append((subreddit_name, term))
+            
+            # Foreign language
+            if FOREIGN_PATTERN.search(term):
+                issues['foreign_language'].append((subreddit_name, term))
+            
+            # Potential ads
+            if AD_PATTERN.search(tl):
+                issues['potential_ads'].append((subreddit_name, term))
+            
+            # Fragmented phrases (long phrases with disconnected words)
+            words = tl.split()
+            if len(words) >= 4 and not any(word in tl for word in COHERENCE_STOPWORDS):
+                lens = [len(w) for w in words]
+                word_coherence = sum(
+                    1 for a, b, la, lb in zip(words, words[1:], lens, lens[1:])
+                    if abs(la - lb) <= 2 or a in b or b in a
+                )
+                if word_coherence < len(words) * 0.3:  # Low coherence threshold
+                    issues['fragmented_phrases'].append((subreddit_name, term))
+        
+        # Check for repetitive composition (multiple similar phrases)
+        composed_terms = [kw['term'] for kw in data['keywords'][:10] if 'composed' in kw.get('source', '')]
+        if len(composed_terms) >= 3:
+            base_words = set()
+            for term in composed_terms:
+                words = set(term.lower().split())
+                if base_words and len(base_words.intersection(words)) >= 2:
+                    issues['repetitive_composition'].append((subreddit_name, composed_terms[:3]))
+                    break
+                base_words.update(words)
+    return issues
+
+def detect_quality_issues(keywords_dir, sample_size=50, workers=None):
     """Detect common quality issues in keyword extraction."""
     
-    url_pattern = re.compile(r'https?://|\.com|\.org|\.net|steampowered|nintendo')
-    foreign_pattern = re.compile(r'[^\x00-\x7F]+')  # Non-ASCII characters
-    ad_patterns = [
-        'tirzepatide', 'skinny', 'healthcare', 'medicare', 'insurance',
-        'loan', 'credit score', 'refinance', 'mortgage rate'
-    ]
+    # Same first-N-by-name sample as sorted()[:N], without sorting the whole directory listing
+    files = [p for p in heapq.nsmallest(sample_size, Path(keywords_dir).glob("*.jsonl")) if p.stat().st_size > 0]
+    files_checked = len(files)
     
     issues = {
         'url_contamination': [],
@@ -84,53 +191,9 @@ def detect_quality_issues(keywords_dir, sample_size=50):
         'fragmented_phrases': [],
         'repetitive_composition': []
     }
-    
-    files_checked = 0
-    for file_path in sorted(Path(keywords_dir).glob("*.jsonl"))[:sample_size]:
-        if file_path.stat().st_size == 0:
-            continue
-            
-        files_checked += 1
-        with open(file_path, 'r') as f:
-            for line in f:
-                data = json.loads(line.strip())
-                subreddit_name = data['name']
-                
-                for kw in data['keywords'][:15]:  # Check top 15
-                    term = kw['term']
-                    
-                    # URL contamination
-                    if url_pattern.search(term):
-                        issues['url_contamination'].append((subreddit_name, term))
-                    
-                    # Foreign language
-                    if foreign_pattern.search(term):
-                        issues['foreign_language'].append((subreddit_name, term))
-                    
-                    # Potential ads
-                    if any(ad_word in term.lower() for ad_word in ad_patterns):
-                        issues['potential_ads'].append((subreddit_name, term))
-                    
-                    # Fragmented phrases (long phrases with disconnected words)
-                    if len(term.split()) >= 4 and not any(word in term.lower() for word in ['the', 'and', 'or', 'of', 'to', 'in']):
-                        word_coherence = 0
-                        words = term.lower().split()
-                        for i in range(len(words)-1):
-                            if words[i] in words[i+1] or words[i+1] in words[i] or abs(len(words[i]) - len(words[i+1])) <= 2:
-                                word_coherence += 1
-                        if word_coherence < len(words) * 0.3:  # Low coherence threshold
-                            issues['fragmented_phrases'].append((subreddit_name, term))
-                
-                # Check for repetitive composition (multiple similar phrases)
-                composed_terms = [kw['term'] for kw in data['keywords'][:10] if 'composed' in kw.get('source', '')]
-                if len(composed_terms) >= 3:
-                    base_words = set()
-                    for term in composed_terms:
-                        words = set(term.lower().split())
-                        if base_words and len(base_words.intersection(words)) >= 2:
-                            issues['repetitive_composition'].append((subreddit_name, composed_terms[:3]))
-                            break
-                        base_words.update(words)
+    for file_issues in _map_files(_quality_issues_file, files, workers):
+        for issue_type, examples in file_issues.items():
+            issues[issue_type].extend(examples)
     
     print(f"\n🚨 QUALITY ISSUES DETECTED (from {files_checked} files):")
     print("=" * 60)
@@ -20,8 +20,8 @@ def find_failed_worker_files():
     return list(Path().glob(pattern))
 
 def load_failed_targets(files):
-    """Load and consolidate all failed targets."""
-    all_targets = []
+    """Load and consolidate all failed targets (deduplicated, first-seen order)."""
+    all_targets = {}
     worker_info = []
     
     for file_path in files:
@@ -36,15 +36,17 @@ def load_failed_targets(files):
                 "count": len(data.get("unfinished_targets", []))
             })
             
-            # Extract subreddit names
+            # Extract subreddit names; a dict keeps insertion order and drops duplicates in one pass
             targets = data.get("unfinished_targets", [])
             for target in targets:
-                all_targets.append(target.get("subreddit"))
+                sub = target.get("subreddit")
+                if sub:
+                    all_targets[sub] = None
                 
         except Exception as e:
             print(f"Warning: Could not read {file_path}: {e}")
     
-    return all_targets, worker_info
+    return list(all_targets), worker_info
 
 def create_retry_file(targets, output_file="retry_failed_workers.txt"):
     """Create a retry file with failed targets."""
@@ -58,8 +60,8 @@ def print_summary(worker_info, targets):
     """Print a summary of failed workers and targets."""
     print(f"\n=== Failed Worker Recovery Summary ===")
     print(f"Total failed workers: {len(worker_info)}")
-    print(f"Total failed targets: {len(targets)}")
-    print(f"Unique failed targets: {len(set(targets))}")
+    print(f"Total failed targets: {sum(info['count'] for info in worker_info)}")
+    print(f"Unique failed targets: {len(targets)}")
     
     print(f"\nFailed workers details:")
     for info in worker_info:
@@ -96,9 +98,8 @@ def main():
         return
     
     if args.create_retry:
-        unique_targets = list(set(targets))  # Remove duplicates
-        retry_file = create_retry_file(unique_targets, args.retry_file)
-        print(f"\nCreated retry file: {retry_file} with {len(unique_targets)} unique targets")
+        retry_file = create_retry_file(targets, args.retry_file)  # already deduplicated
+        print(f"\nCreated retry file: {retry_file} with {len(targets)} unique targets")
         
         if args.run_retry:
             print(f"\nRunning retry with concurrency={args.concurrency}...")
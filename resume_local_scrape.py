@@ -19,7 +19,7 @@ import glob
 import json
 import os
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Set, Tuple
 
 from community_ranking_scraper_local import CommunityRankingScraper, LocalScraperConfig
 
@@ -42,7 +42,30 @@ def _max_page(data: List[Dict]) -> int:
     pages = [int(item.get("page") or 0) for item in data if isinstance(item, dict)]
     return max(pages) if pages else 0
 
-def _best_seed() -> Tuple[List[Dict], int, Path | None]:
+def _page_numbers(pages_dir: Path) -> Set[int]:
+    """Page numbers with a per-page file (page_<N>.json or .json.zst), from a single directory scan."""
+    pages: Set[int] = set()
+    try:
+        with os.scandir(pages_dir) as it:
+            for entry in it:
+                name = entry.name
+                if not name.startswith("page_"):
+                    continue
+                if name.endswith(".json"):
+                    num = name[5:-5]
+                elif name.endswith(".json.zst"):
+                    num = name[5:-9]
+                else:
+                    continue
+                # is_file() uses the dirent type, so no extra stat in the common case
+                if num.isdigit() and entry.is_file():
+                    pages.add(int(num))
+    except FileNotFoundError:
+        pass
+    return pages
+
+
+def _best_seed(page_numbers: Set[int] | None = None) -> Tuple[List[Dict], int, Path | None]:
     """Pick the dataset with the highest max page among complete, progress files, and per-page files."""
     candidates: List[Tuple[List[Dict], int, Path | None]] = []
     if COMPLETE.exists():
@@ -55,12 +78,10 @@ def _best_seed() -> Tuple[List[Dict], int, Path | None]:
         except Exception:
             continue
     # Consider per-page directory
-    if PAGES_DIR.exists():
-        pages = sorted([int(pp.stem.split("_")[-1]) for pp in PAGES_DIR.glob("page_*.json") if pp.is_file() and pp.stem.split("_")[-1].isdigit()])
-        if pages:
-            # synthesize a small data structure with max page for comparison
-            last_page = max(pages)
-            candidates.append(([], last_page, PAGES_DIR))
+    pages = _page_numbers(PAGES_DIR) if page_numbers is None else page_numbers
+    if pages:
+        # synthesize a small data structure with max page for comparison
+        candidates.append(([], max(pages), PAGES_DIR))
     if not candidates:
         return [], 0, None
     # choose highest max_page; if tie, prefer complete.json
@@ -78,7 +99,9 @@ def main():
 
     OUT_DIR.mkdir(exist_ok=True)
 
-    seed_data, max_seen, source = _best_seed()
+    # One scan of the per-page directory serves both seeding and skip detection
+    done_pages = _page_numbers(PAGES_DIR)
+    seed_data, max_seen, source = _best_seed(done_pages)
     start_page = (args.from_page or (max_seen + 1 if max_seen > 0 else 1))
 
     print(f"Seeding from: {source if source else 'none'}")
@@ -91,15 +114,8 @@ def main():
 
     cfg = LocalScraperConfig(headless=True)
     scraper = CommunityRankingScraper(cfg)
-    # When per-page files exist, prefer skipping already-done pages to avoid any chance of overwrite.
-    done_pages = set()
-    if PAGES_DIR.exists():
-        for pp in PAGES_DIR.glob("page_*.json"):
-            try:
-                n = int(pp.stem.split("_")[-1])
-                done_pages.add(n)
-            except Exception:
-                continue
+    # When per-page files exist, prefer skipping already-done pages to avoid any chance of overwrite
+    # (done_pages was collected above).
 
     # Scrape only missing pages, in chunks to recycle browser periodically
     current = start_page
@@ -2,19 +2,32 @@
 import sys
 import json
 import re
+from functools import lru_cache
 from pathlib import Path
 from statistics import median
 
+try:
+    import orjson as _orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+def _loads(raw):
+    if _HAS_ORJSON:
+        try:
+            return _orjson.loads(raw)
+        except _orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+_TOKEN_SEP_TABLE = str.maketrans("_-", "  ")
+_NON_WORD_RE = re.compile(r"[^0-9\w\s]+")
+
 def tokenize_simple(text):
     if not text:
         return []
-    text = text.replace("_", " ").replace("-", " ")
-    text = re.sub(r"[^0-9\w\s]+", " ", text)
-    text = text.replace("_", " ")
-    text = re.sub(r"\s+", " ", text.lower()).strip()
-    if not text:
-        return []
-    return text.split()
+    # str.split() already collapses whitespace runs and strips the ends
+    return _NON_WORD_RE.sub(" ", text.translate(_TOKEN_SEP_TABLE)).lower().split()
 
 def normalize_anchor_phrase_from_title(title):
     toks = tokenize_simple(title)
@@ -39,25 +52,91 @@ def subreddit_folder_from_name(name):
     n = re.sub(r"^r/+", "", name.strip(), flags=re.IGNORECASE)
     return n.strip("/")
 
-_anchor_cache = {}
+# The scraper writes "meta" before "posts", so the title is normally within the first few KB
+ANCHOR_PREFIX_BYTES = 4096
+_WS_RE = re.compile(r"\s*")
+_raw_decoder = json.JSONDecoder()
+
+def _meta_from_prefix(head):
+    """Walk the top-level object in a truncated JSON prefix; raises ValueError if meta is not fully inside it."""
+    pos = _WS_RE.match(head).end()
+    if head[pos : pos + 1] != "{":
+        raise ValueError("not an object")
+    pos += 1
+    while True:
+        pos = _WS_RE.match(head, pos).end()
+        key, pos = _raw_decoder.raw_decode(head, pos)
+        pos = _WS_RE.match(head, pos).end()
+        if head[pos : pos + 1] != ":":
+            raise ValueError("expected ':'")
+        pos = _WS_RE.match(head, pos + 1).end()
+        value, pos = _raw_decoder.raw_decode(head, pos)
+        if key == "meta":
+            return value
+        pos = _WS_RE.match(head, pos).end()
+        if head[pos : pos + 1] != ",":
+            raise ValueError("meta not found")
+        pos += 1
+
+def _read_frontpage_meta(fp):
+    with fp.open("rb") as fh:
+        buf = fh.read(ANCHOR_PREFIX_BYTES)
+        if len(buf) == ANCHOR_PREFIX_BYTES:
+            try:
+                return _meta_from_prefix(buf.decode("utf-8", errors="ignore"))
+            except ValueError:
+                buf += fh.read()  # meta runs past the prefix (or comes after posts)
+    return _loads(buf).get("meta")
+
+@lru_cache(maxsize=50_000)
+def _anchor_for(folder, mtime_ns):
+    try:
+        meta = _read_frontpage_meta(Path("output/subreddits") / folder / "frontpage.json")
+        title = ((meta or {}).get("title") or "").strip()
+        if title:
+            return normalize_anchor_phrase_from_title(title)
+    except Exception:
+        pass
+    return ""
 
 def get_anchor_from_frontpage(folder):
     if not folder:
         return ""
-    if folder in _anchor_cache:
-        return _anchor_cache[folder]
-    fp = Path("output/subreddits") / folder / "frontpage.json"
-    out = ""
     try:
-        if fp.exists():
-            data = json.loads(fp.read_text(encoding="utf-8"))
-            title = ((data.get("meta") or {}).get("title") or "").strip()
-            if title:
-                out = normalize_anchor_phrase_from_title(title)
-    except Exception:
-        out = ""
-    _anchor_cache[folder] = out
-    return out
+        mtime_ns = (Path("output/subreddits") / folder / "frontpage.json").stat().st_mtime_ns
+    except OSError:
+        return ""
+    return _anchor_for(folder, mtime_ns)
+
+def build_seed_index(kws):
+    """Map lowercased posts (non-composed) term -> score; the first occurrence wins."""
+    index = {}
+    for kw in kws:
+        s = kw.get("source") or ""
+        if "posts" not in s or "composed" in s:
+            continue
+        tl = (kw.get("term") or "").lower()
+        if tl in index:
+            continue
+        try:
+            index[tl] = float(kw.get("score") or 0.0)
+        except Exception:
+            index[tl] = None
+    return index
+
+def summarize(values, with_median=False):
+    """count/mean/min/max (and optionally median) of a list of numbers; None fields when empty."""
+    if not values:
+        stats = {"count": 0, "mean": None}
+        if with_median:
+            stats["median"] = None
+        stats.update(min=None, max=None)
+        return stats
+    stats = {"count": len(values), "mean": sum(values) / len(values)}
+    if with_median:
+        stats["median"] = median(values)
+    stats.update(min=min(values), max=max(values))
+    return stats
 
 def main():
     if len(sys.argv) < 2:
@@ -70,11 +149,11 @@ def main():
     ranks = []
     ratios = []
     examples = []
-    with open(path, "r", encoding="utf-8") as f:
+    with open(path, "rb") as f:
         for line in f:
             total_records += 1
             try:
-                rec = json.loads(line)
+                rec = _loads(line)
             except Exception:
                 continue
             kws = rec.get("keywords") or []
@@ -86,25 +165,18 @@ def main():
             canon = canonicalize_subreddit_key(rec.get("name", ""), rec.get("url", ""))
             folder = subreddit_folder_from_name(rec.get("name", ""))
             anchor_phrase = get_anchor_from_frontpage(folder)
+            anchor_prefix = anchor_phrase + " " if anchor_phrase else ""
+            canon_prefix = canon + " " if canon else ""
+            seed_index = build_seed_index(kws)
             for idx, kw in comp:
                 ranks.append(idx + 1)
-                t = kw.get("term", "")
-                tl = t.lower()
+                tl = (kw.get("term") or "").lower()
                 seed = None
-                if anchor_phrase and tl.startswith(anchor_phrase + " "):
-                    seed = tl[len(anchor_phrase) + 1 :]
-                elif canon and tl.startswith(canon + " "):
-                    seed = tl[len(canon) + 1 :]
-                seed_score = None
-                if seed:
-                    for kw2 in kws:
-                        s2 = kw2.get("source") or ""
-                        if "posts" in s2 and "composed" not in s2 and kw2.get("term", "").lower() == seed:
-                            try:
-                                seed_score = float(kw2.get("score") or 0.0)
-                            except Exception:
-                                seed_score = None
-                            break
+                if anchor_prefix and tl.startswith(anchor_prefix):
+                    seed = tl[len(anchor_prefix) :]
+                elif canon_prefix and tl.startswith(canon_prefix):
+                    seed = tl[len(canon_prefix) :]
+                seed_score = seed_index.get(seed) if seed else None
                 if seed_score and seed_score > 0:
                     ratio = float(kw.get("score") or 0.0) / seed_score
                     ratios.append(ratio)
@@ -120,19 +192,8 @@ def main():
                                 "rank": idx + 1,
                             }
                         )
-    rank_stats = {
-        "count": len(ranks),
-        "mean": (sum(ranks) / len(ranks) if ranks else None),
-        "min": (min(ranks) if ranks else None),
-        "max": (max(ranks) if ranks else None),
-    }
-    ratio_stats = {
-        "count": len(ratios),
-        "mean": (sum(ratios) / len(ratios) if ratios else None),
-        "median": (median(ratios) if ratios else None) if ratios else None,
-        "min": (min(ratios) if ratios else None),
-        "max": (max(ratios) if ratios else None),
-    }
+    rank_stats = summarize(ranks)
+    ratio_stats = summarize(ratios, with_median=True)
     summary = {
         "input": path,
         "total_records": total_records,
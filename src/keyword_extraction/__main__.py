@@ -42,22 +42,42 @@ import os
 import re
 import sys
 import hashlib
+import heapq
 from collections import Counter
 from glob import glob
-from typing import Dict, List, Optional, Set, Tuple
+from operator import itemgetter
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
 
 from . import config
 from .composition import (
     _compose_rank_seeds_with_embed,
     compose_theme_anchored_from_posts,
+    make_anchor_factor_fn,
     recase_anchored_display,
     _normalize_anchor_phrase_from_title
 )
+from .data_models import Pass2Context, SubDoc
 from .description_processing import extract_desc_terms
-from .embedding import _build_theme_text, embed_rerank_terms
+from .embedding import (
+    _build_theme_text,
+    _flush_embed_disk_caches,
+    _merge_worker_embeddings,
+    _take_worker_embeddings,
+    embed_rerank_terms,
+)
 from .llm import generate_theme_summary, fallback_theme_summary
-from .file_utils import _build_frontpage_index, ensure_dir, out_path_for_input
+from .file_utils import (
+    _build_frontpage_index,
+    dump_json_line,
+    ensure_dir,
+    fingerprint_paths,
+    frontpage_path_for_folder,
+    load_frontpage,
+    load_json_file,
+    out_path_for_input,
+)
 from .name_processing import extract_name_full_phrase
+from .parallel import process_pool, worker_context
 from .posts_processing import (
     apply_anchored_variants_for_generic_posts_terms,
     build_posts_docfreq,
@@ -65,6 +85,7 @@ from .posts_processing import (
 )
 from .scoring import (
     build_docfreq,
+    build_idf_table,
     compute_tfidf_per_doc,
     merge_sources,
     normalize_weights,
@@ -86,6 +107,9 @@ _GREEK_RE = re.compile(r"[\u0370-\u03FF]")
 _NONALNUM_RE = re.compile(r"[^0-9A-Za-z]+")
 _SPACE_RE = re.compile(r"\s+")
 
+# Boost for the whole name phrase, indexed by word count (3+ words share the last entry)
+_NAME_FULL_PHRASE_BOOST = (0.0, 1.0, 1.5, 2.5)
+
 def _collapse_adjacent_duplicates(term: str) -> str:
     if not term:
         return term
@@ -203,6 +227,516 @@ def _clean_merge_dict(
             out[t] = (score, src)
     return out
 
+def _tokenization_signature() -> Tuple:
+    """Global tokenization settings that change n-gram output (part of DF cache keys)."""
+    return (
+        config.DEFAULT_USE_CURATED_STOPWORDS,
+        config.DEFAULT_USE_GENERAL_ZIPF,
+        config.DEFAULT_GENERAL_ZIPF_THRESHOLD,
+        config.DEFAULT_MIN_TOKEN_LEN,
+    )
+
+
+# Memoized composition anchor factor for the current run (one per process, see make_anchor_factor_fn)
+_ANCHOR_FACTOR_FN: Optional[Tuple[Pass2Context, Callable[[Optional[str], Optional[str]], float]]] = None
+
+
+def _anchor_factor_fn_for(ctx: Pass2Context) -> Callable[[Optional[str], Optional[str]], float]:
+    global _ANCHOR_FACTOR_FN
+    if _ANCHOR_FACTOR_FN is None or _ANCHOR_FACTOR_FN[0] is not ctx:
+        fn = make_anchor_factor_fn(
+            ctx.posts_docfreq,
+            ctx.posts_total_docs,
+            ctx.posts_idf_power,
+            ctx.compose_anchor_score_mode,
+            ctx.compose_anchor_alpha,
+            ctx.compose_anchor_floor,
+            ctx.compose_anchor_cap,
+            ctx.compose_anchor_multiplier,
+            idf_table=ctx.posts_idf_table,
+        )
+        _ANCHOR_FACTOR_FN = (ctx, fn)
+    return _ANCHOR_FACTOR_FN[1]
+
+
+def _process_one_sub(sub: SubDoc, ctx: Pass2Context) -> Optional[Tuple[Dict[str, Any], str]]:
+    """
+    Pass 2 for one subreddit: score description/name/posts terms, merge, rank and build the output record.
+    ctx is the read-only run state assembled by process_inputs (shared with pool workers).
+    Returns None when the subreddit is filtered out, else (record, theme text for the optional LLM summary).
+    """
+    clean_collapse_adj_dups = ctx.clean_collapse_adj_dups
+    clean_dedupe_near = ctx.clean_dedupe_near
+    compose_anchor_alpha = ctx.compose_anchor_alpha
+    compose_anchor_cap = ctx.compose_anchor_cap
+    compose_anchor_floor = ctx.compose_anchor_floor
+    compose_anchor_include_unigrams = ctx.compose_anchor_include_unigrams
+    compose_anchor_max_final_words = ctx.compose_anchor_max_final_words
+    compose_anchor_max_per_sub = ctx.compose_anchor_max_per_sub
+    compose_anchor_max_ratio = ctx.compose_anchor_max_ratio
+    compose_anchor_min_base_score = ctx.compose_anchor_min_base_score
+    compose_anchor_multiplier = ctx.compose_anchor_multiplier
+    compose_anchor_posts = ctx.compose_anchor_posts
+    compose_anchor_score_mode = ctx.compose_anchor_score_mode
+    compose_anchor_top_m = ctx.compose_anchor_top_m
+    compose_anchor_use_title = ctx.compose_anchor_use_title
+    compose_seed_embed = ctx.compose_seed_embed
+    compose_seed_embed_alpha = ctx.compose_seed_embed_alpha
+    compose_seed_source = ctx.compose_seed_source
+    core_topk = ctx.core_topk
+    desc_common_unigrams_set = ctx.desc_common_unigrams_set
+    desc_drop_generic_unigrams = ctx.desc_drop_generic_unigrams
+    desc_generic_df_ratio = ctx.desc_generic_df_ratio
+    desc_idf_power = ctx.desc_idf_power
+    desc_idf_table = ctx.desc_idf_table
+    desc_weight = ctx.desc_weight
+    docfreq = ctx.docfreq
+    drop_nonlatin = ctx.drop_nonlatin
+    embed_alpha = ctx.embed_alpha
+    embed_candidate_pool = ctx.embed_candidate_pool
+    embed_k_terms = ctx.embed_k_terms
+    embed_model = ctx.embed_model
+    embed_rerank = ctx.embed_rerank
+    emit_core_extended = ctx.emit_core_extended
+    extended_topk = ctx.extended_topk
+    frontpage_index = ctx.frontpage_index
+    llm_summary_enabled = ctx.llm_summary_enabled
+    max_ngram = ctx.max_ngram
+    max_nonascii_ratio = ctx.max_nonascii_ratio
+    min_df_bigram = ctx.min_df_bigram
+    min_df_trigram = ctx.min_df_trigram
+    name_weight = ctx.name_weight
+    posts_anchor_generics = ctx.posts_anchor_generics
+    posts_composed_weight = ctx.posts_composed_weight
+    posts_docfreq = ctx.posts_docfreq
+    posts_drop_generic_unigrams = ctx.posts_drop_generic_unigrams
+    posts_drop_nonlatin_posts = ctx.posts_drop_nonlatin_posts
+    posts_engagement_alpha = ctx.posts_engagement_alpha
+    posts_ensure_k = ctx.posts_ensure_k
+    posts_extra_stopwords_set = ctx.posts_extra_stopwords_set
+    posts_generic_df_ratio = ctx.posts_generic_df_ratio
+    posts_halflife_days = ctx.posts_halflife_days
+    posts_idf_power = ctx.posts_idf_power
+    posts_idf_table = ctx.posts_idf_table
+    posts_max_nonascii_ratio = ctx.posts_max_nonascii_ratio
+    posts_phrase_boost_bigram = ctx.posts_phrase_boost_bigram
+    posts_phrase_boost_trigram = ctx.posts_phrase_boost_trigram
+    posts_phrase_stoplist_set = ctx.posts_phrase_stoplist_set
+    posts_replace_generic_with_anchored = ctx.posts_replace_generic_with_anchored
+    posts_skip_promoted = ctx.posts_skip_promoted
+    posts_theme_penalty = ctx.posts_theme_penalty
+    posts_theme_top_desc_k = ctx.posts_theme_top_desc_k
+    posts_total_docs = ctx.posts_total_docs
+    posts_weight = ctx.posts_weight
+    require_frontpage = ctx.require_frontpage
+    topk = ctx.topk
+    total_docs = ctx.total_docs
+    anchor_factor_fn = _anchor_factor_fn_for(ctx)
+
+    # Canonical key: computed once, used for the frontpage filter, posts lookup and composition
+    try:
+        canon_key = canonicalize_subreddit_key(sub.name, sub.url)
+    except Exception:
+        canon_key = ""
+    # Filter to subs with frontpage if required
+    if require_frontpage:
+        if not (canon_key and canon_key in frontpage_index):
+            return None
+    # Description TF-IDF
+    desc_tokens = extract_desc_terms(sub.desc_text, max_ngram, extra_stopwords=desc_common_unigrams_set)
+    # Local n-gram counts: shared by TF-IDF scoring and the ensure-phrases step below
+    local_grams = tokens_to_ngrams(desc_tokens, max_ngram)
+    desc_tfidf = compute_tfidf_per_doc(
+        desc_tokens,
+        docfreq,
+        total_docs,
+        max_ngram,
+        min_df_bigram,
+        min_df_trigram,
+        desc_idf_power,
+        desc_drop_generic_unigrams,
+        desc_generic_df_ratio,
+        config.DEFAULT_DESC_DROP_GENERIC_PHRASES,
+        config.DEFAULT_DESC_GENERIC_PHRASE_DF_RATIO,
+        idf_table=desc_idf_table,
+        grams=local_grams,
+    )
+
+    # Ensure local multi-word phrases even if globally rare (keeps fuller phrases)
+    if config.DEFAULT_ENSURE_PHRASES and config.DEFAULT_ENSURE_PHRASES_K > 0 and desc_tokens:
+        candidates = [
+            (g, tf)
+            for g, tf in local_grams.items()
+            if (g.count(" ") + 1) >= 2 and g not in desc_tfidf
+        ]
+        if candidates:
+            candidates.sort(key=lambda x: x[1], reverse=True)
+            # words -> boost (config may be changed by CLI flags, so read it here); other lengths get 1.0
+            phrase_boost = {2: config.DEFAULT_DESC_PHRASE_BOOST_BIGRAM, 3: config.DEFAULT_DESC_PHRASE_BOOST_TRIGRAM}
+            for g, tf in candidates[:config.DEFAULT_ENSURE_PHRASES_K]:
+                # fallback score uses TF with a small phrase boost (no IDF)
+                desc_tfidf[g] = tf * phrase_boost.get(g.count(" ") + 1, 1.0)
+
+    # Name terms
+    name_terms = sub.name_terms
+    name_scores = score_name_terms(name_terms)
+    # Full phrase from name (for casing and emphasis)
+    full_lower, full_cased = extract_name_full_phrase(sub.name)
+    # Ensure full phrase is present with strong weight so it surfaces prominently
+    if full_lower:
+        n_words_full = full_lower.count(" ") + 1
+        name_scores[full_lower] += _NAME_FULL_PHRASE_BOOST[min(n_words_full, 3)]
+
+    # Top-K description terms (heap select, computed once) and the theme text built from them;
+    # shared by the posts theme penalty, embedding reranks and the LLM summary
+    top_desc = heapq.nlargest(max(0, posts_theme_top_desc_k), desc_tfidf.items(), key=itemgetter(1)) if desc_tfidf else []
+    theme_text = ""
+    if embed_rerank or compose_seed_embed or llm_summary_enabled:
+        theme_text = _build_theme_text(full_lower, top_desc)
+
+    # Precompute anchors for composition and display recasing
+    display_key = subreddit_display_key(sub.name, sub.url)
+    anchor_title_for_display = ""
+    anchor_phrase_lower = ""
+
+    # Posts TF-IDF (optional)
+    posts_scores: Dict[str, float] = {}
+    composed_scores: Dict[str, float] = {}
+    if frontpage_index and posts_weight > 0.0:
+        posts_path = frontpage_index.get(canon_key)
+
+        # Fallback path if not in index (derive from name)
+        if not posts_path:
+            folder = subreddit_folder_from_name(sub.name)
+            posts_path = frontpage_path_for_folder(os.path.join("output", "subreddits"), folder)
+
+        if posts_path:
+            try:
+                fp_data = load_frontpage(posts_path)
+            except Exception:
+                fp_data = None
+
+            if fp_data:
+                # Early anchor phrase derivation from meta.title (for anchored generics gating)
+                title_str = ""
+                if compose_anchor_use_title:
+                    meta = fp_data.get("meta")
+                    title = meta.get("title") if isinstance(meta, dict) else None
+                    title_str = title.strip() if isinstance(title, str) else ""
+                if title_str:
+                    anchor_title_for_display = title_str
+                    anchor_phrase_lower = _normalize_anchor_phrase_from_title(title_str)
+
+                posts_scores, posts_local_tf = compute_posts_tfidf_for_frontpage(
+                    fp_data,
+                    posts_docfreq,
+                    posts_total_docs,
+                    max_ngram,
+                    min_df_bigram,
+                    min_df_trigram,
+                    posts_halflife_days,
+                    posts_ensure_k,
+                    posts_extra_stopwords_set,
+                    posts_phrase_stoplist_set,
+                    posts_phrase_boost_bigram,
+                    posts_phrase_boost_trigram,
+                    posts_drop_generic_unigrams,
+                    posts_generic_df_ratio,
+                    idf_power=posts_idf_power,
+                    engagement_alpha=posts_engagement_alpha,
+                    skip_promoted=posts_skip_promoted,
+                    drop_nonlatin_posts=posts_drop_nonlatin_posts,
+                    max_nonascii_ratio=posts_max_nonascii_ratio,
+                    idf_table=posts_idf_table,
+                )
+
+                # Anchored variants for generics
+                if posts_anchor_generics:
+                    # choose primary anchor token: the longest single-word name term (avoid bigrams);
+                    # one pass, first one wins on ties
+                    anchor = ""
+                    anchor_len = 0
+                    for t in name_terms:
+                        if t and len(t) > anchor_len and " " not in t:
+                            anchor, anchor_len = t, len(t)
+                    if not anchor:
+                        anchor = canon_key  # fallback to canonical key
+                    if anchor:
+                        posts_scores = apply_anchored_variants_for_generic_posts_terms(
+                            posts_scores,
+                            posts_docfreq,
+                            posts_total_docs,
+                            anchor,
+                            posts_generic_df_ratio,
+                            replace_original_generic=posts_replace_generic_with_anchored,
+                            anchor_phrase_lower=(anchor_phrase_lower or ""),
+                        )
+
+                    # Compose theme-anchored variants from top seed phrases
+                    composed_scores = {}
+                    if compose_anchor_posts and (posts_scores or posts_local_tf):
+                        # anchor_phrase_lower / anchor_title_for_display come from the early title derivation above
+
+                        # Build seed base according to requested source
+                        if compose_seed_source == "posts_local_tf":
+                            seed_base = posts_local_tf
+                        elif compose_seed_source == "posts_tfidf":
+                            seed_base = posts_scores
+                        else:
+                            # hybrid: prefer TF-IDF where available, otherwise fallback to local TF
+                            seed_base = dict(posts_scores)
+                            seed_base.update((g, float(tf)) for g, tf in posts_local_tf.items() if g not in posts_scores)
+
+                        # Optional embedding-based seed rerank to prefer semantically on-theme phrases (e.g., oil change)
+                        seed_scored = seed_base
+                        if compose_seed_embed and theme_text:
+                            seed_scored = _compose_rank_seeds_with_embed(seed_base, theme_text, embed_model, compose_seed_embed_alpha)
+
+                        composed_from_top = compose_theme_anchored_from_posts(
+                            seed_scored,
+                            posts_scores,
+                            anchor_phrase_lower or "",
+                            canon_key or "",
+                            compose_anchor_top_m,
+                            compose_anchor_include_unigrams,
+                            compose_anchor_max_final_words,
+                            compose_anchor_multiplier,
+                            compose_anchor_score_mode,
+                            compose_anchor_alpha,
+                            compose_anchor_floor,
+                            compose_anchor_cap,
+                            compose_anchor_max_per_sub,
+                            compose_anchor_min_base_score,
+                            compose_anchor_max_ratio,
+                            posts_docfreq,
+                            posts_total_docs,
+                            posts_idf_power,
+                            posts_idf_table=posts_idf_table,
+                            anchor_factor_fn=anchor_factor_fn,
+                        )
+                        composed_scores = composed_from_top
+                    else:
+                        composed_scores = {}
+
+        # Theme alignment penalty for posts-only terms with no overlap to subreddit theme
+    penalty = max(0.0, min(1.0, posts_theme_penalty))
+    if posts_scores and penalty < 1.0:  # a penalty of 1.0 is a no-op
+        theme_tokens: Set[str] = set()
+        # tokens from name terms
+        for nt in name_terms:
+            for tok in nt.split():
+                if tok:
+                    theme_tokens.add(tok)
+        # top-K description terms
+        for g, _ in top_desc:
+            for tok in g.split():
+                if tok:
+                    theme_tokens.add(tok)
+        if theme_tokens:
+            # In-place value updates only (no keys added), so iterating items() is safe
+            for term, score in posts_scores.items():
+                if theme_tokens.isdisjoint(term.split()):
+                    posts_scores[term] = score * penalty
+
+    # Merge scores
+    merged = merge_sources([
+        (desc_tfidf, desc_weight, "description"),
+        (name_scores, name_weight, "name"),
+        (posts_scores, posts_weight, "posts"),
+        (composed_scores, (posts_composed_weight if posts_composed_weight is not None else posts_weight), "posts_composed"),
+    ])
+
+    # Embedding-based rerank (optional): theme = whole name phrase + top description terms
+    if embed_rerank:
+        merged = embed_rerank_terms(
+            merged,
+            theme_text=theme_text,
+            model_name=embed_model,
+            alpha=embed_alpha,
+            k_terms=embed_k_terms,
+            candidate_pool=embed_candidate_pool,
+        )
+    # Term-level cleanup (programmatic; optional)
+    if (clean_collapse_adj_dups or clean_dedupe_near or drop_nonlatin or (max_nonascii_ratio is not None and max_nonascii_ratio >= 0.0)):
+        try:
+            merged = _clean_merge_dict(
+                merged,
+                drop_nonlatin=drop_nonlatin,
+                max_nonascii_ratio=float(max_nonascii_ratio),
+                collapse_adj=bool(clean_collapse_adj_dups),
+                dedupe_near=bool(clean_dedupe_near),
+            )
+        except Exception:
+            pass
+
+    # Theme text for the optional LLM summary (generated by the caller, which enforces the limit)
+    theme_text_for_summary = theme_text if llm_summary_enabled else ""
+
+    top = normalize_weights(merged, topk)
+    # Ensure the whole subreddit name phrase is present in Top-K if available
+    if full_lower and (" " in full_lower):
+        terms_in_top = {t for (t, _, _, _) in top}
+        if full_lower not in terms_in_top and full_lower in merged:
+            total_score = sum(v for v, _ in merged.values()) or 1.0
+            sc, src = merged[full_lower]
+            ensured = (full_lower, sc / total_score, sc, src)
+            if len(top) < topk:
+                top.append(ensured)
+            else:
+                top[-1] = ensured
+            # Keep ordering by raw score
+            top.sort(key=lambda x: x[2], reverse=True)
+
+    # Optional emission of 'core' (name+description) and 'extended' (posts+posts_composed) lists
+    core_top_json = None
+    extended_top_json = None
+    if emit_core_extended:
+        # Core: name + description only
+        core_merged = merge_sources([
+            (desc_tfidf, desc_weight, "description"),
+            (name_scores, name_weight, "name"),
+        ])
+        if embed_rerank and theme_text:
+            core_merged = embed_rerank_terms(
+                core_merged,
+                theme_text=theme_text,
+                model_name=embed_model,
+                alpha=embed_alpha,
+                k_terms=embed_k_terms,
+                candidate_pool=embed_candidate_pool,
+            )
+        if (clean_collapse_adj_dups or clean_dedupe_near or drop_nonlatin or (max_nonascii_ratio is not None and max_nonascii_ratio >= 0.0)):
+            try:
+                core_merged = _clean_merge_dict(
+                    core_merged,
+                    drop_nonlatin=drop_nonlatin,
+                    max_nonascii_ratio=float(max_nonascii_ratio),
+                    collapse_adj=bool(clean_collapse_adj_dups),
+                    dedupe_near=bool(clean_dedupe_near),
+                )
+            except Exception:
+                pass
+        core_k = core_topk if core_topk is not None else topk
+        core_top = normalize_weights(core_merged, core_k)
+        # Ensure whole name phrase in core
+        if full_lower and (" " in full_lower):
+            core_terms_in_top = {t for (t, _, _, _) in core_top}
+            if full_lower not in core_terms_in_top and full_lower in core_merged:
+                total_score_core = sum(v for v, _ in core_merged.values()) or 1.0
+                sc_core, src_core = core_merged[full_lower]
+                ensured_core = (full_lower, sc_core / total_score_core, sc_core, src_core)
+                if len(core_top) < core_k:
+                    core_top.append(ensured_core)
+                else:
+                    core_top[-1] = ensured_core
+                core_top.sort(key=lambda x: x[2], reverse=True)
+        core_top_json = [
+            {
+                "term": (
+                    full_cased
+                    if (t == full_lower and src != "description" and " " in t)
+                    else recase_anchored_display(t, canon_key, display_key, anchor_phrase_lower, anchor_title_for_display)
+                ),
+                "weight": round(w, 6),
+                "score": round(s, 6),
+                "source": src,
+            }
+            for (t, w, s, src) in core_top
+        ]
+
+        # Extended: posts + posts_composed only, dedup against core
+        ext_merged = merge_sources([
+            (posts_scores, posts_weight, "posts"),
+            (composed_scores, (posts_composed_weight if posts_composed_weight is not None else posts_weight), "posts_composed"),
+        ])
+        if embed_rerank and theme_text:
+            ext_merged = embed_rerank_terms(
+                ext_merged,
+                theme_text=theme_text,
+                model_name=embed_model,
+                alpha=embed_alpha,
+                k_terms=embed_k_terms,
+                candidate_pool=embed_candidate_pool,
+            )
+        if (clean_collapse_adj_dups or clean_dedupe_near or drop_nonlatin or (max_nonascii_ratio is not None and max_nonascii_ratio >= 0.0)):
+            try:
+                ext_merged = _clean_merge_dict(
+                    ext_merged,
+                    drop_nonlatin=drop_nonlatin,
+                    max_nonascii_ratio=float(max_nonascii_ratio),
+                    collapse_adj=bool(clean_collapse_adj_dups),
+                    dedupe_near=bool(clean_dedupe_near),
+                )
+            except Exception:
+                pass
+        # Deduplicate extended against core selections by normalized form
+        core_dkeys = set()
+        for (t, _, _, _) in core_top:
+            try:
+                core_dkeys.add(_normalize_for_dedupe(t))
+            except Exception:
+                continue
+        ext_filtered: Dict[str, Tuple[float, str]] = {}
+        for term, (scv, srcv) in ext_merged.items():
+            try:
+                if _normalize_for_dedupe(term) not in core_dkeys:
+                    ext_filtered[term] = (scv, srcv)
+            except Exception:
+                ext_filtered[term] = (scv, srcv)
+        ext_k = extended_topk if extended_topk is not None else topk
+        ext_top = normalize_weights(ext_filtered, ext_k)
+        extended_top_json = [
+            {
+                "term": recase_anchored_display(t, canon_key, display_key, anchor_phrase_lower, anchor_title_for_display),
+                "weight": round(w, 6),
+                "score": round(s, 6),
+                "source": src,
+            }
+            for (t, w, s, src) in ext_top
+        ]
+
+    rec = {
+        "community_id": sub.community_id,
+        "name": sub.name,
+        "url": sub.url,
+        "rank": sub.rank,
+        "subscribers_count": sub.subscribers_count,
+        "keywords": [
+            {
+                "term": (
+                    full_cased
+                    if (t == full_lower and src != "description" and " " in t)
+                    else recase_anchored_display(t, canon_key, display_key, anchor_phrase_lower, anchor_title_for_display)
+                ),
+                "weight": round(w, 6),
+                "score": round(s, 6),
+                "source": src,
+            }
+            for (t, w, s, src) in top
+        ],
+    }
+    # Attach optional core/extended lists when requested
+    if core_top_json is not None:
+        rec["keywords_core"] = core_top_json
+    if extended_top_json is not None:
+        rec["keywords_extended"] = extended_top_json
+    return rec, theme_text_for_summary
+
+
+def _process_one_sub_task(sub: SubDoc) -> Tuple[Optional[Tuple[Dict[str, Any], str]], Dict[str, Any]]:
+    # Pool entry point: the run state arrives once per worker via the pool initializer.
+    # Vectors the worker encoded for EMBED_CACHE_DIR ride back with the result for the parent to save.
+    res = _process_one_sub(sub, worker_context())
+    return res, _take_worker_embeddings()
+
+
+def _merge_worker_results(results):
+    for res, new_vectors in results:
+        if new_vectors:
+            _merge_worker_embeddings(new_vectors)
+        yield res
+
+
 def process_inputs(
     input_paths: List[str],
     output_dir: str,
@@ -274,12 +808,15 @@ def process_inputs(
     overwrite: bool = False,
     desc_df_cache_path: Optional[str] = None,
     posts_df_cache_path: Optional[str] = None,
+    df_cache_dir: Optional[str] = None,
     extend_df_caches: bool = False,
     require_frontpage: bool = False,
     # Emission of core/extended lists
     emit_core_extended: bool = False,
     core_topk: Optional[int] = None,
     extended_topk: Optional[int] = None,
+    # Parallelism
+    workers: int = 1,
 ) -> None:
     if not input_paths:
         print("No input files matched.", file=sys.stderr)
@@ -297,7 +834,7 @@ def process_inputs(
     llm_model_env = os.getenv("LLM_MODEL") or None
 
     # Optional: load extra posts stopwords from file
-    posts_extra_stopwords_set: Set[str] = set()
+    posts_extra_stopwords_set: FrozenSet[str] = frozenset()
     if posts_stopwords_extra_path:
         try:
             print(f"[posts:stopwords] --posts-stopwords-extra is deprecated and ignored; relying on DF/Zipf/dynamic filters.", file=sys.stderr)
@@ -305,7 +842,7 @@ def process_inputs(
             pass
 
     # Deprecated: manual posts phrase stoplist is ignored; rely on DF-based generic pruning
-    posts_phrase_stoplist_set: Set[str] = set()
+    posts_phrase_stoplist_set: FrozenSet[str] = frozenset()
     if posts_phrase_stoplist_path:
         try:
             print(f"[posts:phrases] --posts-phrase-stoplist is deprecated and ignored; using DF-based generic pruning instead.", file=sys.stderr)
@@ -325,12 +862,23 @@ def process_inputs(
         # Always build the index (cheap; needed for per-sub loading), but try DF cache first.
         frontpage_index, frontpage_paths = _build_frontpage_index(frontpage_glob)
         allowed_keys_set = set(frontpage_index.keys())
+        if df_cache_dir and not posts_df_cache_path:
+            posts_key = fingerprint_paths(
+                frontpage_paths,
+                "posts",
+                max_ngram,
+                _tokenization_signature(),
+                config.DEFAULT_INCLUDE_CONTENT_PREVIEW,
+                posts_skip_promoted,
+                posts_drop_nonlatin_posts,
+                posts_max_nonascii_ratio,
+            )
+            posts_df_cache_path = os.path.join(df_cache_dir, f"posts_df_{posts_key[:16]}.json")
         loaded_posts_df = False
         cached_keys_set: Set[str] = set()
         if posts_df_cache_path and os.path.exists(posts_df_cache_path) and not overwrite:
             try:
-                with open(posts_df_cache_path, "r", encoding="utf-8") as f:
-                    cache = json.load(f)
+                cache = load_json_file(posts_df_cache_path)
                 posts_docfreq = Counter(cache.get("docfreq", {}))
                 posts_total_docs = int(cache.get("total_docs", 0))
                 cached_keys_set = set(cache.get("keys", []))
@@ -353,6 +901,7 @@ def process_inputs(
                         skip_promoted=posts_skip_promoted,
                         drop_nonlatin_posts=posts_drop_nonlatin_posts,
                         max_nonascii_ratio=posts_max_nonascii_ratio,
+                        workers=workers,
                     )
                     posts_total_docs += delta_docs
                     posts_docfreq.update(delta_df)
@@ -378,6 +927,7 @@ def process_inputs(
                 skip_promoted=posts_skip_promoted,
                 drop_nonlatin_posts=posts_drop_nonlatin_posts,
                 max_nonascii_ratio=posts_max_nonascii_ratio,
+                workers=workers,
             )
             print(f"[posts:pass1] total_frontpages={posts_total_docs:,}, unique_terms={len(posts_docfreq):,}", file=sys.stderr)
             if posts_df_cache_path:
@@ -403,10 +953,18 @@ def process_inputs(
             ak_hash = hashlib.sha1(joined.encode("utf-8")).hexdigest()
         except Exception:
             ak_hash = ""
+    if df_cache_dir and not desc_df_cache_path:
+        desc_key = fingerprint_paths(
+            input_paths,
+            "desc",
+            max_ngram,
+            _tokenization_signature(),
+            ak_hash if require_frontpage else "",
+        )
+        desc_df_cache_path = os.path.join(df_cache_dir, f"desc_df_{desc_key[:16]}.json")
     if desc_df_cache_path and os.path.exists(desc_df_cache_path) and not overwrite:
         try:
-            with open(desc_df_cache_path, "r", encoding="utf-8") as f:
-                cache = json.load(f)
+            cache = load_json_file(desc_df_cache_path)
             cached_hash = cache.get("allowed_keys_hash", "")
             if require_frontpage and (not ak_hash or cached_hash != ak_hash):
                 raise RuntimeError("desc DF cache allowed_keys_hash mismatch")
@@ -418,7 +976,12 @@ def process_inputs(
             print(f"[desc:pass1] failed to load desc DF cache {desc_df_cache_path}: {e}", file=sys.stderr)
     if not loaded_desc_df:
         print(f"[desc:pass1] building docfreq over {len(input_paths)} file(s)...", file=sys.stderr)
-        docfreq, total_docs = build_docfreq(input_paths, max_ngram, allowed_keys=(allowed_keys_set if require_frontpage else None))
+        docfreq, total_docs = build_docfreq(
+            input_paths,
+            max_ngram,
+            allowed_keys=(allowed_keys_set if require_frontpage else None),
+            workers=workers,
+        )
         print(f"[desc:pass1] total_docs={total_docs:,}, unique_terms={len(docfreq):,}", file=sys.stderr)
         if desc_df_cache_path:
             try:
@@ -436,6 +999,10 @@ def process_inputs(
             except Exception as e:
                 print(f"[desc:pass1] failed to save desc DF cache {desc_df_cache_path}: {e}", file=sys.stderr)
 
+    # IDF lookup tables (df -> damped IDF), built once per corpus instead of per gram
+    desc_idf_table = build_idf_table(total_docs, desc_idf_power)
+    posts_idf_table = build_idf_table(posts_total_docs, posts_idf_power) if posts_total_docs > 0 else None
+
     # Build dynamic cross-subreddit common unigram set for descriptions (optional).
     # Guard against tiny corpora where DF ratios are unstable (disable when total_docs < 5).
     desc_common_unigrams_set: Set[str] = set()
@@ -458,483 +1025,155 @@ def process_inputs(
     # Frontpage JSON cache disabled to reduce peak memory (each subreddit typically references a unique path)
     frontpage_cache = None
 
-    # Pass 2: per file, compute per-subreddit scores and write JSONL
-    for inp in input_paths:
-        outp = out_path_for_input(output_dir, inp)
-        # Resume: skip only when an existing output is valid (contains at least one JSON object line).
-        # Treat zero-byte or non-JSON placeholder files as invalid and recompute them.
-        if resume and (not overwrite) and os.path.exists(outp):
-            if _is_valid_output_file(outp):
-                print(f"[pass2] skip existing {outp}", file=sys.stderr)
-                continue
-            else:
-                try:
-                    # Remove invalid/stale output so we can recompute
-                    if os.path.getsize(outp) == 0:
-                        os.remove(outp)
-                        print(f"[pass2] removed stale zero-byte output {outp}", file=sys.stderr)
-                except Exception:
-                    pass
-        print(f"[pass2] processing {inp} -> {outp}", file=sys.stderr)
- 
-        count_written = 0
-        tmp_path = outp + ".tmp"
-        with open(tmp_path, "w", encoding="utf-8") as fout:
-            for sub in iter_subreddits_from_file(inp):
-                # Filter to subs with frontpage if required
-                if require_frontpage:
-                    try:
-                        _canon_for_filter = canonicalize_subreddit_key(sub.name, sub.url)
-                    except Exception:
-                        _canon_for_filter = ""
-                    if not (_canon_for_filter and _canon_for_filter in frontpage_index):
-                        continue
-                # Description TF-IDF
-                desc_tokens = extract_desc_terms(sub.desc_text, max_ngram, extra_stopwords=desc_common_unigrams_set)
-                desc_tfidf = compute_tfidf_per_doc(
-                    desc_tokens,
-                    docfreq,
-                    total_docs,
-                    max_ngram,
-                    min_df_bigram,
-                    min_df_trigram,
-                    desc_idf_power,
-                    desc_drop_generic_unigrams,
-                    desc_generic_df_ratio,
-                    config.DEFAULT_DESC_DROP_GENERIC_PHRASES,
-                    config.DEFAULT_DESC_GENERIC_PHRASE_DF_RATIO,
-                )
-
-                # Ensure local multi-word phrases even if globally rare (keeps fuller phrases)
-                if config.DEFAULT_ENSURE_PHRASES and config.DEFAULT_ENSURE_PHRASES_K > 0 and desc_tokens:
-                    local_grams = tokens_to_ngrams(desc_tokens, max_ngram)
-                    candidates = [
-                        (g, tf)
-                        for g, tf in local_grams.items()
-                        if (g.count(" ") + 1) >= 2 and g not in desc_tfidf
-                    ]
-                    if candidates:
-                        candidates.sort(key=lambda x: x[1], reverse=True)
-                        for g, tf in candidates[:config.DEFAULT_ENSURE_PHRASES_K]:
-                            n_words = g.count(" ") + 1
-                            boost = config.DEFAULT_DESC_PHRASE_BOOST_BIGRAM if n_words == 2 else (
-                                config.DEFAULT_DESC_PHRASE_BOOST_TRIGRAM if n_words == 3 else 1.0
-                            )
-                            # fallback score uses TF with a small phrase boost (no IDF)
-                            desc_tfidf[g] = tf * boost
-
-                # Name terms
-                name_terms = sub.name_terms
-                name_scores = score_name_terms(name_terms)
-                # Full phrase from name (for casing and emphasis)
-                full_lower, full_cased = extract_name_full_phrase(sub.name)
-                # Ensure full phrase is present with strong weight so it surfaces prominently
-                if full_lower:
-                    n_words_full = full_lower.count(" ") + 1
-                    if n_words_full >= 3:
-                        name_scores[full_lower] += 2.5
-                    elif n_words_full == 2:
-                        name_scores[full_lower] += 1.5
-                    else:
-                        name_scores[full_lower] += 1.0
-
-                # Precompute anchors for composition and display recasing
-                display_key = subreddit_display_key(sub.name, sub.url)
-                canon_key = canonicalize_subreddit_key(sub.name, sub.url)
-                anchor_title_for_display = ""
-                anchor_phrase_lower = ""
-
-                # Posts TF-IDF (optional)
-                posts_scores: Counter = Counter()
-                composed_scores: Counter = Counter()
-                if frontpage_index and posts_weight > 0.0:
-                    canon = canonicalize_subreddit_key(sub.name, sub.url)
-                    posts_path = frontpage_index.get(canon)
-
-                    # Fallback path if not in index (derive from name)
-                    if not posts_path:
-                        folder = subreddit_folder_from_name(sub.name)
-                        candidate = os.path.join("output", "subreddits", folder, "frontpage.json")
-                        if os.path.exists(candidate):
-                            posts_path = candidate
-
-                    if posts_path:
-                        try:
-                            with open(posts_path, "r", encoding="utf-8") as f:
-                                fp_data = json.load(f)
-                        except Exception:
-                            fp_data = None
-
-                        if fp_data:
-                            # Early anchor phrase derivation from meta.title (for anchored generics gating)
-                            title_str = ""
-                            if compose_anchor_use_title:
-                                try:
-                                    title_str = ((fp_data.get("meta") or {}).get("title") or "").strip()
-                                except Exception:
-                                    title_str = ""
-                            if title_str:
-                                anchor_title_for_display = title_str
-                                anchor_phrase_lower = _normalize_anchor_phrase_from_title(title_str)
-
-                            posts_scores, posts_local_tf = compute_posts_tfidf_for_frontpage(
-                                fp_data,
-                                posts_docfreq,
-                                posts_total_docs,
-                                max_ngram,
-                                min_df_bigram,
-                                min_df_trigram,
-                                posts_halflife_days,
-                                posts_ensure_k,
-                                posts_extra_stopwords_set,
-                                posts_phrase_stoplist_set,
-                                posts_phrase_boost_bigram,
-                                posts_phrase_boost_trigram,
-                                posts_drop_generic_unigrams,
-                                posts_generic_df_ratio,
-                                idf_power=posts_idf_power,
-                                engagement_alpha=posts_engagement_alpha,
-                                skip_promoted=posts_skip_promoted,
-                                drop_nonlatin_posts=posts_drop_nonlatin_posts,
-                                max_nonascii_ratio=posts_max_nonascii_ratio,
-                            )
-
-                            # Anchored variants for generics
-                            if posts_anchor_generics:
-                                anchor_tokens = [t for t in name_terms if t] or []
-                                anchor = ""
-                                # choose primary anchor token: prefer whole subreddit token if present in terms
-                                if anchor_tokens:
-                                    # pick the longest token that is a single word (avoid bigrams)
-                                    single_tokens = [t for t in anchor_tokens if " " not in t]
-                                    if single_tokens:
-                                        anchor = max(single_tokens, key=len)
-                                if not anchor:
-                                    anchor = canon  # fallback to canonical key
-                                if anchor:
-                                    posts_scores = apply_anchored_variants_for_generic_posts_terms(
-                                        posts_scores,
-                                        posts_docfreq,
-                                        posts_total_docs,
-                                        anchor,
-                                        posts_generic_df_ratio,
-                                        replace_original_generic=posts_replace_generic_with_anchored,
-                                        anchor_phrase_lower=(anchor_phrase_lower or ""),
-                                    )
-    
-                                # Compose theme-anchored variants from top seed phrases
-                                composed_scores = Counter()
-                                if compose_anchor_posts and (posts_scores or posts_local_tf):
-                                    title_str = ""
-                                    if compose_anchor_use_title:
-                                        try:
-                                            title_str = ((fp_data.get("meta") or {}).get("title") or "").strip()
-                                        except Exception:
-                                            title_str = ""
-                                    if title_str:
-                                        anchor_title_for_display = title_str
-                                        anchor_phrase_lower = _normalize_anchor_phrase_from_title(title_str)
-
-                                    # Build seed base according to requested source
-                                    if compose_seed_source == "posts_local_tf":
-                                        seed_base = posts_local_tf
-                                    elif compose_seed_source == "posts_tfidf":
-                                        seed_base = posts_scores
-                                    else:
-                                        # hybrid: prefer TF-IDF where available, otherwise fallback to local TF
-                                        seed_base = Counter(posts_scores)
-                                        for g, tf in posts_local_tf.items():
-                                            if g not in seed_base:
-                                                seed_base[g] = float(tf)
-
-                                    # Optional embedding-based seed rerank to prefer semantically on-theme phrases (e.g., oil change)
-                                    seed_scored = seed_base
-                                    try:
-                                        theme_text_comp = _build_theme_text(full_lower, desc_tfidf, posts_theme_top_desc_k)
-                                    except Exception:
-                                        theme_text_comp = ""
-                                    if compose_seed_embed and theme_text_comp:
-                                        seed_scored = _compose_rank_seeds_with_embed(seed_base, theme_text_comp, embed_model, compose_seed_embed_alpha)
-
-                                    composed_from_top = compose_theme_anchored_from_posts(
-                                        seed_scored,
-                                        posts_scores,
-                                        anchor_phrase_lower or "",
-                                        canon_key or "",
-                                        compose_anchor_top_m,
-                                        compose_anchor_include_unigrams,
-                                        compose_anchor_max_final_words,
-                                        compose_anchor_multiplier,
-                                        compose_anchor_score_mode,
-                                        compose_anchor_alpha,
-                                        compose_anchor_floor,
-                                        compose_anchor_cap,
-                                        compose_anchor_max_per_sub,
-                                        compose_anchor_min_base_score,
-                                        compose_anchor_max_ratio,
-                                        posts_docfreq,
-                                        posts_total_docs,
-                                        posts_idf_power,
-                                    )
-                                    composed_scores = Counter()
-                                    composed_scores.update(composed_from_top)
-                                else:
-                                    composed_scores = Counter()
-    
-                    # Theme alignment penalty for posts-only terms with no overlap to subreddit theme
-                if posts_scores:
-                    theme_tokens: Set[str] = set()
-                    # tokens from name terms
-                    for nt in name_terms:
-                        for tok in nt.split():
-                            if tok:
-                                theme_tokens.add(tok)
-                    # top-K description terms
-                    if desc_tfidf:
-                        for g, _ in sorted(desc_tfidf.items(), key=lambda x: x[1], reverse=True)[:max(0, posts_theme_top_desc_k)]:
-                            for tok in g.split():
-                                if tok:
-                                    theme_tokens.add(tok)
-                    if theme_tokens:
-                        for term in list(posts_scores.keys()):
-                            term_tokens = set(term.split())
-                            if not (term_tokens & theme_tokens):
-                                posts_scores[term] *= max(0.0, min(1.0, posts_theme_penalty))
-
-                # Merge scores
-                merged = merge_sources([
-                    (desc_tfidf, desc_weight, "description"),
-                    (name_scores, name_weight, "name"),
-                    (posts_scores, posts_weight, "posts"),
-                    (composed_scores, (posts_composed_weight if posts_composed_weight is not None else posts_weight), "posts_composed"),
-                ])
-
-                # Embedding-based rerank (optional): theme = whole name phrase + top description terms
-                if embed_rerank:
-                    theme_text = _build_theme_text(full_lower, desc_tfidf, posts_theme_top_desc_k)
-                    merged = embed_rerank_terms(
-                        merged,
-                        theme_text=theme_text,
-                        model_name=embed_model,
-                        alpha=embed_alpha,
-                        k_terms=embed_k_terms,
-                        candidate_pool=embed_candidate_pool,
-                    )
-                # Term-level cleanup (programmatic; optional)
-                if (clean_collapse_adj_dups or clean_dedupe_near or drop_nonlatin or (max_nonascii_ratio is not None and max_nonascii_ratio >= 0.0)):
+    # Read-only state for per-subreddit processing (sent once to each worker when workers > 1)
+    pass2_ctx = Pass2Context(
+        docfreq=docfreq,
+        total_docs=total_docs,
+        desc_idf_table=desc_idf_table,
+        desc_common_unigrams_set=frozenset(desc_common_unigrams_set),
+        posts_docfreq=posts_docfreq,
+        posts_total_docs=posts_total_docs,
+        posts_idf_table=posts_idf_table,
+        frontpage_index=frontpage_index,
+        posts_extra_stopwords_set=posts_extra_stopwords_set,
+        posts_phrase_stoplist_set=posts_phrase_stoplist_set,
+        clean_collapse_adj_dups=clean_collapse_adj_dups,
+        clean_dedupe_near=clean_dedupe_near,
+        compose_anchor_alpha=compose_anchor_alpha,
+        compose_anchor_cap=compose_anchor_cap,
+        compose_anchor_floor=compose_anchor_floor,
+        compose_anchor_include_unigrams=compose_anchor_include_unigrams,
+        compose_anchor_max_final_words=compose_anchor_max_final_words,
+        compose_anchor_max_per_sub=compose_anchor_max_per_sub,
+        compose_anchor_max_ratio=compose_anchor_max_ratio,
+        compose_anchor_min_base_score=compose_anchor_min_base_score,
+        compose_anchor_multiplier=compose_anchor_multiplier,
+        compose_anchor_posts=compose_anchor_posts,
+        compose_anchor_score_mode=compose_anchor_score_mode,
+        compose_anchor_top_m=compose_anchor_top_m,
+        compose_anchor_use_title=compose_anchor_use_title,
+        compose_seed_embed=compose_seed_embed,
+        compose_seed_embed_alpha=compose_seed_embed_alpha,
+        compose_seed_source=compose_seed_source,
+        core_topk=core_topk,
+        desc_drop_generic_unigrams=desc_drop_generic_unigrams,
+        desc_generic_df_ratio=desc_generic_df_ratio,
+        desc_idf_power=desc_idf_power,
+        desc_weight=desc_weight,
+        drop_nonlatin=drop_nonlatin,
+        embed_alpha=embed_alpha,
+        embed_candidate_pool=embed_candidate_pool,
+        embed_k_terms=embed_k_terms,
+        embed_model=embed_model,
+        embed_rerank=embed_rerank,
+        emit_core_extended=emit_core_extended,
+        extended_topk=extended_topk,
+        llm_summary_enabled=llm_summary_enabled,
+        max_ngram=max_ngram,
+        max_nonascii_ratio=max_nonascii_ratio,
+        min_df_bigram=min_df_bigram,
+        min_df_trigram=min_df_trigram,
+        name_weight=name_weight,
+        posts_anchor_generics=posts_anchor_generics,
+        posts_composed_weight=posts_composed_weight,
+        posts_drop_generic_unigrams=posts_drop_generic_unigrams,
+        posts_drop_nonlatin_posts=posts_drop_nonlatin_posts,
+        posts_engagement_alpha=posts_engagement_alpha,
+        posts_ensure_k=posts_ensure_k,
+        posts_generic_df_ratio=posts_generic_df_ratio,
+        posts_halflife_days=posts_halflife_days,
+        posts_idf_power=posts_idf_power,
+        posts_max_nonascii_ratio=posts_max_nonascii_ratio,
+        posts_phrase_boost_bigram=posts_phrase_boost_bigram,
+        posts_phrase_boost_trigram=posts_phrase_boost_trigram,
+        posts_replace_generic_with_anchored=posts_replace_generic_with_anchored,
+        posts_skip_promoted=posts_skip_promoted,
+        posts_theme_penalty=posts_theme_penalty,
+        posts_theme_top_desc_k=posts_theme_top_desc_k,
+        posts_weight=posts_weight,
+        require_frontpage=require_frontpage,
+        topk=topk,
+    )
+    pool = process_pool(workers, pass2_ctx) if workers > 1 else None
+    try:
+        # Pass 2: per file, compute per-subreddit scores and write JSONL
+        for inp in input_paths:
+            outp = out_path_for_input(output_dir, inp)
+            # Resume: skip only when an existing output is valid (contains at least one JSON object line).
+            # Treat zero-byte or non-JSON placeholder files as invalid and recompute them.
+            if resume and (not overwrite) and os.path.exists(outp):
+                if _is_valid_output_file(outp):
+                    print(f"[pass2] skip existing {outp}", file=sys.stderr)
+                    continue
+                else:
                     try:
-                        merged = _clean_merge_dict(
-                            merged,
-                            drop_nonlatin=drop_nonlatin,
-                            max_nonascii_ratio=float(max_nonascii_ratio),
-                            collapse_adj=bool(clean_collapse_adj_dups),
-                            dedupe_near=bool(clean_dedupe_near),
-                        )
+                        # Remove invalid/stale output so we can recompute
+                        if os.path.getsize(outp) == 0:
+                            os.remove(outp)
+                            print(f"[pass2] removed stale zero-byte output {outp}", file=sys.stderr)
                     except Exception:
                         pass
+            print(f"[pass2] processing {inp} -> {outp}", file=sys.stderr)
+ 
+            count_written = 0
+            tmp_path = outp + ".tmp"
+            with open(tmp_path, "wb", buffering=1 << 20) as fout:
+                if pool is not None:
+                    results = _merge_worker_results(
+                        pool.map(_process_one_sub_task, iter_subreddits_from_file(inp), chunksize=64)
+                    )
+                else:
+                    results = (_process_one_sub(sub, pass2_ctx) for sub in iter_subreddits_from_file(inp))
+                for res in results:
+                    if res is None:
+                        continue
+                    rec, theme_text_for_summary = res
 
-                # Optional local LLM theme summary (env: LLM_SUMMARY=1, LLM_SUMMARY_LIMIT, LLM_MODEL)
-                theme_summary_val = ""
-                if llm_summary_enabled and (llm_summary_limit <= 0 or llm_summaries_done < llm_summary_limit):
-                    try:
-                        theme_text_for_summary = _build_theme_text(full_lower, desc_tfidf, posts_theme_top_desc_k)
-                    except Exception:
-                        theme_text_for_summary = ""
-                    try:
-                        # If local LLM generation fails, fall back to deterministic summary
-                        theme_summary_val = generate_theme_summary(theme_text_for_summary, model_id=llm_model_env) or fallback_theme_summary(theme_text_for_summary)
-                        if theme_summary_val:
-                            llm_summaries_done += 1
-                    except Exception:
+                    # Optional local LLM theme summary (env: LLM_SUMMARY=1, LLM_SUMMARY_LIMIT, LLM_MODEL)
+                    theme_summary_val = ""
+                    if llm_summary_enabled and (llm_summary_limit <= 0 or llm_summaries_done < llm_summary_limit):
                         try:
-                            theme_summary_val = fallback_theme_summary(theme_text_for_summary)
+                            # If local LLM generation fails, fall back to deterministic summary
+                            theme_summary_val = generate_theme_summary(theme_text_for_summary, model_id=llm_model_env) or fallback_theme_summary(theme_text_for_summary)
+                            if theme_summary_val:
+                                llm_summaries_done += 1
                         except Exception:
-                            theme_summary_val = ""
-
-                ranked = normalize_weights(merged)
-                top = ranked[:topk]
-                # Ensure the whole subreddit name phrase is present in Top-K if available
-                if full_lower and (" " in full_lower):
-                    terms_in_top = {t for (t, _, _, _) in top}
-                    if full_lower not in terms_in_top and full_lower in merged:
-                        total_score = sum(v for v, _ in merged.values()) or 1.0
-                        sc, src = merged[full_lower]
-                        ensured = (full_lower, sc / total_score, sc, src)
-                        if len(top) < topk:
-                            top.append(ensured)
-                        else:
-                            top[-1] = ensured
-                        # Keep ordering by raw score
-                        top.sort(key=lambda x: x[2], reverse=True)
-
-                # Optional emission of 'core' (name+description) and 'extended' (posts+posts_composed) lists
-                core_top_json = None
-                extended_top_json = None
-                if emit_core_extended:
-                    # Build theme text (safe)
-                    try:
-                        theme_text_local = _build_theme_text(full_lower, desc_tfidf, posts_theme_top_desc_k)
-                    except Exception:
-                        theme_text_local = ""
-
-                    # Core: name + description only
-                    core_merged = merge_sources([
-                        (desc_tfidf, desc_weight, "description"),
-                        (name_scores, name_weight, "name"),
-                    ])
-                    if embed_rerank and theme_text_local:
-                        core_merged = embed_rerank_terms(
-                            core_merged,
-                            theme_text=theme_text_local,
-                            model_name=embed_model,
-                            alpha=embed_alpha,
-                            k_terms=embed_k_terms,
-                            candidate_pool=embed_candidate_pool,
-                        )
-                    if (clean_collapse_adj_dups or clean_dedupe_near or drop_nonlatin or (max_nonascii_ratio is not None and max_nonascii_ratio >= 0.0)):
-                        try:
-                            core_merged = _clean_merge_dict(
-                                core_merged,
-                                drop_nonlatin=drop_nonlatin,
-                                max_nonascii_ratio=float(max_nonascii_ratio),
-                                collapse_adj=bool(clean_collapse_adj_dups),
-                                dedupe_near=bool(clean_dedupe_near),
-                            )
-                        except Exception:
-                            pass
-                    core_ranked = normalize_weights(core_merged)
-                    core_k = core_topk if core_topk is not None else topk
-                    core_top = core_ranked[:core_k]
-                    # Ensure whole name phrase in core
-                    if full_lower and (" " in full_lower):
-                        core_terms_in_top = {t for (t, _, _, _) in core_top}
-                        if full_lower not in core_terms_in_top and full_lower in core_merged:
-                            total_score_core = sum(v for v, _ in core_merged.values()) or 1.0
-                            sc_core, src_core = core_merged[full_lower]
-                            ensured_core = (full_lower, sc_core / total_score_core, sc_core, src_core)
-                            if len(core_top) < core_k:
-                                core_top.append(ensured_core)
-                            else:
-                                core_top[-1] = ensured_core
-                            core_top.sort(key=lambda x: x[2], reverse=True)
-                    core_top_json = [
-                        {
-                            "term": (
-                                full_cased
-                                if (t == full_lower and src != "description" and " " in t)
-                                else recase_anchored_display(t, canon_key, display_key, anchor_phrase_lower, anchor_title_for_display)
-                            ),
-                            "weight": round(w, 6),
-                            "score": round(s, 6),
-                            "source": src,
-                        }
-                        for (t, w, s, src) in core_top
-                    ]
-
-                    # Extended: posts + posts_composed only, dedup against core
-                    ext_merged = merge_sources([
-                        (posts_scores, posts_weight, "posts"),
-                        (composed_scores, (posts_composed_weight if posts_composed_weight is not None else posts_weight), "posts_composed"),
-                    ])
-                    if embed_rerank and theme_text_local:
-                        ext_merged = embed_rerank_terms(
-                            ext_merged,
-                            theme_text=theme_text_local,
-                            model_name=embed_model,
-                            alpha=embed_alpha,
-                            k_terms=embed_k_terms,
-                            candidate_pool=embed_candidate_pool,
-                        )
-                    if (clean_collapse_adj_dups or clean_dedupe_near or drop_nonlatin or (max_nonascii_ratio is not None and max_nonascii_ratio >= 0.0)):
-                        try:
-                            ext_merged = _clean_merge_dict(
-                                ext_merged,
-                                drop_nonlatin=drop_nonlatin,
-                                max_nonascii_ratio=float(max_nonascii_ratio),
-                                collapse_adj=bool(clean_collapse_adj_dups),
-                                dedupe_near=bool(clean_dedupe_near),
-                            )
-                        except Exception:
-                            pass
-                    # Deduplicate extended against core selections by normalized form
-                    core_dkeys = set()
-                    for (t, _, _, _) in core_top:
-                        try:
-                            core_dkeys.add(_normalize_for_dedupe(t))
-                        except Exception:
-                            continue
-                    ext_filtered: Dict[str, Tuple[float, str]] = {}
-                    for term, (scv, srcv) in ext_merged.items():
-                        try:
-                            if _normalize_for_dedupe(term) not in core_dkeys:
-                                ext_filtered[term] = (scv, srcv)
-                        except Exception:
-                            ext_filtered[term] = (scv, srcv)
-                    ext_ranked = normalize_weights(ext_filtered)
-                    ext_k = extended_topk if extended_topk is not None else topk
-                    ext_top = ext_ranked[:ext_k]
-                    extended_top_json = [
-                        {
-                            "term": recase_anchored_display(t, canon_key, display_key, anchor_phrase_lower, anchor_title_for_display),
-                            "weight": round(w, 6),
-                            "score": round(s, 6),
-                            "source": src,
-                        }
-                        for (t, w, s, src) in ext_top
-                    ]
-
-                rec = {
-                    "community_id": sub.community_id,
-                    "name": sub.name,
-                    "url": sub.url,
-                    "rank": sub.rank,
-                    "subscribers_count": sub.subscribers_count,
-                    "keywords": [
-                        {
-                            "term": (
-                                full_cased
-                                if (t == full_lower and src != "description" and " " in t)
-                                else recase_anchored_display(t, canon_key, display_key, anchor_phrase_lower, anchor_title_for_display)
-                            ),
-                            "weight": round(w, 6),
-                            "score": round(s, 6),
-                            "source": src,
-                        }
-                        for (t, w, s, src) in top
-                    ],
-                }
-                # Attach optional core/extended lists when requested
-                if core_top_json is not None:
-                    rec["keywords_core"] = core_top_json
-                if extended_top_json is not None:
-                    rec["keywords_extended"] = extended_top_json
-                # Attach theme_summary only when generated to avoid bloating output
-                if theme_summary_val:
-                    rec["theme_summary"] = theme_summary_val
-
-                fout.write(json.dumps(rec, ensure_ascii=False) + "\n")
-                count_written += 1
-
-        if count_written > 0:
-            try:
-                os.replace(tmp_path, outp)
-            except Exception as e:
-                print(f"[pass2] failed to finalize {outp} from temp: {e}", file=sys.stderr)
-            print(f"[done] wrote {count_written} records to {outp}", file=sys.stderr)
-        else:
-            # Do not create or keep empty placeholder outputs
-            try:
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-            except Exception:
-                pass
-            # Clean up existing zero-byte placeholder if present
-            try:
-                if os.path.exists(outp) and os.path.getsize(outp) == 0:
-                    os.remove(outp)
-            except Exception:
-                pass
-            print(f"[done] wrote 0 records for {inp}; no output file created", file=sys.stderr)
+                            try:
+                                theme_summary_val = fallback_theme_summary(theme_text_for_summary)
+                            except Exception:
+                                theme_summary_val = ""
+                    # Attach theme_summary only when generated to avoid bloating output
+                    if theme_summary_val:
+                        rec["theme_summary"] = theme_summary_val
+
+                    fout.write(dump_json_line(rec))
+                    count_written += 1
+
+            if count_written > 0:
+                try:
+                    os.replace(tmp_path, outp)
+                except Exception as e:
+                    print(f"[pass2] failed to finalize {outp} from temp: {e}", file=sys.stderr)
+                print(f"[done] wrote {count_written} records to {outp}", file=sys.stderr)
+            else:
+                # Do not create or keep empty placeholder outputs
+                try:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                except Exception:
+                    pass
+                # Clean up existing zero-byte placeholder if present
+                try:
+                    if os.path.exists(outp) and os.path.getsize(outp) == 0:
+                        os.remove(outp)
+                except Exception:
+                    pass
+                print(f"[done] wrote 0 records for {inp}; no output file created", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            # Persist worker-encoded vectors now rather than relying on atexit alone
+            _flush_embed_disk_caches()
 
 
 def main():
@@ -948,8 +1187,10 @@ def main():
     ap.add_argument("--overwrite", action="store_true", help="Force recomputation; overwrite outputs and ignore caches")
     ap.add_argument("--desc-df-cache", type=str, default=None, help="Path to cache JSON for description DF (read/write)")
     ap.add_argument("--posts-df-cache", type=str, default=None, help="Path to cache JSON for posts DF (read/write)")
+    ap.add_argument("--df-cache-dir", type=str, default=None, help="Directory for automatic DF caches keyed by input paths/mtimes and tokenization settings (used when --desc-df-cache/--posts-df-cache are not given)")
     ap.add_argument("--extend-df-caches", action="store_true", help="Extend existing DF caches by merging counts from current inputs (ensure inputs are new to avoid double-counting)")
     ap.add_argument("--require-frontpage", action="store_true", help="Only process subreddits that have a frontpage.json; restrict description DF to this subset")
+    ap.add_argument("--workers", type=int, default=1, help="Worker processes for the DF passes and per-subreddit scoring (1 = serial)")
     ap.add_argument("--topk", type=int, default=config.DEFAULT_TOPK, help="Top-K keywords per subreddit")
     ap.add_argument("--max-ngram", type=int, default=config.DEFAULT_MAX_NGRAM, help="Max n-gram length for TF-IDF")
     ap.add_argument("--name-weight", type=float, default=config.DEFAULT_NAME_WEIGHT, help="Weight multiplier for name-derived terms")
@@ -1146,12 +1387,14 @@ def main():
         overwrite=args.overwrite,
         desc_df_cache_path=args.desc_df_cache,
         posts_df_cache_path=args.posts_df_cache,
+        df_cache_dir=args.df_cache_dir,
         extend_df_caches=args.extend_df_caches,
         require_frontpage=args.require_frontpage,
         # core/extended emission
         emit_core_extended=args.emit_core_extended,
         core_topk=args.core_topk,
         extended_topk=args.extended_topk,
+        workers=max(1, args.workers),
     )
 
 
@@ -1,16 +1,19 @@
 """
 Functions for theme-anchored composition of keywords.
 """
+import heapq
 import math
 import re
 from collections import Counter
-from typing import Iterable, List, Optional
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional
 
-import numpy as np
 from . import config
 from .constants import COMPOSE_TRIM_TAIL_TOKENS
 
 
+@lru_cache(maxsize=100_000)
 def _normalize_anchor_phrase_from_title(title: str) -> str:
     if not title:
         return ""
@@ -30,6 +33,18 @@ def _simplify_seed_for_composition(term: str) -> str:
         return term
     toks = term.split()
 
+    # Fast path (most seeds): single-spaced, no trimmable tail and no adjacent duplicates,
+    # so the input is returned as-is without building the dedup list or re-joining.
+    if len(toks) == term.count(" ") + 1 and toks[-1] not in COMPOSE_TRIM_TAIL_TOKENS:
+        prev_l = None
+        for t in toks:
+            tl = t.lower()
+            if tl == prev_l:
+                break
+            prev_l = tl
+        else:
+            return term
+
     # Collapse adjacent duplicates (case-insensitive)
     dedup: List[str] = []
     prev_l = None
@@ -108,6 +123,7 @@ def _compute_anchor_factor(
     floor: float,
     cap: float,
     multiplier: float,
+    idf_table: Optional[List[float]] = None,
 ) -> float:
     """
     Compute multiplicative factor to apply to a seed score when composing an anchored variant.
@@ -116,6 +132,9 @@ def _compute_anchor_factor(
       - "fraction": return multiplier (legacy behavior)
       - "idf_blend": return multiplier * max(floor, min(cap, (1-alpha) + alpha * idf_eff))
         where idf_eff = max(idf(anchor_phrase), idf(anchor_token), 1.0) ** idf_power
+
+    idf_table (optional): build_idf_table(posts_total_docs, idf_power), used for df lookups when
+    it was built for the same N.
     """
     # Legacy mode (still respect floor/cap)
     if score_mode == "fraction":
@@ -125,11 +144,14 @@ def _compute_anchor_factor(
         return max(floor, base)
 
     N = max(1, int(posts_total_docs))
+    use_table = idf_table is not None and int(posts_total_docs) == N
 
     def _idf_eff(term: Optional[str]) -> float:
         if not term:
             return 1.0
         df = posts_docfreq.get(term, 0)
+        if use_table and df < len(idf_table):  # type: ignore[arg-type]
+            return idf_table[df]  # type: ignore[index]
         idf = math.log((1.0 + N) / (1.0 + df)) + 1.0
         return idf ** max(0.0, float(idf_power))
 
@@ -143,9 +165,43 @@ def _compute_anchor_factor(
     return factor
 
 
+def make_anchor_factor_fn(
+    posts_docfreq: Counter,
+    posts_total_docs: int,
+    idf_power: float,
+    score_mode: str,
+    alpha: float,
+    floor: float,
+    cap: float,
+    multiplier: float,
+    idf_table: Optional[List[float]] = None,
+) -> Callable[[Optional[str], Optional[str]], float]:
+    """
+    Bind the corpus-wide arguments of _compute_anchor_factor once per run and memoize the
+    result per (anchor_phrase_lower, anchor_token); subreddits often share anchors.
+    """
+    @lru_cache(maxsize=4096)
+    def _factor(anchor_phrase_lower: Optional[str], anchor_token: Optional[str]) -> float:
+        return _compute_anchor_factor(
+            anchor_phrase_lower,
+            anchor_token,
+            posts_docfreq,
+            posts_total_docs,
+            idf_power,
+            score_mode,
+            alpha,
+            floor,
+            cap,
+            multiplier,
+            idf_table=idf_table,
+        )
+
+    return _factor
+
+
 def compose_theme_anchored_from_posts(
-    seed_scores_for_ordering: Counter,
-    base_scores_for_scale: Counter,
+    seed_scores_for_ordering: Dict[str, float],
+    base_scores_for_scale: Dict[str, float],
     anchor_phrase_lower: Optional[str],
     anchor_token: Optional[str],
     top_m: int,
@@ -162,7 +218,9 @@ def compose_theme_anchored_from_posts(
     posts_docfreq: Counter,
     posts_total_docs: int,
     idf_power: float,
-) -> Counter:
+    posts_idf_table: Optional[List[float]] = None,
+    anchor_factor_fn: Optional[Callable[[Optional[str], Optional[str]], float]] = None,
+) -> Dict[str, float]:
     """
     Compose anchored variants using:
       - seed_scores_for_ordering: ranking/selection signal (e.g., local TF or embed-reranked)
@@ -170,35 +228,55 @@ def compose_theme_anchored_from_posts(
       - max_per_sub: cap number of composed variants per subreddit (0 = unlimited)
       - min_base_score: require seed TF-IDF >= this threshold to compose
       - max_ratio: cap composed/base ratio before rerank (0 = disabled)
+      - posts_idf_table: optional precomputed posts IDF table (see scoring.build_idf_table)
+      - anchor_factor_fn: optional memoized factor from make_anchor_factor_fn (same corpus arguments)
     """
     if not seed_scores_for_ordering:
-        return Counter()
-    out = Counter()
-    produced = 0
-    # Select top-M seeds by the ordering signal
-    items = sorted(seed_scores_for_ordering.items(), key=lambda kv: kv[1], reverse=True)
-    seeds = items[: max(0, top_m)]
+        return {}
+    out: Dict[str, float] = {}
+    # Remaining composed-term quota for this subreddit (max_per_sub=0 means unlimited)
+    remaining = max_per_sub if max_per_sub else float("inf")
+    # Select top-M seeds by the ordering signal (heap-based; same order as a stable full sort)
+    seeds = heapq.nlargest(max(0, top_m), seed_scores_for_ordering.items(), key=itemgetter(1))
 
     # Compute a single anchor factor per subreddit (depends only on anchor + corpus)
-    factor = _compute_anchor_factor(
-        anchor_phrase_lower,
-        anchor_token,
-        posts_docfreq,
-        posts_total_docs,
-        idf_power,
-        score_mode,
-        anchor_alpha,
-        anchor_floor,
-        anchor_cap,
-        multiplier,
-    )
+    if anchor_factor_fn is not None:
+        factor = anchor_factor_fn(anchor_phrase_lower, anchor_token)
+    else:
+        factor = _compute_anchor_factor(
+            anchor_phrase_lower,
+            anchor_token,
+            posts_docfreq,
+            posts_total_docs,
+            idf_power,
+            score_mode,
+            anchor_alpha,
+            anchor_floor,
+            anchor_cap,
+            multiplier,
+            idf_table=posts_idf_table,
+        )
 
     # Normalize guards
     mbs = max(0.0, float(min_base_score))
     mr = float(max_ratio)
 
+    # Per-subreddit anchor strings, built once instead of per seed
+    phrase_prefix = f"{anchor_phrase_lower} " if anchor_phrase_lower else ""
+    phrase_spaced = f" {phrase_prefix}"
+    phrase_words = (anchor_phrase_lower.count(" ") + 1) if anchor_phrase_lower else 0
+    token_prefix = f"{anchor_token} " if anchor_token else ""
+    token_spaced = f" {token_prefix}"
+
+    # Optionally suppress token-anchored variant when the phrase is just a normalized form of the token.
+    token_ok = bool(anchor_token)
+    if (not config.DEFAULT_COMPOSE_ALLOW_TOKEN_WITH_PHRASE) and anchor_phrase_lower and anchor_token:
+        if _alnum_norm(anchor_phrase_lower) == _alnum_norm(anchor_token):
+            # Example: 'trendytopic' vs 'trendy topic' -> drop token variant, keep phrase variant
+            token_ok = False
+
     for term, _seed_rank in seeds:
-        if max_per_sub and produced >= max_per_sub:
+        if remaining <= 0:
             break
         seed = _simplify_seed_for_composition(term)
         # Avoid composing when the anchor equals the seed (e.g., "pastlife" vs "past life", including 'lives' -> 'life')
@@ -209,28 +287,16 @@ def compose_theme_anchored_from_posts(
             continue
         # Skip if already anchored by anchor token or phrase
         t_spaced = f" {seed} "
-        if anchor_token and f" {anchor_token} " in t_spaced:
+        if token_prefix and token_spaced in t_spaced:
             continue
-        if anchor_phrase_lower and t_spaced.startswith(f" {anchor_phrase_lower} "):
+        if phrase_prefix and t_spaced.startswith(phrase_spaced):
             continue
         # Compose variants (prefer phrase when available)
         variants: List[str] = []
-        if anchor_phrase_lower:
-            final_words = (anchor_phrase_lower.count(" ") + 1) + n_words
-            if final_words <= max_final_words:
-                variants.append(f"{anchor_phrase_lower} {seed}")
-
-        # Optionally suppress token-anchored variant when the phrase is just a normalized form of the token.
-        token_ok = True
-        if (not config.DEFAULT_COMPOSE_ALLOW_TOKEN_WITH_PHRASE) and anchor_phrase_lower and anchor_token:
-            if _alnum_norm(anchor_phrase_lower) == _alnum_norm(anchor_token):
-                # Example: 'trendytopic' vs 'trendy topic' -> drop token variant, keep phrase variant
-                token_ok = False
-
-        if token_ok and anchor_token:
-            final_words = 1 + n_words
-            if final_words <= max_final_words:
-                variants.append(f"{anchor_token} {seed}")
+        if phrase_prefix and phrase_words + n_words <= max_final_words:
+            variants.append(phrase_prefix + seed)
+        if token_ok and 1 + n_words <= max_final_words:
+            variants.append(token_prefix + seed)
 
         # Score composed variants on the same scale as base TF-IDF (fairness)
         sc_base = float(base_scores_for_scale.get(term, seed_scores_for_ordering.get(term, 0.0)))
@@ -245,11 +311,9 @@ def compose_theme_anchored_from_posts(
             if v in base_scores_for_scale or v in out:
                 continue
             out[v] = composed_score
-            produced += 1
-            if max_per_sub and produced >= max_per_sub:
+            remaining -= 1
+            if remaining <= 0:
                 break
-        if max_per_sub and produced >= max_per_sub:
-            break
     return out
 
 
@@ -261,12 +325,17 @@ def compose_theme_anchored_from_seeds(
     max_final_words: int,
     multiplier: float,
     subjects_bonus: float,
-) -> Counter:
+) -> Dict[str, float]:
     """
     Compose anchored variants from an explicit list of seed phrases.
     Uses base_scores[seed] when available; otherwise uses a small baseline of 1.0.
     """
-    out = Counter()
+    out: Dict[str, float] = {}
+    phrase_prefix = f"{anchor_phrase_lower} " if anchor_phrase_lower else ""
+    phrase_spaced = f" {phrase_prefix}"
+    phrase_words = (anchor_phrase_lower.count(" ") + 1) if anchor_phrase_lower else 0
+    token_prefix = f"{anchor_token} " if anchor_token else ""
+    token_spaced = f" {token_prefix}"
     for term in seed_terms:
         if not term:
             continue
@@ -276,19 +345,15 @@ def compose_theme_anchored_from_seeds(
             continue  # prefer phrases
         # Avoid duplicating already-anchored
         t_spaced = f" {seed} "
-        if anchor_token and f" {anchor_token} " in t_spaced:
+        if token_prefix and token_spaced in t_spaced:
             continue
-        if anchor_phrase_lower and t_spaced.startswith(f" {anchor_phrase_lower} "):
+        if phrase_prefix and t_spaced.startswith(phrase_spaced):
             continue
         variants: List[str] = []
-        if anchor_phrase_lower:
-            final_words = (anchor_phrase_lower.count(" ") + 1) + n_words
-            if final_words <= max_final_words:
-                variants.append(f"{anchor_phrase_lower} {seed}")
-        if anchor_token:
-            final_words = 1 + n_words
-            if final_words <= max_final_words:
-                variants.append(f"{anchor_token} {seed}")
+        if phrase_prefix and phrase_words + n_words <= max_final_words:
+            variants.append(phrase_prefix + seed)
+        if token_prefix and 1 + n_words <= max_final_words:
+            variants.append(token_prefix + seed)
         if not variants:
             continue
         sc = base_scores.get(term, 1.0)
@@ -298,6 +363,26 @@ def compose_theme_anchored_from_seeds(
     return out
 
 
+def _emit_phrase_grams(toks: List[str], n_max: int, stoplist: Optional[set], out_set: set) -> None:
+    """
+    Add contiguous 2..n_max-grams of toks to out_set, skipping stoplisted phrases.
+    Same windows as tokens_to_ngrams (never crosses BOUNDARY_TOKEN) without building a Counter.
+    """
+    from .text_utils import BOUNDARY_TOKEN
+    n = len(toks)
+    for k in range(2, n_max + 1):
+        if n < k:
+            break
+        for i in range(0, n - k + 1):
+            window = toks[i : i + k]
+            if BOUNDARY_TOKEN in window:
+                continue
+            g = " ".join(window)
+            if stoplist and g in stoplist:
+                continue
+            out_set.add(g)
+
+
 def _collect_present_grams(
     frontpage_data: dict,
     max_ngram: int,
@@ -311,17 +396,11 @@ def _collect_present_grams(
     present: set = set()
     posts = frontpage_data.get("posts") or []
     from .posts_processing import _tokenize_post_text
-    from .text_utils import tokens_to_ngrams
     for post in posts:
         title = post.get("title", "") or ""
         preview = post.get("content_preview", "") or ""
         toks = _tokenize_post_text(title, preview, posts_extra_stopwords_set)
-        grams = tokens_to_ngrams(toks, max_ngram)
-        for g in list(grams.keys()):
-            if (g.count(" ") + 1) >= 2:
-                if posts_phrase_stoplist_set and g in posts_phrase_stoplist_set:
-                    continue
-                present.add(g)
+        _emit_phrase_grams(toks, max_ngram, posts_phrase_stoplist_set, present)
     return present
 
 
@@ -342,48 +421,37 @@ def recase_anchored_display(
         return f"{display_key}{suffix}"
     return term
 
-def _compose_rank_seeds_with_embed(seed_base: Counter, theme_text: str, model_name: str, alpha: float) -> Counter:
+def _compose_rank_seeds_with_embed(seed_base: Dict[str, float], theme_text: str, model_name: str, alpha: float) -> Dict[str, float]:
     """
     Rerank seed phrases by combining normalized local TF/score with embedding similarity to the theme.
     combined = (1 - alpha) * norm_tf + alpha * sim01
-    Returns a Counter mapping seed -> combined score.
+    Returns a dict mapping seed -> combined score.
     """
-    from .embedding import _get_embedder, _HAS_ST
+    from .embedding import _cosine_to_theme, _encode_texts, _get_embedder, _HAS_ST
     try:
         if not _HAS_ST:
-            return Counter(seed_base)
+            return dict(seed_base)
         embedder = _get_embedder(model_name)
         if embedder is None:
-            return Counter(seed_base)
+            return dict(seed_base)
         # Limit pool size for performance
-        items = list(seed_base.items())
-        items.sort(key=lambda kv: kv[1], reverse=True)
-        pool = items[:config.COMPOSE_SEED_MAX_POOL]
+        pool = heapq.nlargest(config.COMPOSE_SEED_MAX_POOL, seed_base.items(), key=itemgetter(1))
         terms = [t for t, _ in pool]
         max_tf = max((v for _, v in pool), default=1.0) or 1.0
-        theme_emb = embedder.encode([theme_text], normalize_embeddings=True)
-        term_embs = embedder.encode(terms, normalize_embeddings=True)
-        from sentence_transformers.util import cos_sim
-        try:
-            sims = cos_sim(theme_emb, term_embs).cpu().numpy().reshape(-1)
-        except Exception:
-            def _cos(a, b):
-                an = np.linalg.norm(a)
-                bn = np.linalg.norm(b)
-                if an <= 0 or bn <= 0:
-                    return 0.0
-                return float(np.dot(a, b) / (an * bn))
-            sims = np.array([_cos(theme_emb[0], term_embs[i]) for i in range(len(terms))], dtype=float)
+        # Theme and seeds in a single encode call
+        vecs = _encode_texts(embedder, model_name, [theme_text] + terms)
+        theme_emb, term_embs = vecs[:1], vecs[1:]
+        sims = _cosine_to_theme(theme_emb, term_embs)
         sims01 = (sims + 1.0) / 2.0
-        out = Counter()
+        out: Dict[str, float] = {}
         a = max(0.0, min(1.0, float(alpha)))
         for (term, tf), s in zip(pool, sims01):
             norm_tf = float(tf) / max_tf
             out[term] = (1.0 - a) * norm_tf + a * float(s)
         # Include any remaining terms with plain TF to avoid dropping tail
-        for term, tf in items[config.COMPOSE_SEED_MAX_POOL:]:
+        for term, tf in seed_base.items():
             if term not in out:
                 out[term] = float(tf) / (max_tf or 1.0)
         return out
     except Exception:
-        return Counter(seed_base)
\ No newline at end of file
+        return dict(seed_base)
\ No newline at end of file
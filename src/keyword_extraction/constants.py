@@ -86,7 +86,7 @@ EXPANSIONS = {
     "fps": ["first person shooter"],
 }
 # Tokens to trim from the tail of seed phrases during composition (kept deterministic and small)
-COMPOSE_TRIM_TAIL_TOKENS = {
+COMPOSE_TRIM_TAIL_TOKENS = frozenset({
     "minute", "minutes", "hour", "hours", "day", "days",
     "today", "yesterday", "tomorrow", "question", "help"
-}
\ No newline at end of file
+})
\ No newline at end of file
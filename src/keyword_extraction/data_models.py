@@ -2,15 +2,96 @@
 Dataclasses for keyword extraction.
 """
 from __future__ import annotations
+from collections import Counter
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, FrozenSet, List, Optional
 
 @dataclass
 class SubDoc:
+    # Explicit slots (dataclass(slots=True) needs Python 3.10): no per-instance __dict__
+    # for the many docs held by the pass-1/pass-2 cache and pickled to workers
+    __slots__ = ("community_id", "name", "url", "rank", "subscribers_count", "desc_text", "name_terms")
+
     community_id: str
     name: str
     url: str
     rank: int | None
     subscribers_count: int | None
     desc_text: str
-    name_terms: List[str]
\ No newline at end of file
+    name_terms: List[str]
+
+
+@dataclass(frozen=True)
+class Pass2Context:
+    """
+    Read-only per-run state for pass 2 (per-subreddit scoring), built once by process_inputs
+    and handed to each pool worker once via the pool initializer.
+    """
+    # Corpus state from pass 1
+    docfreq: Counter
+    total_docs: int
+    desc_idf_table: List[float]
+    desc_common_unigrams_set: FrozenSet[str]
+    posts_docfreq: Counter
+    posts_total_docs: int
+    posts_idf_table: Optional[List[float]]
+    frontpage_index: Dict[str, str]
+    posts_extra_stopwords_set: FrozenSet[str]
+    posts_phrase_stoplist_set: FrozenSet[str]
+    # Options
+    clean_collapse_adj_dups: bool
+    clean_dedupe_near: bool
+    compose_anchor_alpha: float
+    compose_anchor_cap: float
+    compose_anchor_floor: float
+    compose_anchor_include_unigrams: bool
+    compose_anchor_max_final_words: int
+    compose_anchor_max_per_sub: int
+    compose_anchor_max_ratio: float
+    compose_anchor_min_base_score: float
+    compose_anchor_multiplier: float
+    compose_anchor_posts: bool
+    compose_anchor_score_mode: str
+    compose_anchor_top_m: int
+    compose_anchor_use_title: bool
+    compose_seed_embed: bool
+    compose_seed_embed_alpha: float
+    compose_seed_source: str
+    core_topk: Optional[int]
+    desc_drop_generic_unigrams: bool
+    desc_generic_df_ratio: float
+    desc_idf_power: float
+    desc_weight: float
+    drop_nonlatin: bool
+    embed_alpha: float
+    embed_candidate_pool: str
+    embed_k_terms: int
+    embed_model: str
+    embed_rerank: bool
+    emit_core_extended: bool
+    extended_topk: Optional[int]
+    llm_summary_enabled: bool
+    max_ngram: int
+    max_nonascii_ratio: float
+    min_df_bigram: int
+    min_df_trigram: int
+    name_weight: float
+    posts_anchor_generics: bool
+    posts_composed_weight: Optional[float]
+    posts_drop_generic_unigrams: bool
+    posts_drop_nonlatin_posts: bool
+    posts_engagement_alpha: float
+    posts_ensure_k: int
+    posts_generic_df_ratio: float
+    posts_halflife_days: float
+    posts_idf_power: float
+    posts_max_nonascii_ratio: float
+    posts_phrase_boost_bigram: float
+    posts_phrase_boost_trigram: float
+    posts_replace_generic_with_anchored: bool
+    posts_skip_promoted: bool
+    posts_theme_penalty: float
+    posts_theme_top_desc_k: int
+    posts_weight: float
+    require_frontpage: bool
+    topk: int
@@ -1,10 +1,14 @@
 """
 Functions for embedding-based reranking of keywords.
 """
-from collections import Counter
 from typing import Dict, List, Optional, Tuple
 
+import atexit
+import heapq
+import json
+import multiprocessing
 import os
+import re
 import sys
 import numpy as np
 try:
@@ -18,7 +22,6 @@ except Exception:
 _HAS_ST = False
 try:
     from sentence_transformers import SentenceTransformer
-    from sentence_transformers.util import cos_sim
     _HAS_ST = True
 except Exception:
     _HAS_ST = False
@@ -85,16 +88,181 @@ def _get_embedder(model_name: str) -> Optional["SentenceTransformer"]:
         return None
 
 
-def _build_theme_text(full_lower: str, desc_tfidf: Counter, top_desc_k: int) -> str:
+# Optional on-disk embedding cache (env EMBED_CACHE_DIR): model -> {text: normalized vector}
+_EMBED_DISK_CACHE: Dict[str, Dict[str, np.ndarray]] = {}
+_EMBED_DISK_DIRTY: Dict[str, bool] = {}
+# Vectors a pool worker encoded for the disk cache; handed to the parent, which persists them
+_EMBED_WORKER_NEW: Dict[str, Dict[str, np.ndarray]] = {}
+# In-process vector memo used when the disk cache is off; a subreddit's theme text and top terms
+# are re-encoded by the seed rerank, the main rerank and the core/extended reranks otherwise.
+_EMBED_MEMO: Dict[str, Dict[str, np.ndarray]] = {}
+_EMBED_MEMO_MAX_TEXTS = 100_000
+_EMBED_BATCH_SIZE_DEFAULT = 64
+# Stored vectors are float16 (half the memory/disk of float32); similarities are computed in float32
+_EMBED_STORE_DTYPE = np.float16
+
+
+def _embed_cache_base(model_name: str) -> Optional[str]:
+    cache_dir = (os.getenv("EMBED_CACHE_DIR") or "").strip()
+    if not cache_dir:
+        return None
+    safe = re.sub(r"[^0-9A-Za-z._-]+", "_", model_name)
+    return os.path.join(cache_dir, safe)
+
+
+def _embed_disk_writable() -> bool:
+    # Pool workers (fork or spawn) never write the cache file; the parent merges their vectors
+    return multiprocessing.parent_process() is None
+
+
+def _take_worker_embeddings() -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Return and reset the vectors this pool worker encoded for the disk cache since the last call
+    (model -> {text: vector}); empty in the parent or when EMBED_CACHE_DIR is unset.
+    """
+    if not _EMBED_WORKER_NEW:
+        return {}
+    new = dict(_EMBED_WORKER_NEW)
+    _EMBED_WORKER_NEW.clear()
+    return new
+
+
+def _merge_worker_embeddings(new: Dict[str, Dict[str, np.ndarray]]) -> None:
+    """Add vectors returned by pool workers to this process's disk cache (saved by the flush)."""
+    for model_name, vecs in new.items():
+        store = _load_embed_disk_cache(model_name)
+        if store is None:
+            continue
+        for t, v in vecs.items():
+            if t not in store:
+                store[t] = v
+                _EMBED_DISK_DIRTY[model_name] = True
+
+
+def _embed_batch_size() -> int:
+    # env EMBED_BATCH_SIZE overrides the default; lower it for large models or tight (V)RAM
+    try:
+        return max(1, int((os.getenv("EMBED_BATCH_SIZE") or "").strip() or _EMBED_BATCH_SIZE_DEFAULT))
+    except ValueError:
+        return _EMBED_BATCH_SIZE_DEFAULT
+
+
+def _load_embed_disk_cache(model_name: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Lazily load the persisted vectors for model_name (<base>.npz holding "vocab", the texts as
+    UTF-8 JSON bytes, and "matrix" rows). Returns None when the disk cache is disabled.
+    """
+    base = _embed_cache_base(model_name)
+    if base is None:
+        return None
+    store = _EMBED_DISK_CACHE.get(model_name)
+    if store is not None:
+        return store
+    store = {}
+    try:
+        if os.path.exists(base + ".npz"):
+            with np.load(base + ".npz", allow_pickle=False) as data:
+                vocab = json.loads(data["vocab"].tobytes().decode("utf-8"))
+                matrix = data["matrix"]
+            if isinstance(vocab, list) and matrix.ndim == 2 and len(vocab) == matrix.shape[0]:
+                matrix = matrix.astype(_EMBED_STORE_DTYPE, copy=False)
+                store = {t: matrix[i] for i, t in enumerate(vocab)}
+            else:
+                print(f"[embed] ignoring inconsistent embedding cache at {base}.npz", file=sys.stderr)
+    except Exception as e:
+        print(f"[embed] failed to load embedding cache {base}.npz: {e}", file=sys.stderr)
+        store = {}
+    if not _EMBED_DISK_CACHE and _embed_disk_writable():
+        atexit.register(_flush_embed_disk_caches)
+    _EMBED_DISK_CACHE[model_name] = store
+    _EMBED_DISK_DIRTY[model_name] = False
+    return store
+
+
+def _flush_embed_disk_caches() -> None:
+    """
+    Persist caches that gained vectors this run (including those merged from pool workers).
+    Vocab and matrix go into one .npz written to a per-process tmp file and swapped in with a
+    single os.replace. No-op inside pool workers.
+    """
+    if not _embed_disk_writable():
+        return
+    for model_name, store in _EMBED_DISK_CACHE.items():
+        if not _EMBED_DISK_DIRTY.get(model_name) or not store:
+            continue
+        base = _embed_cache_base(model_name)
+        if base is None:
+            continue
+        tmp = f"{base}.npz.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+            vocab = list(store.keys())
+            matrix = np.stack([store[t] for t in vocab])
+            with open(tmp, "wb") as f:
+                # Variable-length vocab: a fixed-width '<U' array would pad every text to the longest
+                vocab_bytes = np.frombuffer(json.dumps(vocab, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+                np.savez(f, vocab=vocab_bytes, matrix=matrix)
+            os.replace(tmp, base + ".npz")
+            _EMBED_DISK_DIRTY[model_name] = False
+        except Exception as e:
+            print(f"[embed] failed to save embedding cache {base}.npz: {e}", file=sys.stderr)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def _encode_texts(embedder: "SentenceTransformer", model_name: str, texts: List[str]) -> np.ndarray:
+    """
+    Encode texts with normalized embeddings. Vectors are looked up per (model, text) and only
+    misses are sent to the model, in one batched call. With EMBED_CACHE_DIR set the store is the
+    persistent per-model cache; otherwise a bounded in-process memo (cleared when full).
+    Vectors are stored as float16 and returned as a float32 matrix.
+    """
+    store = _load_embed_disk_cache(model_name)
+    persistent = store is not None
+    if store is None:
+        store = _EMBED_MEMO.setdefault(model_name, {})
+        if len(store) > _EMBED_MEMO_MAX_TEXTS:
+            store.clear()
+    misses = [t for t in dict.fromkeys(texts) if t not in store]
+    if misses:
+        vecs = np.asarray(
+            embedder.encode(misses, batch_size=_embed_batch_size(), normalize_embeddings=True),
+            dtype=_EMBED_STORE_DTYPE,
+        )
+        for t, v in zip(misses, vecs):
+            store[t] = v
+        if persistent:
+            if _embed_disk_writable():
+                _EMBED_DISK_DIRTY[model_name] = True
+            else:
+                _EMBED_WORKER_NEW.setdefault(model_name, {}).update(zip(misses, vecs))
+    return np.stack([store[t] for t in texts]).astype(np.float32)
+
+
+def _cosine_to_theme(theme_emb: np.ndarray, term_embs: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of each row of term_embs (K, dim) to theme_emb (1, dim) as one BLAS
+    matrix-vector product; zero-norm rows get 0.0.
+    """
+    theme = theme_emb.reshape(-1).astype(np.float32, copy=False)
+    mat = term_embs.astype(np.float32, copy=False)
+    dots = mat @ theme
+    norms = np.linalg.norm(mat, axis=1) * float(np.linalg.norm(theme))
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+def _build_theme_text(full_lower: str, top_desc: List[Tuple[str, float]]) -> str:
     """
     Build a concise theme string from the whole subreddit name phrase + top-K description terms.
+    top_desc is already selected and ordered by score (highest first).
     """
     parts: List[str] = []
     if full_lower:
         parts.append(full_lower)
-    if desc_tfidf and top_desc_k > 0:
-        for g, _ in sorted(desc_tfidf.items(), key=lambda x: x[1], reverse=True)[:top_desc_k]:
-            parts.append(g)
+    for g, _ in top_desc:
+        parts.append(g)
     return " ; ".join(parts)
 
 
@@ -123,9 +291,6 @@ def embed_rerank_terms(
     if embedder is None:
         return merged
 
-    # Select candidates by current score then filter by pool
-    items = sorted(merged.items(), key=lambda kv: kv[1][0], reverse=True)
-
     def _in_pool(src: str) -> bool:
         if candidate_pool == "union":
             return True
@@ -140,30 +305,24 @@ def embed_rerank_terms(
             return not (parts == {"name"})
         return True
 
-    filtered = [(t, (s, src)) for (t, (s, src)) in items if _in_pool(src)]
-    top_items = filtered[: max(0, k_terms)]
+    # Select top-K candidates in the pool by current score (heap-based; same order as a stable full sort)
+    top_items = heapq.nlargest(
+        max(0, k_terms),
+        ((t, v) for t, v in merged.items() if _in_pool(v[1])),
+        key=lambda kv: kv[1][0],
+    )
     if not top_items:
         return merged
 
     terms = [t for t, _ in top_items]
     try:
-        theme_emb = embedder.encode([theme_text], normalize_embeddings=True)
-        term_embs = embedder.encode(terms, normalize_embeddings=True)
+        # Theme and candidates in a single encode call
+        vecs = _encode_texts(embedder, model_name, [theme_text] + terms)
+        theme_emb, term_embs = vecs[:1], vecs[1:]
     except Exception:
         return merged
 
-    # cos_sim returns matrix (1, K)
-    try:
-        sims = cos_sim(theme_emb, term_embs).cpu().numpy().reshape(-1)
-    except Exception:
-        # Fallback cosine
-        def _cos(a, b):
-            an = np.linalg.norm(a)
-            bn = np.linalg.norm(b)
-            if an <= 0 or bn <= 0:
-                return 0.0
-            return float(np.dot(a, b) / (an * bn))
-        sims = np.array([_cos(theme_emb[0], term_embs[i]) for i in range(len(terms))], dtype=float)
+    sims = _cosine_to_theme(theme_emb, term_embs)
 
     # Map similarity to [0,1]
     sims01 = (sims + 1.0) / 2.0
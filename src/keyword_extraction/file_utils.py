@@ -1,7 +1,142 @@
+import hashlib
+import json
 import os
+import pickle
 import re
+from collections import OrderedDict
 from glob import glob
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_json_ext_re = re.compile(r"\.json$", re.IGNORECASE)
+
+# Optional fast JSON parser (C extension); stdlib json is the fallback
+_HAS_ORJSON = False
+try:
+    import orjson as _orjson  # type: ignore
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
+
+
+def load_json_file(path: str) -> Any:
+    """
+    Parse a JSON file, using orjson when available.
+    Falls back to stdlib json for inputs orjson rejects (e.g., NaN/Infinity literals).
+    """
+    if _HAS_ORJSON:
+        with open(path, "rb") as f:
+            raw = f.read()
+        try:
+            return _orjson.loads(raw)
+        except ValueError:
+            return json.loads(raw.decode("utf-8"))
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Frontpage cache layers:
+#  - on disk (env FP_CACHE_DIR): parsed JSON pickled to <sha1(abspath)>.pkl, tagged with the source (mtime_ns, size)
+#  - in process (env FP_CACHE_MAX_MB, default 0 = off): LRU of parsed dicts, budgeted by source file size
+_FP_MEMO: "OrderedDict[str, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+_FP_MEMO_BYTES = 0
+
+
+def _fp_memo_budget() -> int:
+    try:
+        return max(0, int(float(os.getenv("FP_CACHE_MAX_MB", "0")) * 1024 * 1024))
+    except Exception:
+        return 0
+
+
+def _fp_memo_put(path: str, sig: Tuple[int, int], data: Any) -> None:
+    global _FP_MEMO_BYTES
+    budget = _fp_memo_budget()
+    if budget <= 0 or sig[1] > budget:
+        return
+    old = _FP_MEMO.pop(path, None)
+    if old is not None:
+        _FP_MEMO_BYTES -= old[0][1]
+    _FP_MEMO[path] = (sig, data)
+    _FP_MEMO_BYTES += sig[1]
+    while _FP_MEMO_BYTES > budget and _FP_MEMO:
+        _, (old_sig, _) = _FP_MEMO.popitem(last=False)
+        _FP_MEMO_BYTES -= old_sig[1]
+
+
+def load_frontpage(path: str) -> Any:
+    """
+    Load a frontpage.json, reusing a parsed copy when the file's (mtime_ns, size) is unchanged.
+    Callers must treat the returned data as read-only (it may be shared via the in-process LRU).
+    """
+    st = os.stat(path)
+    sig = (st.st_mtime_ns, st.st_size)
+    hit = _FP_MEMO.get(path)
+    if hit is not None and hit[0] == sig:
+        _FP_MEMO.move_to_end(path)
+        return hit[1]
+
+    cache_dir = (os.getenv("FP_CACHE_DIR") or "").strip()
+    pkl_path = ""
+    data: Any = None
+    if cache_dir:
+        key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        pkl_path = os.path.join(cache_dir, f"{key}.pkl")
+        try:
+            with open(pkl_path, "rb") as f:
+                cached_sig, cached = pickle.load(f)
+            if tuple(cached_sig) == sig:
+                data = cached
+        except Exception:
+            data = None
+
+    if data is None:
+        data = load_json_file(path)
+        if pkl_path:
+            try:
+                ensure_dir(cache_dir)
+                tmp = f"{pkl_path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    pickle.dump((sig, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, pkl_path)
+            except Exception:
+                pass
+
+    _fp_memo_put(path, sig, data)
+    return data
+
+
+def dump_json_line(obj: Any) -> bytes:
+    """
+    Serialize one NDJSON record (UTF-8, compact separators, trailing newline).
+    Uses orjson when available; the stdlib fallback emits the same layout.
+    """
+    if _HAS_ORJSON:
+        try:
+            return _orjson.dumps(obj, option=_orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def fingerprint_paths(paths: List[str], *extra: Any) -> str:
+    """
+    Stable hex digest over (path, mtime_ns, size) for each path plus any extra settings.
+    Used to key on-disk DF caches so any changed/added/removed input invalidates them.
+    """
+    h = hashlib.sha1()
+    for x in extra:
+        h.update(repr(x).encode("utf-8"))
+        h.update(b"\0")
+    for p in paths:
+        try:
+            st = os.stat(p)
+            sig = f"{p}\t{st.st_mtime_ns}\t{st.st_size}"
+        except OSError:
+            sig = f"{p}\t-"
+        h.update(sig.encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
 
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
@@ -9,10 +144,38 @@ def ensure_dir(path: str) -> None:
 
 def out_path_for_input(output_dir: str, input_path: str) -> str:
     base = os.path.basename(input_path)
-    base = re.sub(r"\.json$", "", base, flags=re.IGNORECASE)
+    base = _json_ext_re.sub("", base)
     return os.path.join(output_dir, f"{base}.keywords.jsonl")
 
 
+# root -> (exact folder -> path, casefolded folder names)
+_FOLDER_FRONTPAGES: Dict[str, Tuple[Dict[str, str], Set[str]]] = {}
+
+
+def frontpage_path_for_folder(root: str, folder: str) -> Optional[str]:
+    """
+    Return <root>/<folder>/frontpage.json if it exists, else None.
+    The listing of root is taken once per process (one glob instead of a stat per lookup).
+    A folder that only matches up to case is confirmed with os.path.exists, so case-insensitive
+    filesystems (macOS/Windows defaults) still resolve it.
+    """
+    if not folder:
+        return None
+    listing = _FOLDER_FRONTPAGES.get(root)
+    if listing is None:
+        exact: Dict[str, str] = {}
+        for p in glob(os.path.join(root, "*", "frontpage.json")):
+            exact[os.path.basename(os.path.dirname(p))] = p
+        listing = _FOLDER_FRONTPAGES[root] = (exact, {f.casefold() for f in exact})
+    exact, folded = listing
+    path = exact.get(folder)
+    if path is None and folder.casefold() in folded:
+        candidate = os.path.join(root, folder, "frontpage.json")
+        if os.path.exists(candidate):
+            path = candidate
+    return path
+
+
 def _build_frontpage_index(frontpage_glob: Optional[str]) -> Tuple[Dict[str, str], List[str]]:
     """
     Build index canonical_key -> frontpage_path for fast lookup.
@@ -22,12 +185,13 @@ def _build_frontpage_index(frontpage_glob: Optional[str]) -> Tuple[Dict[str, str
         return {}, []
     paths = sorted(glob(frontpage_glob))
     index: Dict[str, str] = {}
+    suffix = "/frontpage.json"
     for p in paths:
         # Expect .../output/subreddits/NAME/frontpage.json
-        m = re.search(r"/subreddits/([^/]+)/frontpage\.json$", p)
-        if not m:
+        if not p.endswith(suffix):
+            continue
+        parent, _, folder = p[: -len(suffix)].rpartition("/")
+        if not folder or not parent.endswith("/subreddits"):
             continue
-        folder = m.group(1)
-        key = folder.lower()
-        index[key] = p
+        index[folder.lower()] = p
     return index, paths
\ No newline at end of file
@@ -2,6 +2,7 @@
 Functions for processing subreddit names.
 """
 import re
+from functools import lru_cache
 from typing import List, Tuple
 
 from .text_utils import (
@@ -12,6 +13,9 @@ from .text_utils import (
     filter_stop_tokens,
 )
 
+_rslash_prefix_re = re.compile(r"^r/+", re.IGNORECASE)
+_ws_re = re.compile(r"\s+")
+
 
 def extract_name_terms(raw_name: str) -> List[str]:
     """
@@ -29,7 +33,7 @@ def extract_name_terms(raw_name: str) -> List[str]:
 
     name = raw_name.strip()
     # remove r/ prefix and trailing slash
-    name = re.sub(r"^r/+", "", name, flags=re.IGNORECASE)
+    name = _rslash_prefix_re.sub("", name)
     name = name.rstrip("/")
 
     # normalize delimiters
@@ -37,7 +41,7 @@ def extract_name_terms(raw_name: str) -> List[str]:
     name = normalize_space(name)
 
     # split tokens (keep case for camel split)
-    rough_tokens = re.split(r"\s+", name)
+    rough_tokens = _ws_re.split(name)
 
     split_tokens: List[str] = []
     for tok in rough_tokens:
@@ -90,6 +94,7 @@ def extract_name_terms(raw_name: str) -> List[str]:
     return ordered_terms
 
 
+@lru_cache(maxsize=200_000)
 def extract_name_full_phrase(raw_name: str) -> Tuple[str, str]:
     """
     Build the WHOLE phrase from the subreddit name by robust splitting/segmentation.
@@ -102,12 +107,12 @@ def extract_name_full_phrase(raw_name: str) -> Tuple[str, str]:
         return "", ""
 
     name = raw_name.strip()
-    name = re.sub(r"^r/+", "", name, flags=re.IGNORECASE)
+    name = _rslash_prefix_re.sub("", name)
     name = name.rstrip("/")
     name = name.replace("_", " ").replace("-", " ").replace(".", " ")
     name = normalize_space(name)
 
-    rough_tokens = re.split(r"\s+", name)
+    rough_tokens = _ws_re.split(name)
 
     lower_tokens: List[str] = []
     cased_tokens: List[str] = []
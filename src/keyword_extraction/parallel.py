@@ -0,0 +1,76 @@
+"""
+Process-pool helpers for the keyword extraction passes.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Sequence, TypeVar
+
+from . import config
+
+T = TypeVar("T")
+
+# Read-only per-run state handed to each worker once (see process_pool)
+_WORKER_CONTEXT: Any = None
+
+
+def config_snapshot() -> Dict[str, Any]:
+    """
+    Capture module-level config values (CLI toggles are applied by mutating config),
+    so workers started with the 'spawn' method tokenize exactly like the parent.
+    """
+    return {k: v for k, v in vars(config).items() if k.isupper()}
+
+
+def _init_worker(snapshot: Dict[str, Any], context: Any = None) -> None:
+    global _WORKER_CONTEXT
+    for k, v in snapshot.items():
+        setattr(config, k, v)
+    _WORKER_CONTEXT = context
+
+
+def worker_context() -> Any:
+    """
+    Return the context passed to process_pool() (inside a worker process).
+    """
+    return _WORKER_CONTEXT
+
+
+def process_pool(workers: int, context: Any = None) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers share the parent's config and receive
+    `context` once at startup instead of with every task.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max(1, int(workers)),
+        initializer=_init_worker,
+        initargs=(config_snapshot(), context),
+    )
+
+
+def chunk_list(items: Sequence[T], n_chunks: int) -> List[List[T]]:
+    """
+    Split items into at most n_chunks contiguous, non-empty slices of near-equal size.
+    """
+    n = len(items)
+    if n == 0:
+        return []
+    n_chunks = max(1, min(int(n_chunks), n))
+    size, extra = divmod(n, n_chunks)
+    out: List[List[T]] = []
+    start = 0
+    for i in range(n_chunks):
+        end = start + size + (1 if i < extra else 0)
+        out.append(list(items[start:end]))
+        start = end
+    return out
+
+
+def run_unordered(fn: Callable[[Any], T], tasks: List[Any], workers: int, context: Any = None) -> Iterator[T]:
+    """
+    Run fn(task) for each task in a process pool and yield results as they complete.
+    fn must be a module-level function (picklable); shared read-only data goes in `context`
+    (see worker_context) so it is sent once per worker instead of with every task.
+    """
+    with process_pool(workers, context) as ex:
+        futures = [ex.submit(fn, t) for t in tasks]
+        for fut in as_completed(futures):
+            yield fut.result()
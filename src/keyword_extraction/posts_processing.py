@@ -1,17 +1,25 @@
 """
 Functions for processing subreddit posts.
 """
-import json
 import math
 import re
 from collections import Counter
 from datetime import datetime, timezone
-from typing import List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from . import config
+from .file_utils import load_frontpage
+from .parallel import chunk_list, run_unordered, worker_context
 from .text_utils import filter_stop_tokens, tokens_to_ngrams, tokenize_simple
 
 
+def _add_inplace(dst: Dict[str, float], src: Dict[str, float]) -> None:
+    """dst += src for plain dicts (avoids Counter.update dispatch on the per-post path)."""
+    get = dst.get
+    for k, v in src.items():
+        dst[k] = get(k, 0) + v
+
+
 def _parse_created_ts(ts: str) -> Optional[datetime]:
     if not ts:
         return None
@@ -53,6 +61,20 @@ def _tokenize_post_text(title: str, preview: str, posts_extra_stopwords: Optiona
     return tokens
 
 
+def _posts_docfreq_chunk(task: Tuple) -> Tuple[Counter, int]:
+    paths, max_ngram, skip_promoted, drop_nonlatin_posts, max_nonascii_ratio = task
+    extra_stopwords, phrase_stoplist = worker_context()
+    return build_posts_docfreq(
+        paths,
+        max_ngram,
+        extra_stopwords,
+        phrase_stoplist,
+        skip_promoted=skip_promoted,
+        drop_nonlatin_posts=drop_nonlatin_posts,
+        max_nonascii_ratio=max_nonascii_ratio,
+    )
+
+
 def build_posts_docfreq(
     frontpage_paths: List[str],
     max_ngram: int,
@@ -61,18 +83,30 @@ def build_posts_docfreq(
     skip_promoted: bool = config.DEFAULT_POSTS_SKIP_PROMOTED,
     drop_nonlatin_posts: bool = config.DEFAULT_POSTS_DROP_NONLATIN_POSTS,
     max_nonascii_ratio: float = config.DEFAULT_POSTS_MAX_NONASCII_RATIO,
+    workers: int = 1,
 ) -> Tuple[Counter, int]:
     """
     Compute DF across subreddits' frontpages for n-grams from post titles/previews.
     Returns (docfreq, total_docs) where total_docs = number of frontpage docs considered.
+    With workers > 1, frontpages are split across a process pool and partial DFs are summed.
     """
     docfreq = Counter()
     total_docs = 0
 
+    if workers > 1 and len(frontpage_paths) > 1:
+        tasks = [
+            (chunk, max_ngram, skip_promoted, drop_nonlatin_posts, max_nonascii_ratio)
+            for chunk in chunk_list(frontpage_paths, workers * 4)
+        ]
+        stoplists = (posts_extra_stopwords, posts_phrase_stoplist)
+        for part_df, part_docs in run_unordered(_posts_docfreq_chunk, tasks, workers, context=stoplists):
+            docfreq.update(part_df)
+            total_docs += part_docs
+        return docfreq, total_docs
+
     for p in frontpage_paths:
         try:
-            with open(p, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = load_frontpage(p)
         except Exception:
             continue
         posts = data.get("posts") or []
@@ -132,13 +166,11 @@ def build_posts_docfreq(
                 for pg in list(grams.keys()):
                     if pg in posts_phrase_stoplist:
                         del grams[pg]
-            for g in grams.keys():
-                grams_present.add(g)
+            grams_present.update(grams.keys())
 
         if grams_present:
             total_docs += 1
-            for g in grams_present:
-                docfreq[g] += 1
+            docfreq.update(grams_present)
 
     return docfreq, total_docs
 
@@ -165,7 +197,8 @@ def compute_posts_tfidf_for_frontpage(
     skip_promoted: bool = config.DEFAULT_POSTS_SKIP_PROMOTED,
     drop_nonlatin_posts: bool = config.DEFAULT_POSTS_DROP_NONLATIN_POSTS,
     max_nonascii_ratio: float = config.DEFAULT_POSTS_MAX_NONASCII_RATIO,
-) -> Tuple[Counter, Counter]:
+    idf_table: Optional[List[float]] = None,
+) -> Tuple[Dict[str, float], Dict[str, int]]:
     """
     Compute posts TF-IDF with optional engagement blending and IDF damping.
 
@@ -180,16 +213,18 @@ def compute_posts_tfidf_for_frontpage(
     - Optionally drop globally generic unigrams (by DF ratio across frontpages)
     - Optionally drop globally generic phrases (bi/tri-grams) by DF ratio across frontpages
 
+    idf_table: optional build_idf_table(total_docs, idf_power) result used instead of per-gram log/pow.
+
     Returns (tfidf_scores, local_grams_tf) where local_grams_tf are raw bigram/trigram counts for composition.
     """
     posts = frontpage_data.get("posts") or []
     if not posts:
-        return Counter(), Counter()
+        return {}, {}
 
     ref_time = _parse_scraped_at(frontpage_data)
 
-    weighted_tf = Counter()
-    local_grams_tf = Counter()  # unweighted counts for "ensure phrases" and composition
+    weighted_tf: Dict[str, float] = {}
+    local_grams_tf: Dict[str, int] = {}  # unweighted counts for "ensure phrases" and composition
     # Local helpers for post-level language gating
     def _has_cjk_text(s: str) -> bool:
         try:
@@ -243,7 +278,7 @@ def compute_posts_tfidf_for_frontpage(
             for pg in list(grams.keys()):
                 if pg in posts_phrase_stoplist:
                     del grams[pg]
-        local_grams_tf.update(grams)
+        _add_inplace(local_grams_tf, grams)
 
         score = max(0, int(post.get("score") or 0))
         comments = max(0, int(post.get("comments") or 0))
@@ -262,10 +297,11 @@ def compute_posts_tfidf_for_frontpage(
         base = (1.0 - engagement_alpha) * 1.0 + engagement_alpha * engagement_component
         post_weight = base * recency
 
+        wt_get = weighted_tf.get
         for g, c in grams.items():
-            weighted_tf[g] += c * post_weight
+            weighted_tf[g] = wt_get(g, 0.0) + c * post_weight
 
-    tfidf = Counter()
+    tfidf: Dict[str, float] = {}
     for g, tf in weighted_tf.items():
         n_words = g.count(" ") + 1
         df = docfreq.get(g, 0)
@@ -284,8 +320,11 @@ def compute_posts_tfidf_for_frontpage(
             if df_ratio >= generic_phrase_df_ratio:
                 continue
 
-        idf = math.log((1.0 + total_docs) / (1.0 + df)) + 1.0
-        idf_eff = idf ** max(0.0, float(idf_power))
+        if idf_table is not None and df < len(idf_table):
+            idf_eff = idf_table[df]
+        else:
+            idf = math.log((1.0 + total_docs) / (1.0 + df)) + 1.0
+            idf_eff = idf ** max(0.0, float(idf_power))
         boost = 1.0
         if n_words == 2:
             boost = posts_phrase_boost_bigram
@@ -322,14 +361,14 @@ def compute_posts_tfidf_for_frontpage(
 
 
 def apply_anchored_variants_for_generic_posts_terms(
-    posts_scores: Counter,
+    posts_scores: Dict[str, float],
     docfreq: Counter,
     total_docs: int,
     anchor_token: str,
     generic_df_ratio: float,
     replace_original_generic: bool = False,
     anchor_phrase_lower: str = "",
-) -> Counter:
+) -> Dict[str, float]:
     """
     For generic terms (high DF ratio) that do not include the anchor token, add an anchored variant:
       e.g., "abusing system" -> "valorant abusing system"
@@ -357,7 +396,7 @@ def apply_anchored_variants_for_generic_posts_terms(
         except Exception:
             phrase_norm_eq_token = False
 
-    out = Counter(posts_scores)
+    out = dict(posts_scores)
     for term, score in posts_scores.items():
         lt = f" {term} "
         # Skip if already contains the token-anchored form
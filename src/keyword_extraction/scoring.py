@@ -1,20 +1,28 @@
 """
 Functions for scoring and merging keywords from different sources.
 """
+import heapq
 import math
 from collections import Counter
 from typing import Dict, List, Set, Tuple, Optional
 
 from . import config
 from .description_processing import extract_desc_terms
+from .parallel import chunk_list, run_unordered
 from .subreddit_data import iter_subreddits_from_file, canonicalize_subreddit_key
 from .text_utils import tokens_to_ngrams
 
 
+def _docfreq_chunk(task: Tuple[List[str], int, Optional[Set[str]]]) -> Tuple[Counter, int]:
+    paths, max_ngram, allowed_keys = task
+    return build_docfreq(paths, max_ngram, allowed_keys=allowed_keys)
+
+
 def build_docfreq(
     input_paths: List[str],
     max_ngram: int,
     allowed_keys: Optional[Set[str]] = None,
+    workers: int = 1,
 ) -> Tuple[Counter, int]:
     """
     First pass: compute document frequency for description n-grams across all selected files.
@@ -22,10 +30,20 @@ def build_docfreq(
 
     If allowed_keys is provided, only subreddits whose canonical key appears in allowed_keys
     are counted. This lets us align description DF with the subset that has frontpage data.
+
+    With workers > 1, files are split across a process pool and the partial Counters are summed
+    (DF is additive over disjoint document sets, so the result is identical).
     """
     docfreq = Counter()
     total_docs = 0
 
+    if workers > 1 and len(input_paths) > 1:
+        tasks = [(chunk, max_ngram, allowed_keys) for chunk in chunk_list(input_paths, workers * 4)]
+        for part_df, part_docs in run_unordered(_docfreq_chunk, tasks, workers):
+            docfreq.update(part_df)
+            total_docs += part_docs
+        return docfreq, total_docs
+
     use_filter = bool(allowed_keys)
 
     for p in input_paths:
@@ -40,12 +58,23 @@ def build_docfreq(
             total_docs += 1
             tokens = extract_desc_terms(sub.desc_text, max_ngram)
             grams = tokens_to_ngrams(tokens, max_ngram)
-            for g in grams.keys():
-                docfreq[g] += 1
+            # Each key appears once per doc, so a C-level update adds exactly +1 DF per gram
+            docfreq.update(grams.keys())
 
     return docfreq, total_docs
 
 
+def build_idf_table(total_docs: int, idf_power: float) -> List[float]:
+    """
+    Precompute damped IDF for every possible df in [0, N]:
+      table[df] = (log((1 + N) / (1 + df)) + 1) ** idf_power
+    df is bounded by N, so per-gram scoring becomes a list lookup instead of log + pow.
+    """
+    p = max(0.0, float(idf_power))
+    n = max(0, int(total_docs))
+    return [(math.log((1.0 + n) / (1.0 + df)) + 1.0) ** p for df in range(n + 1)]
+
+
 def compute_tfidf_per_doc(
     tokens: List[str],
     docfreq: Counter,
@@ -58,6 +87,8 @@ def compute_tfidf_per_doc(
     desc_generic_df_ratio: float = config.DEFAULT_DESC_GENERIC_DF_RATIO,
     desc_drop_generic_phrases: bool = config.DEFAULT_DESC_DROP_GENERIC_PHRASES,
     desc_generic_phrase_df_ratio: float = config.DEFAULT_DESC_GENERIC_PHRASE_DF_RATIO,
+    idf_table: Optional[List[float]] = None,
+    grams: Optional[Dict[str, int]] = None,
 ) -> Counter:
     """
     Compute TF-IDF for description text of a single document.
@@ -73,38 +104,58 @@ def compute_tfidf_per_doc(
           * if desc_drop_generic_unigrams and (df / N) >= desc_generic_df_ratio
       - Optionally drops globally generic phrases (bi/tri-grams) based on DF ratio across subreddits:
           * if desc_drop_generic_phrases and (df / N) >= desc_generic_phrase_df_ratio
+
+    idf_table: optional build_idf_table(N, desc_idf_power) result; looked up by df instead of
+    recomputing the IDF per gram.
+    grams: optional precomputed tokens_to_ngrams(tokens, max_ngram), so callers that also need the
+    local n-gram counts build them only once.
     """
-    grams = tokens_to_ngrams(tokens, max_ngram)
+    if grams is None:
+        grams = tokens_to_ngrams(tokens, max_ngram)
     tfidf = Counter()
+    if not grams:
+        return tfidf
+
+    # Loop invariants hoisted out of the per-gram path
+    df_get = docfreq.get
+    idf_power = max(0.0, float(desc_idf_power))
+    table_len = len(idf_table) if idf_table is not None else 0
+    boost_bigram = config.DEFAULT_DESC_PHRASE_BOOST_BIGRAM
+    boost_trigram = config.DEFAULT_DESC_PHRASE_BOOST_TRIGRAM
+
     for g, tf in grams.items():
         n_words = g.count(" ") + 1
-        df = docfreq.get(g, 0)
+        df = df_get(g, 0)
 
-        # Rare multi-gram pruning
-        if n_words == 2 and df < min_df_bigram:
-            continue
-        if n_words == 3 and df < min_df_trigram:
-            continue
+        if n_words == 1:
+            # Generic unigram pruning by DF ratio across descriptions
+            if desc_drop_generic_unigrams:
+                df_ratio = (df / total_docs) if total_docs > 0 else 0.0
+                if df_ratio >= desc_generic_df_ratio:
+                    continue
+            boost = 1.0
+        else:
+            # Rare multi-gram pruning
+            if n_words == 2:
+                if df < min_df_bigram:
+                    continue
+                boost = boost_bigram
+            elif n_words == 3:
+                if df < min_df_trigram:
+                    continue
+                boost = boost_trigram
+            else:
+                boost = 1.0
+            # Generic phrase pruning by DF ratio across descriptions
+            if desc_drop_generic_phrases:
+                df_ratio = (df / total_docs) if total_docs > 0 else 0.0
+                if df_ratio >= desc_generic_phrase_df_ratio:
+                    continue
 
-        # Generic unigram pruning by DF ratio across descriptions
-        if n_words == 1 and desc_drop_generic_unigrams:
-            df_ratio = (df / total_docs) if total_docs > 0 else 0.0
-            if df_ratio >= desc_generic_df_ratio:
-                continue
-
-        # Generic phrase pruning by DF ratio across descriptions
-        if n_words >= 2 and desc_drop_generic_phrases:
-            df_ratio = (df / total_docs) if total_docs > 0 else 0.0
-            if df_ratio >= desc_generic_phrase_df_ratio:
-                continue
-
-        idf = math.log((1.0 + total_docs) / (1.0 + df)) + 1.0
-        idf_eff = idf ** max(0.0, float(desc_idf_power))
-        boost = 1.0
-        if n_words == 2:
-            boost = config.DEFAULT_DESC_PHRASE_BOOST_BIGRAM
-        elif n_words == 3:
-            boost = config.DEFAULT_DESC_PHRASE_BOOST_TRIGRAM
+        if df < table_len:
+            idf_eff = idf_table[df]  # type: ignore[index]
+        else:
+            idf_eff = (math.log((1.0 + total_docs) / (1.0 + df)) + 1.0) ** idf_power
         tfidf[g] = tf * idf_eff * boost
     return tfidf
 
@@ -130,41 +181,70 @@ def score_name_terms(name_terms: List[str]) -> Counter:
 
 
 def merge_sources(
-    items: List[Tuple[Counter, float, str]]
+    items: List[Tuple[Dict[str, float], float, str]]
 ) -> Dict[str, Tuple[float, str]]:
     """
     Merge multiple sources of scores.
-    items: list of (scores_counter, weight_multiplier, source_name)
+    items: list of (scores_mapping, weight_multiplier, source_name)
     Returns: term -> (score, source_string) where source_string is "name+description+posts" etc.
     """
-    out: Dict[str, Tuple[float, Set[str]]] = {}
+    # Scores and source memberships kept side by side: plain floats plus a small
+    # bitmask per term (bit i = i-th distinct source name), instead of a (float, set)
+    # tuple rebuilt on every merge.
+    scores_out: Dict[str, float] = {}
+    masks: Dict[str, int] = {}
+    src_names: List[str] = []
 
     for scores, w, src in items:
         if not scores or w <= 0:
             continue
+        if src in src_names:
+            bit = 1 << src_names.index(src)
+        else:
+            bit = 1 << len(src_names)
+            src_names.append(src)
+        if not scores_out:
+            # First contributing source: bulk-build both maps (no membership probes)
+            scores_out = {term: val * w for term, val in scores.items()}
+            masks = dict.fromkeys(scores_out, bit)
+            continue
         for term, val in scores.items():
             add = val * w
-            if term in out:
-                cur, srcs = out[term]
-                out[term] = (cur + add, srcs | {src})
+            if term in scores_out:
+                scores_out[term] += add
+                masks[term] |= bit
             else:
-                out[term] = (add, {src})
+                scores_out[term] = add
+                masks[term] = bit
 
-    # Convert source sets to joined string
+    # Convert source masks to joined strings (one join per distinct mask)
+    labels: Dict[int, str] = {}
     final: Dict[str, Tuple[float, str]] = {}
-    for term, (score, srcs) in out.items():
-        # normalize ordering for determinism
-        src_str = "+".join(sorted(srcs))
+    for term, score in scores_out.items():
+        mask = masks[term]
+        src_str = labels.get(mask)
+        if src_str is None:
+            # normalize ordering for determinism
+            src_str = "+".join(sorted(n for i, n in enumerate(src_names) if mask >> i & 1))
+            labels[mask] = src_str
         final[term] = (score, src_str)
     return final
 
 
-def normalize_weights(term_scores: Dict[str, Tuple[float, str]]) -> List[Tuple[str, float, float, str]]:
+def normalize_weights(
+    term_scores: Dict[str, Tuple[float, str]],
+    topk: Optional[int] = None,
+) -> List[Tuple[str, float, float, str]]:
     """
     Normalize combined scores so weights sum to 1.0 per document.
-    Returns list of tuples (term, weight, raw_score, source)
+    Returns list of tuples (term, weight, raw_score, source) sorted by raw score desc.
+    With topk, only the top-K are returned (heap selection; same order as the full sort),
+    while weights still use the total over all terms.
     """
     total = sum(v for v, _ in term_scores.values()) or 1.0
+    if topk is not None and topk >= 0:
+        best = heapq.nlargest(topk, term_scores.items(), key=lambda kv: kv[1][0])
+        return [(term, score / total, score, source) for term, (score, source) in best]
     items = []
     for term, (score, source) in term_scores.items():
         items.append((term, score / total, score, source))
@@ -1,17 +1,22 @@
 """
 Subreddit data processing utilities.
 """
-import json
 import re
+from functools import lru_cache
 from typing import Iterable
 
 from .data_models import SubDoc
+from .file_utils import load_json_file
 from .name_processing import extract_name_terms
 
+_rslash_prefix_re = re.compile(r"^r/+", re.IGNORECASE)
+_r_name_re = re.compile(r"r/([^/\s]+)", re.IGNORECASE)
+_r_url_re = re.compile(r"/r/([^/\s]+)/?", re.IGNORECASE)
+_r_prefix_re = re.compile(r"^r/")
+
 
 def iter_subreddits_from_file(path: str) -> Iterable[SubDoc]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_json_file(path)
     subs = data.get("subreddits", []) or []
     for s in subs:
         yield SubDoc(
@@ -25,27 +30,29 @@ def iter_subreddits_from_file(path: str) -> Iterable[SubDoc]:
         )
 
 
+@lru_cache(maxsize=200_000)
 def canonicalize_subreddit_key(name: str, url: str) -> str:
     """
     Build a canonical lowercase key (e.g., 'valorant') from subreddit name or URL.
     """
     # Try name like "r/VALORANT"
     if name:
-        m = re.search(r"r/([^/\s]+)", name, flags=re.IGNORECASE)
+        m = _r_name_re.search(name)
         if m:
             return m.group(1).strip("/").lower()
         name2 = name.strip().strip("/").lower()
-        return re.sub(r"^r/", "", name2)
+        return _r_prefix_re.sub("", name2)
 
     # Try URL like "https://www.reddit.com/r/VALORANT"
     if url:
-        m = re.search(r"/r/([^/\s]+)/?", url, flags=re.IGNORECASE)
+        m = _r_url_re.search(url)
         if m:
             return m.group(1).lower()
 
     return ""
 
 
+@lru_cache(maxsize=200_000)
 def subreddit_folder_from_name(name: str) -> str:
     """
     Derive folder name from display name (preserve casing if present).
@@ -53,18 +60,19 @@ def subreddit_folder_from_name(name: str) -> str:
     """
     if not name:
         return ""
-    n = re.sub(r"^r/+", "", name.strip(), flags=re.IGNORECASE)
+    n = _rslash_prefix_re.sub("", name.strip())
     return n.strip("/")
 
 
+@lru_cache(maxsize=200_000)
 def subreddit_display_key(name: str, url: str) -> str:
     # Extract displayed subreddit key (preserve casing), e.g., "CX5"
     if name:
-        m = re.search(r"r/([^/\s]+)", name, flags=re.IGNORECASE)
+        m = _r_name_re.search(name)
         if m:
             return m.group(1).strip("/")
     if url:
-        m = re.search(r"/r/([^/\s]+)/?", url, flags=re.IGNORECASE)
+        m = _r_url_re.search(url)
         if m:
             return m.group(1).strip("/")
     return ""
\ No newline at end of file
@@ -1,6 +1,7 @@
 import re
 from collections import Counter
-from typing import Iterable, List, Optional, Set
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from . import config
 from .constants import EXPANSIONS, HEURISTIC_SUFFIXES, STOPWORDS
@@ -37,19 +38,33 @@ def _ensure_wordsegment_loaded() -> None:
 
 
 _ws_re = re.compile(r"\s+")
-# Split camelCase, PascalCase, digit transitions, and acronym-to-Word (e.g., UKGardening -> UK | Gardening)
-_camel_boundary_re = re.compile(
-    r"(?<=[a-z0-9])(?=[A-Z])"          # lower/digit -> Upper
-    r"|(?<=[A-Z])(?=[A-Z][a-z])"       # ACRONYM -> ProperCase boundary
-    r"|(?<=[A-Za-z])(?=[0-9])"         # letter -> digit
-    r"|(?<=[0-9])(?=[A-Za-z])"         # digit -> letter
+# Parts of camelCase, PascalCase, digit transitions, and acronym-to-Word (e.g., UKGardening -> UK | Gardening).
+# Matched directly with findall; anything outside [0-9A-Za-z] acts as a separator.
+_camel_part_re = re.compile(
+    r"[A-Z]+(?=[A-Z][a-z])"            # ACRONYM before a ProperCase word
+    r"|[A-Z]?[a-z]+"                   # lower or Capitalized word
+    r"|[A-Z]+"                         # trailing/standalone ACRONYM
+    r"|[0-9]+"                         # digit run
 )
+_punct_re = re.compile(r"[^0-9\w\s]+", re.UNICODE)
+_vowel_consonant_re = re.compile(r"[aeiouy][^aeiouy]")
+_year_re = re.compile(r"(19|20)\d{2}")
+_multi_digit_re = re.compile(r"\d{2,}")
 
 
 def normalize_space(s: str) -> str:
     return _ws_re.sub(" ", s).strip()
 
 
+# ASCII fast path for tokenize_simple: a single translate() lowercases word characters and
+# turns everything else except whitespace (punctuation, "_", "-", control chars) into a space.
+_ASCII_TOKEN_TABLE = str.maketrans({
+    chr(c): (chr(c).lower() if chr(c).isalnum() else " ")
+    for c in range(128)
+    if not chr(c).isspace()
+})
+
+
 def tokenize_simple(text: str) -> List[str]:
     """
     Unicode-aware word tokenizer. Keeps letters and digits, drops underscores and punctuation.
@@ -57,10 +72,12 @@ def tokenize_simple(text: str) -> List[str]:
     """
     if not text:
         return []
+    if text.isascii():
+        return text.translate(_ASCII_TOKEN_TABLE).split()
     # Replace underscores/hyphens with space to avoid glue
     text = text.replace("_", " ").replace("-", " ")
     # Keep letters/digits; Python \w includes underscore, so strip it manually
-    text = re.sub(r"[^0-9\w\s]+", " ", text, flags=re.UNICODE)  # drop punctuation, keep word chars
+    text = _punct_re.sub(" ", text)  # drop punctuation, keep word chars
     text = text.replace("_", " ")
     text = normalize_space(text.lower())
     if not text:
@@ -78,46 +95,64 @@ def split_camel_and_digits(token: str) -> List[str]:
         return []
     if token.isupper() and len(token) <= 5:
         return [token]  # keep acronym
-    parts = _camel_boundary_re.split(token)
-    # Some parts may still include caps at start; lower case them for normalization
-    out = []
-    for p in parts:
-        if not p:
-            continue
-        out.extend(re.split(r"[^0-9A-Za-z]+", p))
-    out = [x for x in out if x]
-    return out
+    return _camel_part_re.findall(token)
+
+
+# Suffix lookup grouped by length: one slice + dict probe per distinct suffix length
+# instead of an endswith() per suffix. Values are list positions, so the earliest
+# listed suffix still wins if entries ever overlap.
+_HEURISTIC_SUFFIX_INDEX: Dict[str, int] = {
+    suf: i for i, suf in reversed(list(enumerate(HEURISTIC_SUFFIXES)))
+}
+_HEURISTIC_SUFFIX_LENS = sorted({len(s) for s in _HEURISTIC_SUFFIX_INDEX if s})
 
 
-def heuristic_segment_lower(token: str) -> List[str]:
+def _match_heuristic_suffix(t: str) -> Optional[str]:
+    """
+    Return the first HEURISTIC_SUFFIXES entry that t ends with, leaving a head longer than 2 chars.
+    """
+    best: Optional[str] = None
+    best_i = len(HEURISTIC_SUFFIXES)
+    n = len(t)
+    for k in _HEURISTIC_SUFFIX_LENS:
+        if n <= k + 2:
+            break
+        suf = t[n - k:]
+        i = _HEURISTIC_SUFFIX_INDEX.get(suf)
+        if i is not None and i < best_i:
+            best, best_i = suf, i
+    return best
+
+
+@lru_cache(maxsize=100_000)
+def heuristic_segment_lower(token: str) -> Tuple[str, ...]:
     """
     Very lightweight heuristic to segment a long lowercase token by common suffixes.
     Example: southernfood -> ["southern", "food"], rangersfc -> ["rangers", "fc"]
     """
     if not token or not token.isalpha():
-        return [token]
+        return (token,)
     if len(token) <= 8:
-        return [token]
+        return (token,)
     # Try repeatedly peeling known suffixes
     parts = []
     t = token
     changed = True
     while changed:
         changed = False
-        for suf in HEURISTIC_SUFFIXES:
-            if t.endswith(suf) and len(t) > len(suf) + 2:
-                head = t[: len(t) - len(suf)]
-                parts.append(head)
-                parts.append(suf)
-                t = ""  # consumed
-                changed = True
-                break
+        suf = _match_heuristic_suffix(t)
+        if suf:
+            head = t[: len(t) - len(suf)]
+            parts.append(head)
+            parts.append(suf)
+            t = ""  # consumed
+            changed = True
         # If not matched, attempt a middle split at most once: at vowels boundary
         if not changed and t:
             # find a boundary near the middle at a vowel transition: e.g., glutenfree -> gluten free
             mid = len(t) // 2
             # search rightwards for a vowel boundary
-            m = re.search(r"[aeiouy][^aeiouy]", t[mid:])
+            m = _vowel_consonant_re.search(t[mid:])
             if m:
                 pos = mid + m.end() - 1
                 if 3 <= pos <= len(t) - 3:
@@ -126,7 +161,7 @@ def heuristic_segment_lower(token: str) -> List[str]:
                     t = ""
                     changed = True
     if not parts:
-        return [token]
+        return (token,)
     # parts might include empty strings if weird split - filter
     parts = [p for p in parts if p]
     # If we produced 3+ pieces by repeated splits, flatten: re-segment each recursively if needed
@@ -136,23 +171,24 @@ def heuristic_segment_lower(token: str) -> List[str]:
             final.extend(heuristic_segment_lower(p))
         else:
             final.append(p)
-    return final
+    return tuple(final)
 
 
-def segment_token_lower(token: str) -> List[str]:
+@lru_cache(maxsize=100_000)
+def segment_token_lower(token: str) -> Tuple[str, ...]:
     """
     Try to segment a glued lowercase token into natural-language words using
     optional libraries, then fall back to heuristic segmentation.
     """
     if not token or not token.isalpha() or not token.islower() or len(token) < 9:
-        return [token]
+        return (token,)
     # Try wordsegment
     if _HAS_WORDSEGMENT:
         try:
             _ensure_wordsegment_loaded()
             segs = _ws_segment(token)
             if segs and len(segs) >= 2:
-                return [s.lower() for s in segs if s]
+                return tuple(s.lower() for s in segs if s)
         except Exception:
             pass
     # Try wordninja
@@ -160,7 +196,7 @@ def segment_token_lower(token: str) -> List[str]:
         try:
             segs = _wordninja.split(token)
             if segs and len(segs) >= 2:
-                return [s.lower() for s in segs if s]
+                return tuple(s.lower() for s in segs if s)
         except Exception:
             pass
     # Fallback heuristic
@@ -223,10 +259,10 @@ def filter_stop_tokens(
         if lt.isdigit():
             _append_boundary_once()
             continue
-        if re.fullmatch(r"(19|20)\d{2}", lt):
+        if _year_re.fullmatch(lt):
             _append_boundary_once()
             continue
-        if re.fullmatch(r"\d{2,}", lt):
+        if _multi_digit_re.fullmatch(lt):
             _append_boundary_once()
             continue
 
@@ -257,19 +293,34 @@ def filter_stop_tokens(
 
 def tokens_to_ngrams(tokens: List[str], max_n: int) -> Counter:
     """
-    Build contiguous n-grams but do not cross BOUNDARY_TOKEN markers.
+    Build contiguous n-gram counts but do not cross BOUNDARY_TOKEN markers.
     Any window that contains the boundary sentinel is skipped.
+    Tokens are split into boundary-free segments and each n-gram order is fed to
+    Counter.update as zipped windows, so counting runs in C; insertion order
+    (all unigrams in position order, then bigrams, ...) matches a plain nested loop.
     """
-    grams = Counter()
-    n = len(tokens)
-    for k in range(1, max_n + 1):
-        if n < k:
-            break
-        for i in range(0, n - k + 1):
-            window = tokens[i : i + k]
-            if BOUNDARY_TOKEN in window:
-                continue
-            gram = " ".join(window)
-            if gram:
-                grams[gram] += 1
+    grams: Counter = Counter()
+    if max_n < 1:
+        return grams
+    if BOUNDARY_TOKEN in tokens:
+        segments: List[List[str]] = []
+        seg: List[str] = []
+        for t in tokens:
+            if t == BOUNDARY_TOKEN:
+                if seg:
+                    segments.append(seg)
+                    seg = []
+            else:
+                seg.append(t)
+        if seg:
+            segments.append(seg)
+    else:
+        segments = [tokens]
+    for seg in segments:
+        grams.update(seg)
+    for k in range(2, max_n + 1):
+        for seg in segments:
+            if len(seg) >= k:
+                grams.update(map(" ".join, zip(*[seg[j:] for j in range(k)])))
+    grams.pop("", None)
     return grams
\ No newline at end of file
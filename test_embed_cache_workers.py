@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+EMBED_CACHE_DIR with --workers 2: vectors encoded in pass-2 pool workers must reach the cache file.
+Uses a stub embedder (no sentence-transformers download) injected before the pool forks.
+"""
+
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from src.keyword_extraction import __main__ as kw_main
+from src.keyword_extraction import embedding
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "data", "page_test.json")
+
+
+class _StubEmbedder:
+    def encode(self, texts, batch_size=32, normalize_embeddings=True):
+        vecs = np.array([[len(t), sum(map(ord, t)) % 97, 1.0] for t in texts], dtype=np.float32)
+        return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def fork_start_method():
+    # Other tests force "spawn" globally; the stub only reaches workers through fork
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method("fork", force=True)
+    yield
+    multiprocessing.set_start_method(previous, force=True)
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="stub embedder reaches workers via fork")
+def test_workers_fill_embed_cache(tmp_path, monkeypatch, fork_start_method):
+    cache_dir = tmp_path / "embed_cache"
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("EMBED_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(embedding, "_HAS_ST", True)
+    monkeypatch.setattr(embedding, "_get_embedder", lambda model_name: _StubEmbedder())
+    monkeypatch.setattr(embedding, "_EMBED_DISK_CACHE", {})
+    monkeypatch.setattr(embedding, "_EMBED_DISK_DIRTY", {})
+    monkeypatch.setattr(sys, "argv", [
+        "keyword_extraction",
+        "--input-file", SAMPLE_PAGE,
+        "--output-dir", str(tmp_path / "out"),
+        "--embed-rerank",
+        "--embed-model", "stub/model",
+        "--workers", "2",
+    ])
+
+    kw_main.main()
+
+    cache_file = cache_dir / "stub_model.npz"
+    assert cache_file.exists()
+    embedding._EMBED_DISK_CACHE.clear()
+    store = embedding._load_embed_disk_cache("stub/model")
+    assert store
+    for text, vec in list(store.items())[:20]:
+        expected = _StubEmbedder().encode([text])[0].astype(vec.dtype)
+        assert np.allclose(vec, expected, atol=1e-3)